@@ -0,0 +1,214 @@
+import heapq
+import random
+import time
+from collections import deque
+
+
+class ScheduleResult:
+    """Where each cloudlet ran, when it finished, and how busy each VM was."""
+
+    def __init__(self, policy, assignment, completion, busy):
+        self.policy = policy
+        self.assignment = assignment  # cloudlet index -> VM index
+        self.completion = completion  # cloudlet index -> completion time
+        self.busy = busy  # VM index -> seconds spent executing
+        self.makespan = max(completion) if completion else 0.0
+
+    def mean_completion(self):
+        return sum(self.completion) / len(self.completion) if self.completion else 0.0
+
+    def percentile_completion(self, q):
+        if not self.completion:
+            return 0.0
+        ordered = sorted(self.completion)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def utilization(self):
+        """Busy time of each VM as a fraction of the makespan."""
+        if not self.makespan:
+            return [0.0] * len(self.busy)
+        return [b / self.makespan for b in self.busy]
+
+    def report(self):
+        utilization = self.utilization()
+        return (
+            f"{self.policy:<28} makespan {self.makespan:9.3f}s  "
+            f"mean {self.mean_completion():9.3f}s  p99 {self.percentile_completion(99):9.3f}s  "
+            f"utilization min/mean/max {min(utilization):.2f}/"
+            f"{sum(utilization) / len(utilization):.2f}/{max(utilization):.2f}"
+        )
+
+
+class SchedulingPolicy:
+    """Assigns a batch of cloudlets to VMs; each VM runs its cloudlets in order.
+
+    A cloudlet of ``duration`` seconds takes ``duration / speed`` on a VM.
+    """
+
+    name = 'base'
+
+    def schedule(self, cloudlets, vms):
+        return self.run([c.duration for c in cloudlets], [getattr(vm, 'speed', 1.0) for vm in vms])
+
+    def run(self, durations, speeds):
+        raise NotImplementedError
+
+
+class RoundRobinPolicy(SchedulingPolicy):
+    """The original behaviour: cloudlet i goes to VM i mod n."""
+
+    name = 'round-robin'
+
+    def run(self, durations, speeds):
+        n = len(speeds)
+        finish = [0.0] * n
+        busy = [0.0] * n
+        assignment = [0] * len(durations)
+        completion = [0.0] * len(durations)
+        for i, duration in enumerate(durations):
+            v = i % n
+            runtime = duration / speeds[v]
+            finish[v] += runtime
+            busy[v] += runtime
+            assignment[i] = v
+            completion[i] = finish[v]
+        return ScheduleResult(self.name, assignment, completion, busy)
+
+
+class LeastLoadedPolicy(SchedulingPolicy):
+    """Send each cloudlet to the VM with the least queued work (in seconds at its speed), kept in a heap."""
+
+    name = 'least-loaded'
+
+    def run(self, durations, speeds):
+        n = len(speeds)
+        heap = [(0.0, v) for v in range(n)]  # (queued work in seconds, VM)
+        finish = [0.0] * n
+        busy = [0.0] * n
+        assignment = [0] * len(durations)
+        completion = [0.0] * len(durations)
+        for i, duration in enumerate(durations):
+            work, v = heap[0]
+            runtime = duration / speeds[v]
+            heapq.heapreplace(heap, (work + runtime, v))
+            finish[v] += runtime
+            busy[v] += runtime
+            assignment[i] = v
+            completion[i] = finish[v]
+        return ScheduleResult(self.name, assignment, completion, busy)
+
+
+class ShortestExpectedCompletionPolicy(SchedulingPolicy):
+    """Send each cloudlet to the VM where it would finish first.
+
+    VMs are grouped by speed with one heap of finish times per group, so a
+    decision costs O(log n) per group rather than a scan of every VM.
+    """
+
+    name = 'shortest-expected-completion'
+
+    def run(self, durations, speeds):
+        groups = {}
+        for v, speed in enumerate(speeds):
+            groups.setdefault(speed, []).append((0.0, v))
+        groups = list(groups.items())  # [(speed, heap of (finish time, VM))]
+
+        busy = [0.0] * len(speeds)
+        assignment = [0] * len(durations)
+        completion = [0.0] * len(durations)
+        for i, duration in enumerate(durations):
+            best, best_heap = None, None
+            for speed, heap in groups:
+                done = heap[0][0] + duration / speed
+                if best is None or done < best:
+                    best, best_heap = done, heap
+            v = best_heap[0][1]
+            heapq.heapreplace(best_heap, (best, v))
+            busy[v] += duration / speeds[v]
+            assignment[i] = v
+            completion[i] = best
+        return ScheduleResult(self.name, assignment, completion, busy)
+
+
+class WorkStealingPolicy(SchedulingPolicy):
+    """Round-robin initial queues; a VM that runs dry steals half of another VM's queue.
+
+    Victims are picked with two random choices, taking the longer queue.
+    Each steal costs ``steal_latency`` seconds, and a failed attempt backs
+    off exponentially so idle VMs don't spin once work runs out.
+    """
+
+    name = 'work-stealing'
+
+    def __init__(self, steal_latency=0.001, seed=None):
+        self.steal_latency = steal_latency
+        self.random = random.Random(seed)
+
+    def run(self, durations, speeds):
+        n = len(speeds)
+        queues = [deque() for _ in range(n)]
+        for i in range(len(durations)):
+            queues[i % n].append(i)
+        queued = len(durations)
+
+        busy = [0.0] * n
+        backoff = [self.steal_latency] * n
+        assignment = [0] * len(durations)
+        completion = [0.0] * len(durations)
+        events = [(0.0, v) for v in range(n)]  # (time the VM is free, VM)
+        choice = self.random.randrange
+
+        while events and queued:
+            now, v = heapq.heappop(events)
+            queue = queues[v]
+            if queue:
+                i = queue.popleft()
+                queued -= 1
+                runtime = durations[i] / speeds[v]
+                busy[v] += runtime
+                assignment[i] = v
+                completion[i] = now + runtime
+                backoff[v] = self.steal_latency
+                heapq.heappush(events, (now + runtime, v))
+                continue
+
+            a, b = choice(n), choice(n)
+            victim = queues[a] if len(queues[a]) >= len(queues[b]) else queues[b]
+            take = len(victim) // 2
+            if take:
+                for _ in range(take):
+                    queue.appendleft(victim.pop())
+                heapq.heappush(events, (now + self.steal_latency, v))
+            else:
+                heapq.heappush(events, (now + backoff[v], v))
+                backoff[v] *= 2
+        return ScheduleResult(self.name, assignment, completion, busy)
+
+
+POLICIES = {
+    policy.name: policy
+    for policy in (RoundRobinPolicy, LeastLoadedPolicy, ShortestExpectedCompletionPolicy, WorkStealingPolicy)
+}
+
+
+def benchmark(num_cloudlets=1000000, num_vms=10000, seed=0):
+    """Schedule the same random workload with every policy and print the reports."""
+    rng = random.Random(seed)
+    durations = [rng.uniform(0.1, 0.3) for _ in range(num_cloudlets)]
+    speeds = [rng.choice((0.5, 1.0, 1.5, 2.0)) for _ in range(num_vms)]  # VM flavours
+    for policy in (RoundRobinPolicy(), LeastLoadedPolicy(), ShortestExpectedCompletionPolicy(),
+                   WorkStealingPolicy(seed=seed)):
+        start = time.perf_counter()
+        result = policy.run(durations, speeds)
+        elapsed = time.perf_counter() - start
+        print(f"{result.report()}  ({elapsed:.2f}s to schedule)")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the scheduling policies on one random workload")
+    parser.add_argument('num_cloudlets', type=int, nargs='?', default=1000000)
+    parser.add_argument('num_vms', type=int, nargs='?', default=10000)
+    args = parser.parse_args()
+    benchmark(args.num_cloudlets, args.num_vms)
@@ -1,6 +1,8 @@
 
+import argparse
 import random
 import time
+from cloudlet_scheduler import POLICIES
 
 class Server:
     def __init__(self, id):
@@ -21,18 +23,27 @@ class Server:
             self.active = False
 
 class VM:
-    def __init__(self, id, load):
+    def __init__(self, id, load, speed=1.0):
         self.id = id
         self.load = load
+        self.speed = speed  # relative processing speed, a cloudlet takes duration / speed
 
 class Cloudlet:
     def __init__(self, id, duration):
         self.id = id
         self.duration = duration
 
+parser = argparse.ArgumentParser(description="Schedule cloudlets on VMs, then consolidate the servers")
+parser.add_argument('policy', nargs='?', default='round-robin', choices=sorted(POLICIES),
+                    help="cloudlet scheduling policy (default: round-robin)")
+parser.add_argument('--random-speeds', action='store_true',
+                    help="give VMs random speeds of 0.5x, 1x or 2x instead of all 1x")
+args = parser.parse_args()
+
 # Initialize servers and VMs
 servers = [Server(i) for i in range(5)]
-vms = [VM(i, random.randint(10, 30)) for i in range(10)]
+vms = [VM(i, random.randint(10, 30), random.choice([0.5, 1.0, 2.0]) if args.random_speeds else 1.0)
+       for i in range(10)]
 
 # Initial random placement
 for vm in vms:
@@ -54,12 +65,15 @@ def consolidate(servers):
 cloudlets = [Cloudlet(i, random.uniform(0.1, 0.3)) for i in range(20)]
 
 # Assign cloudlets to VMs and simulate execution
+policy = POLICIES[args.policy]()
 vm_list = [vm for server in servers for vm in server.vms]
+schedule = policy.schedule(cloudlets, vm_list)
 for i, cloudlet in enumerate(cloudlets):
-    vm = vm_list[i % len(vm_list)]
+    vm = vm_list[schedule.assignment[i]]
     print(f"Cloudlet {cloudlet.id} executing on VM {vm.id}...", end=' ')
     time.sleep(cloudlet.duration)
     print("Status: Success")
+print(schedule.report())
 
 # Consolidation simulation
 initial_active = sum(1 for s in servers if s.active)
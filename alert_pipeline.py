@@ -0,0 +1,315 @@
+import json
+import os
+import queue
+import threading
+import urllib.request
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+
+SEVERITY = {'normal': 0, 'warning': 1, 'critical': 2}
+
+
+class AlertSink:
+    """Base class for a destination that receives batches of alert notifications."""
+
+    def send(self, batch: List[Dict]):
+        raise NotImplementedError
+
+
+class LogFileSink(AlertSink):
+    """Append notifications to a file as JSON lines, one write per batch."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def send(self, batch: List[Dict]):
+        with open(self.path, 'a') as f:
+            f.write(''.join(json.dumps(notification) + '\n' for notification in batch))
+
+
+class WebhookSink(AlertSink):
+    """POST each batch as a JSON array to a webhook URL."""
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, batch: List[Dict]):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(batch).encode(), headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class TokenBucket:
+    """Allow ``rate`` events per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated: Optional[float] = None
+
+    def allow(self, now: float) -> bool:
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AlertPipeline:
+    """Stateful alerts with deduplication, rate limiting and batched delivery.
+
+    Each (rack, metric) pair has at most one active alert. It opens when the
+    metric leaves 'normal', escalates if it gets worse, can be acknowledged,
+    and resolves after ``resolve_after`` normal samples in a row. Repeated
+    samples of an open alert only bump its count, so a rack stuck over a
+    threshold raises one alert rather than one per sample.
+
+    Notifications for those transitions pass per-rack and fleet-wide token
+    buckets; anything over the limits is counted and reported in a summary
+    instead of being sent. Sent notifications wait in a bounded outbox and
+    go to every sink in batches, so memory stays bounded during fault storms.
+    Sinks are called from a daemon worker thread: ``flush`` only queues
+    batches, so a slow webhook never blocks the caller (or its locks).
+    """
+
+    def __init__(self, sinks: Optional[List[AlertSink]] = None, resolve_after: int = 3,
+                 rack_rate: float = 1 / 60, rack_burst: int = 3, fleet_rate: float = 20.0, fleet_burst: int = 200,
+                 batch_size: int = 100, flush_interval: float = 5.0, max_outbox: int = 10000,
+                 max_resolved: int = 1000, max_pending_batches: int = 100):
+        self.sinks = sinks or []
+        self.resolve_after = resolve_after
+        self.rack_rate = rack_rate
+        self.rack_burst = rack_burst
+        self.fleet_limiter = TokenBucket(fleet_rate, fleet_burst)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.active: Dict[Tuple[str, str], Dict] = {}
+        self.resolved: Deque[Dict] = deque(maxlen=max_resolved)
+        self.open_counts: Dict[str, int] = {}  # rack_id -> active alerts
+        self.outbox: Deque[Dict] = deque(maxlen=max_outbox)
+        self._rack_limiters: Dict[str, TokenBucket] = {}
+        self._next_id = 1
+        self._last_flush: Optional[float] = None
+        self._suppressed_since_flush = 0
+        self._lock = threading.Lock()
+        self._deliveries: queue.Queue = queue.Queue(maxsize=max_pending_batches)
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {
+            'opened': 0, 'escalated': 0, 'resolved': 0, 'acknowledged': 0, 'deduplicated': 0,
+            'suppressed': 0, 'dropped': 0, 'delivered': 0, 'batches': 0, 'failed_batches': 0
+        }
+
+    def observe(self, rack_id: str, statuses: Dict[str, str], values: Dict[str, float],
+                timestamp: datetime) -> List[Dict]:
+        """Feed one sample's per-metric statuses; returns the open/escalate/resolve transitions."""
+        transitions = []
+        with self._lock:
+            for metric, status in statuses.items():
+                key = (rack_id, metric)
+                alert = self.active.get(key)
+                if status != 'normal':
+                    if alert is None:
+                        alert = self._open(rack_id, metric, status, values.get(metric), timestamp)
+                        transitions.append(self._event('open', alert, timestamp))
+                    elif SEVERITY[status] > SEVERITY[alert['severity']]:
+                        alert.update(severity=status, value=values.get(metric), last_seen=timestamp, normal_run=0)
+                        alert['count'] += 1
+                        self.stats['escalated'] += 1
+                        transitions.append(self._event('escalate', alert, timestamp))
+                    else:
+                        alert.update(value=values.get(metric), last_seen=timestamp, normal_run=0)
+                        alert['count'] += 1
+                        self.stats['deduplicated'] += 1
+                elif alert is not None:
+                    alert['normal_run'] += 1
+                    if alert['normal_run'] >= self.resolve_after:
+                        self._resolve(key, alert, timestamp)
+                        transitions.append(self._event('resolve', alert, timestamp))
+
+            for event in transitions:
+                self._notify(event, timestamp)
+        return transitions
+
+    def acknowledge(self, rack_id: str, metric: Optional[str] = None, timestamp: Optional[datetime] = None) -> int:
+        """Acknowledge a rack's open alerts (or one metric's); returns how many changed."""
+        timestamp = timestamp or datetime.now()
+        changed = 0
+        with self._lock:
+            for (alert_rack, alert_metric), alert in self.active.items():
+                if alert_rack != rack_id or (metric is not None and alert_metric != metric):
+                    continue
+                if alert['state'] == 'open':
+                    alert['state'] = 'acknowledged'
+                    alert['acknowledged_at'] = timestamp
+                    changed += 1
+                    self.stats['acknowledged'] += 1
+                    self._notify(self._event('acknowledge', alert, timestamp), timestamp)
+        return changed
+
+    def active_alerts(self, rack_id: Optional[str] = None) -> List[Dict]:
+        """Open and acknowledged alerts, optionally for one rack."""
+        return [alert for alert in self.active.values() if rack_id is None or alert['rack_id'] == rack_id]
+
+    def _open(self, rack_id: str, metric: str, severity: str, value: Optional[float], timestamp: datetime) -> Dict:
+        alert = {
+            'id': self._next_id, 'rack_id': rack_id, 'metric': metric, 'severity': severity,
+            'state': 'open', 'value': value, 'count': 1, 'opened_at': timestamp, 'last_seen': timestamp,
+            'acknowledged_at': None, 'resolved_at': None, 'normal_run': 0
+        }
+        self._next_id += 1
+        self.active[(rack_id, metric)] = alert
+        self.open_counts[rack_id] = self.open_counts.get(rack_id, 0) + 1
+        self.stats['opened'] += 1
+        return alert
+
+    def _resolve(self, key: Tuple[str, str], alert: Dict, timestamp: datetime):
+        alert['state'] = 'resolved'
+        alert['resolved_at'] = timestamp
+        del self.active[key]
+        self.open_counts[alert['rack_id']] -= 1
+        self.resolved.append(alert)
+        self.stats['resolved'] += 1
+
+    def _event(self, kind: str, alert: Dict, timestamp: datetime) -> Dict:
+        return {
+            'event': kind, 'alert_id': alert['id'], 'rack_id': alert['rack_id'], 'metric': alert['metric'],
+            'severity': alert['severity'], 'state': alert['state'], 'value': alert['value'],
+            'count': alert['count'], 'time': timestamp.isoformat()
+        }
+
+    def _notify(self, event: Dict, timestamp: datetime):
+        """Queue a notification if both the rack's and the fleet's rate limits allow it."""
+        now = timestamp.timestamp()
+        limiter = self._rack_limiters.get(event['rack_id'])
+        if limiter is None:
+            limiter = self._rack_limiters[event['rack_id']] = TokenBucket(self.rack_rate, self.rack_burst)
+        # Resolutions bypass the per-rack bucket so a rack never looks stuck open downstream
+        if (event['event'] != 'resolve' and not limiter.allow(now)) or not self.fleet_limiter.allow(now):
+            self.stats['suppressed'] += 1
+            self._suppressed_since_flush += 1
+            return
+        if len(self.outbox) == self.outbox.maxlen:
+            self.stats['dropped'] += 1
+        self.outbox.append(event)
+
+    def flush(self, timestamp: Optional[datetime] = None, force: bool = False) -> int:
+        """Hand queued notifications to the delivery worker in batches if the outbox is full enough
+        or the interval passed; returns how many notifications were handed over."""
+        timestamp = timestamp or datetime.now()
+        now = timestamp.timestamp()
+        with self._lock:
+            if self._last_flush is None:
+                self._last_flush = now
+            due = force or len(self.outbox) >= self.batch_size or now - self._last_flush >= self.flush_interval
+            if not due or not (self.outbox or self._suppressed_since_flush):
+                return 0
+
+            notifications = list(self.outbox)
+            self.outbox.clear()
+            if self._suppressed_since_flush:
+                notifications.append({
+                    'event': 'suppressed', 'count': self._suppressed_since_flush, 'time': timestamp.isoformat()
+                })
+                self._suppressed_since_flush = 0
+            self._last_flush = now
+
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._deliver, name='alert-delivery', daemon=True)
+                self._worker.start()
+            queued = 0
+            for start in range(0, len(notifications), self.batch_size):
+                batch = notifications[start:start + self.batch_size]
+                try:
+                    self._deliveries.put_nowait(batch)
+                    queued += len(batch)
+                except queue.Full:  # sinks are falling behind; drop rather than grow without bound
+                    self.stats['dropped'] += len(batch)
+        return queued
+
+    def wait_delivered(self):
+        """Block until every batch handed over by ``flush`` went through the sinks."""
+        self._deliveries.join()
+
+    def _deliver(self):
+        while True:
+            batch = self._deliveries.get()
+            failed = 0
+            for sink in self.sinks:
+                try:
+                    sink.send(batch)
+                except Exception:
+                    failed += 1
+            with self._lock:
+                self.stats['failed_batches'] += failed
+                self.stats['batches'] += 1
+                self.stats['delivered'] += len(batch)
+            self._deliveries.task_done()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.received.append(json.loads(body))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_webhook_stub(host: str = '127.0.0.1', port: int = 0, keep: int = 100) -> HTTPServer:
+    """Start a local webhook receiver in a thread; received batches are in ``server.received``.
+
+    Port 0 picks a free port, available as ``server.server_port``.
+    """
+    server = HTTPServer((host, port), _StubHandler)
+    server.received = deque(maxlen=keep)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    import argparse
+    import random
+    import time
+    from datetime import timedelta
+
+    parser = argparse.ArgumentParser(description="Replay a fault storm through the alert pipeline")
+    parser.add_argument('--racks', type=int, default=5000)
+    parser.add_argument('--ticks', type=int, default=60)
+    parser.add_argument('--log', default='alerts.log')
+    args = parser.parse_args()
+
+    stub = serve_webhook_stub()
+    pipeline = AlertPipeline([LogFileSink(args.log), WebhookSink(f'http://127.0.0.1:{stub.server_port}/alerts')])
+    start = datetime(2024, 1, 1)
+    elapsed = time.perf_counter()
+    for tick in range(args.ticks):
+        now = start + timedelta(seconds=5 * tick)
+        for r in range(args.racks):
+            # Half the fleet sits above the temperature threshold; some racks flap
+            hot = r % 2 == 0 or (r % 7 == 0 and random.random() < 0.5)
+            status = 'critical' if hot else 'normal'
+            pipeline.observe(f'Rack-{r + 1}', {'temperature': status}, {'temperature': 46.0 if hot else 35.0}, now)
+        pipeline.flush(now)
+    pipeline.flush(force=True)
+    pipeline.wait_delivered()
+    elapsed = time.perf_counter() - elapsed
+
+    samples = args.racks * args.ticks
+    print(f"{samples} samples in {elapsed:.2f}s ({1e6 * elapsed / samples:.1f} us/sample)")
+    print(f"active alerts: {len(pipeline.active)}, outbox: {len(pipeline.outbox)}, webhook batches: {len(stub.received)}")
+    for key, value in pipeline.stats.items():
+        print(f"{key:>14}: {value}")
+    stub.shutdown()
@@ -1,10 +1,13 @@
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-from collections import deque
+from typing import Dict, List, Optional, Tuple
+from alert_pipeline import AlertPipeline
+from change_detectors import ChangePointDetector
+from failure_predictor import FailurePredictor
+from metric_history import MetricHistory
 
 class AnomalyDetector:
-    def __init__(self):
+    def __init__(self, predictor: Optional[FailurePredictor] = None):
         # Thresholds for different metrics
         self.thresholds = {
             'temperature': {'warning': 42, 'critical': 45},  # in Celsius
@@ -12,11 +15,14 @@ class AnomalyDetector:
             'power': {'warning': 1200, 'critical': 1500}     # in Watts
         }
         
-        # Store alert history for each rack
+        # Store alert history for each rack (alerts opened or escalated, not every sample)
         self.alert_history: Dict[str, List[Tuple[datetime, str]]] = {}
         
+        # Deduplicated alert states, rate limits and batched delivery to sinks
+        self.alerts = AlertPipeline()
+        
         # Store metric history for prediction
-        self.metric_history: Dict[str, Dict[str, deque]] = {}
+        self.metric_history = MetricHistory(window=240)  # 4 hours of minute data
         
         # Store prediction status
         self.predictions: Dict[str, Dict] = {}
@@ -25,18 +31,23 @@ class AnomalyDetector:
         self.prediction_thresholds = {
             'alert_frequency': 3,  # alerts per hour
             'trend_threshold': 0.7,  # positive trend threshold
-            'history_hours': 4  # hours of history to analyze
+            'history_hours': 4,  # hours of history to analyze
+            'change_point_weight': 0.25  # confidence added per metric with an upward shift
         }
+        
+        # Streaming EWMA/CUSUM charts, O(1) state per rack and metric
+        self.change_detector = ChangePointDetector()
+        
+        # Time source; replaced by the replay engine to run on trace time
+        self.clock = datetime.now
+        
+        # Optional ML backend; the rule-based scorer is used when it has no model
+        self.predictor = predictor
     
     def initialize_rack_history(self, rack_id: str):
         """Initialize history storage for a new rack."""
         if rack_id not in self.metric_history:
-            self.metric_history[rack_id] = {
-                'temperature': deque(maxlen=240),  # 4 hours of minute data
-                'vibration': deque(maxlen=240),
-                'power': deque(maxlen=240),
-                'timestamps': deque(maxlen=240)
-            }
+            self.metric_history.add_rack(rack_id)
         if rack_id not in self.alert_history:
             self.alert_history[rack_id] = []
         if rack_id not in self.predictions:
@@ -65,18 +76,28 @@ class AnomalyDetector:
     
     def predict_failures(self, rack_id: str) -> Dict:
         """Predict potential failures based on metric history."""
-        if len(self.metric_history[rack_id]['timestamps']) < 60:  # Need at least 1 hour of data
+        if self.predictor is not None and self.predictor.available:
+            # Model scores are refreshed in batch by score_all()
+            return self.predictions[rack_id]
+        return self.predict_failures_rule_based(rack_id)
+    
+    def predict_failures_rule_based(self, rack_id: str) -> Dict:
+        """Predict potential failures from hand-tuned trend and alert weights."""
+        change_confidence, change_reasons = self._change_point_score(rack_id)
+        
+        if len(self.metric_history[rack_id]['timestamps']) < 60:  # Need at least 1 hour of data for trends
+            self.predictions[rack_id] = self._build_prediction(change_confidence, change_reasons)
             return self.predictions[rack_id]
         
         # Analyze trends
-        temp_trend = self.analyze_trend(list(self.metric_history[rack_id]['temperature']))
-        vib_trend = self.analyze_trend(list(self.metric_history[rack_id]['vibration']))
-        power_trend = self.analyze_trend(list(self.metric_history[rack_id]['power']))
+        temp_trend = self.analyze_trend(self.metric_history.values(rack_id, 'temperature'))
+        vib_trend = self.analyze_trend(self.metric_history.values(rack_id, 'vibration'))
+        power_trend = self.analyze_trend(self.metric_history.values(rack_id, 'power'))
         
         # Count recent alerts
         recent_alerts = len([
             alert for alert in self.alert_history[rack_id]
-            if alert[0] > datetime.now() - timedelta(hours=1)
+            if alert[0] > self.clock() - timedelta(hours=1)
         ])
         
         # Calculate prediction confidence
@@ -99,38 +120,78 @@ class AnomalyDetector:
             confidence += 0.2
             reasons.append(f"High alert frequency ({recent_alerts} in last hour)")
         
-        # Update prediction status
+        self.predictions[rack_id] = self._build_prediction(confidence + change_confidence, reasons + change_reasons)
+        return self.predictions[rack_id]
+    
+    def _change_point_score(self, rack_id: str) -> Tuple[float, List[str]]:
+        """Confidence and reasons contributed by the streaming change-point charts."""
+        signals = self.change_detector.signals(rack_id)
+        upward = sum(1 for metric_signals in signals.values() if max(metric_signals.values()) > 0)
+        return upward * self.prediction_thresholds['change_point_weight'], self.change_detector.reasons(rack_id)
+    
+    def _build_prediction(self, confidence: float, reasons: List[str]) -> Dict:
+        """Turn a failure confidence into a prediction record."""
+        confidence = min(confidence, 1.0)
         prediction_status = 'normal'
         predicted_failure_time = None
         
         if confidence >= 0.8:
             prediction_status = 'critical'
-            predicted_failure_time = datetime.now() + timedelta(minutes=30)
+            predicted_failure_time = self.clock() + timedelta(minutes=30)
         elif confidence >= 0.5:
             prediction_status = 'warning'
-            predicted_failure_time = datetime.now() + timedelta(hours=2)
+            predicted_failure_time = self.clock() + timedelta(hours=2)
         
-        self.predictions[rack_id] = {
+        return {
             'status': prediction_status,
             'confidence': confidence,
             'predicted_failure_time': predicted_failure_time,
             'reasons': reasons
         }
+    
+    def score_all(self) -> Dict[str, Dict]:
+        """Refresh predictions for every rack, once per simulation tick.
         
-        return self.predictions[rack_id]
+        With a trained model all racks are scored in a single batched call;
+        racks without enough history (or no model at all) use the rule-based
+        scorer. Staged change-point samples are applied to the fleet first,
+        and queued alert notifications go to the delivery thread if a batch is due.
+        """
+        self.change_detector.flush()
+        self.alerts.flush(self.clock())
+        
+        scores = {}
+        if self.predictor is not None and self.predictor.available:
+            scores = self.predictor.predict_proba()
+        
+        for rack_id in self.metric_history:
+            if rack_id in scores:
+                confidence = scores[rack_id]
+                reasons = [f"Failure model risk ({confidence*100:.0f}%)"] if confidence >= 0.5 else []
+                change_confidence, change_reasons = self._change_point_score(rack_id)
+                self.predictions[rack_id] = self._build_prediction(
+                    confidence + change_confidence, reasons + change_reasons
+                )
+            else:
+                self.predict_failures_rule_based(rack_id)
+        
+        return self.predictions
     
-    def analyze_rack(self, rack_id: str, temperature: float, vibration: float, power: float) -> dict:
-        """Analyze the current state of a rack based on its sensor readings."""
-        current_time = datetime.now()
+    def analyze_rack(self, rack_id: str, temperature: float, vibration: float, power: float,
+                     score: bool = True) -> dict:
+        """Analyze the current state of a rack based on its sensor readings.
+        
+        Pass ``score=False`` when ingesting a whole tick and call score_all()
+        afterwards, so predictions and change-point charts update in one batch.
+        """
+        current_time = self.clock()
         
         # Initialize history for new racks
         self.initialize_rack_history(rack_id)
         
-        # Update metric history
-        self.metric_history[rack_id]['temperature'].append(temperature)
-        self.metric_history[rack_id]['vibration'].append(vibration)
-        self.metric_history[rack_id]['power'].append(power)
-        self.metric_history[rack_id]['timestamps'].append(current_time)
+        # Update metric history, keeping the sample that fell out of the window for the rolling features
+        evicted = self.metric_history.append(rack_id, (temperature, vibration, power), current_time)
+        self.change_detector.stage(rack_id, (temperature, vibration, power))
         
         # Check immediate thresholds
         temp_status = 'normal'
@@ -152,24 +213,43 @@ class AnomalyDetector:
         elif power >= self.thresholds['power']['warning']:
             power_status = 'warning'
         
-        # Update alert history if not normal
         current_status = 'normal'
         if any(s == 'critical' for s in [temp_status, vib_status, power_status]):
             current_status = 'critical'
-            self.alert_history[rack_id].append((current_time, 'critical'))
         elif any(s == 'warning' for s in [temp_status, vib_status, power_status]):
             current_status = 'warning'
-            self.alert_history[rack_id].append((current_time, 'warning'))
+        
+        # Record alerts when they open or escalate, not on every sample over a threshold
+        transitions = self.alerts.observe(
+            rack_id,
+            {'temperature': temp_status, 'vibration': vib_status, 'power': power_status},
+            {'temperature': temperature, 'vibration': vibration, 'power': power},
+            current_time
+        )
+        alerted = False
+        for transition in transitions:
+            if transition['event'] in ('open', 'escalate'):
+                self.alert_history[rack_id].append((current_time, transition['severity']))
+                alerted = True
+        
+        if self.predictor is not None:
+            self.predictor.update(rack_id, (temperature, vibration, power), evicted, alert=alerted)
         
         # Clean up old alerts (older than 24 hours)
         cutoff_time = current_time - timedelta(hours=24)
-        self.alert_history[rack_id] = [
-            alert for alert in self.alert_history[rack_id]
-            if alert[0] > cutoff_time
-        ]
+        if self.alert_history[rack_id] and self.alert_history[rack_id][0][0] <= cutoff_time:
+            self.alert_history[rack_id] = [
+                alert for alert in self.alert_history[rack_id]
+                if alert[0] > cutoff_time
+            ]
         
         # Get prediction
-        prediction = self.predict_failures(rack_id)
+        if score:
+            self.change_detector.flush()
+            self.alerts.flush(current_time)
+            prediction = self.predict_failures(rack_id)
+        else:
+            prediction = self.predictions[rack_id]
         
         return {
             'status': current_status,
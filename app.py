@@ -2,28 +2,136 @@ import dash
 from dash import html, dcc, callback_context
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+from dash.exceptions import PreventUpdate
 import numpy as np
 from datetime import datetime, timedelta
-import json
-from anomaly_detector import AnomalyDetector
-from virtualization_manager import VirtualizationManager
+import os
+import threading
+
+# plotly, pandas, scikit-learn and the simulator modules are imported on first
+# use, so starting the app doesn't pay for them or for building the fleet
 
 # Initialize the Dash app with a modern theme
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
 app.config.suppress_callback_exceptions = True
 
-# Initialize the managers
-detector = AnomalyDetector()
-vm_manager = VirtualizationManager()
+# Flask debug mode (auto-reload and the in-browser debugger)
+DEBUG = True
 
 # Update interval (in milliseconds)
 UPDATE_INTERVAL = 5000  # 5 seconds
 
+# Simulator checkpointing
+SNAPSHOT_PATH = os.path.join('snapshots', 'simulator_state.npz')
+SNAPSHOT_INTERVAL = 60  # seconds
+
+# Alert notifications; set ALERT_WEBHOOK_URL to also POST batches to a webhook
+ALERT_LOG_PATH = os.path.join('logs', 'alerts.log')
+ALERT_WEBHOOK_URL = os.environ.get('ALERT_WEBHOOK_URL')
+
+# VM placement HTTP API, served next to the dashboard when fastapi is installed
+PLACEMENT_API_HOST = os.environ.get('PLACEMENT_API_HOST', '127.0.0.1')
+PLACEMENT_API_PORT = int(os.environ.get('PLACEMENT_API_PORT', 8000))
+
+# Held while a callback mutates simulator state, so snapshots see whole ticks
+state_lock = threading.Lock()
+
+# Checkpoint the fleet from whichever process builds the engine; only processes that serve
+# callbacks do. Under a WSGI server run a single worker, since each worker has its own fleet
+# and they would overwrite one another's checkpoint. Set SNAPSHOTS_ENABLED=0 to turn off.
+SNAPSHOTS_ENABLED = os.environ.get('SNAPSHOTS_ENABLED', '1') != '0'
+
+# Heatmap level of detail: racks are grouped into rows, halls or sites above this many cells
+HEATMAP_MAX_BINS = 200
+HEATMAP_DETAIL_RACKS = 50  # racks listed when a bin is clicked
+VM_PAGE_SIZE = 20  # VMs per page in the rack details panel
+HEATMAP_METRICS = [('CPU Usage', 'load'), ('Memory Usage', 'memory'), ('Network Load', 'network')]  # topology columns
+
+# Simulator engine, built by get_engine() on the first callback
+detector = None
+vm_manager = None
+collector = None
+snapshotter = None
+topology = None
+rack_details = None
+placement = None
+engine_lock = threading.Lock()
+
+def get_engine():
+    """Build the managers on first use; later calls return immediately."""
+    global detector, vm_manager, collector, snapshotter, topology, rack_details, placement
+    if vm_manager is not None:
+        return
+    with engine_lock:
+        if vm_manager is not None:
+            return
+        from alert_pipeline import LogFileSink, WebhookSink
+        from anomaly_detector import AnomalyDetector
+        from datacenter_topology import DataCenterTopology
+        from failure_predictor import FailurePredictor
+        from migration_scheduler import MigrationScheduler
+        from placement_service import PlacementService
+        from rack_details import RackDetailCache
+        from sensor_collector import SensorCollector, SimulatedSensorSource
+        from state_snapshot import SnapshotScheduler, load_snapshot
+        from virtualization_manager import VirtualizationManager
+        
+        # Initialize the managers
+        new_detector = AnomalyDetector(predictor=FailurePredictor())
+        new_detector.alerts.sinks.append(LogFileSink(ALERT_LOG_PATH))
+        if ALERT_WEBHOOK_URL:
+            new_detector.alerts.sinks.append(WebhookSink(ALERT_WEBHOOK_URL))
+        manager = VirtualizationManager()
+        
+        # Resume from the last checkpoint instead of re-randomizing the fleet
+        if os.path.exists(SNAPSHOT_PATH):
+            load_snapshot(SNAPSHOT_PATH, manager, new_detector)
+        
+        # Site/hall/row layout of the racks with incrementally maintained aggregates
+        new_topology = DataCenterTopology.from_layout(list(manager.get_server_status().keys()))
+        new_topology.sync(manager.get_server_status(), predictions=new_detector.predictions)
+        
+        # Live migrations share each row's top-of-row switch
+        manager.migration_scheduler = MigrationScheduler(
+            manager, link_of=lambda rack_id: new_topology.rack_paths[new_topology.rack_index[rack_id]]
+        )
+        
+        detector, topology = new_detector, new_topology
+        rack_details = RackDetailCache(manager, detector)
+        # Placement requests take the tick lock, so they never race a simulation step
+        placement = PlacementService(manager, lock=state_lock)
+        collector = SensorCollector(detector, [SimulatedSensorSource(manager)])
+        snapshotter = SnapshotScheduler(SNAPSHOT_PATH, manager, detector, SNAPSHOT_INTERVAL, lock=state_lock)
+        if SNAPSHOTS_ENABLED:
+            snapshotter.start()
+        vm_manager = manager  # published last: other threads check it without the lock
+
+def serve_placement_api():
+    """Serve the placement API once the engine exists (blocks)."""
+    from placement_service import FASTAPI_AVAILABLE, serve_api
+    if not FASTAPI_AVAILABLE:
+        return
+    get_engine()
+    serve_api(placement, PLACEMENT_API_HOST, PLACEMENT_API_PORT)
+
+def placeholder_figure(height, message="Loading..."):
+    """Empty figure shown until the first update fills the graph."""
+    return {
+        'data': [],
+        'layout': {
+            'height': height,
+            'xaxis': {'visible': False},
+            'yaxis': {'visible': False},
+            'annotations': [{'text': message, 'showarrow': False, 'font': {'size': 16, 'color': '#95a5a6'}}],
+            'paper_bgcolor': 'rgba(0,0,0,0)',
+            'plot_bgcolor': 'rgba(0,0,0,0)',
+        }
+    }
+
 # Simulated data for demonstration
 def generate_sample_data():
+    import pandas as pd
+    
     racks = [f"Rack-{i}" for i in range(1, 21)]
     data = {
         'rack_id': [],
@@ -68,63 +176,73 @@ def create_metric_card(title, value, color, icon, subtitle=None):
         className="mb-4 shadow-sm"
     )
 
-def create_rack_map():
-    """Create interactive rack map with status indicators."""
-    server_status = vm_manager.get_server_status()
+def create_rack_map(node=''):
+    """Create interactive rack map with status indicators, binned like the heatmap.
     
-    fig = go.Figure()
+    Up to HEATMAP_MAX_BINS racks get one marker each; larger fleets get one
+    marker per row/hall/site bin, colored by its worst rack. All markers go
+    in a single trace with numeric customdata, so the figure doesn't grow a
+    trace and a hover string per rack. Values come from the topology's
+    per-rack columns, refreshed once per tick by topology.sync().
+    """
+    import plotly.graph_objects as go
+    from datacenter_topology import bin_statistics
     
-    # Create a grid layout for racks
-    rows, cols = 4, 5
-    for idx, (rack_id, status) in enumerate(server_status.items()):
-        row_idx = idx // cols
-        col_idx = idx % cols
-        
-        # Get rack analysis
-        analysis = detector.analyze_rack(
-            rack_id,
-            status['temperature'],
-            np.random.normal(0.5, 0.2),  # Simulated vibration
-            np.random.normal(1000, 100)   # Simulated power
+    bins, binned = topology.bins(node, HEATMAP_MAX_BINS)
+    labels = [label for label, _, _ in bins]
+    
+    def column(metric):
+        return bin_statistics(topology.values[metric], bins)
+    
+    idle = column('idle')['mean']
+    critical = column('critical')['sum']
+    warning = column('warning')['sum']
+    temperature = column('temperature')
+    cpu = column('load')['mean']
+    memory = column('memory')['mean']
+    
+    # Worst prediction wins; gray only when every rack in the bin is idle
+    colors = np.select(
+        [critical > 0, warning > 0, idle >= 1],
+        ['#e74c3c', '#f1c40f', '#95a5a6'],  # Red, yellow, gray
+        '#2ecc71'  # Green
+    )
+    
+    if binned:
+        # Bins have no physical position; lay them out in a square grid
+        columns = int(np.ceil(np.sqrt(len(bins))))
+        x = [i % columns for i in range(len(bins))]
+        y = [i // columns for i in range(len(bins))]
+        hovertemplate = (
+            "<b>%{text}</b><br>Racks: %{customdata[3]}<br>" +
+            "Temperature: mean %{customdata[0]:.1f}°C<br>" +
+            "CPU Usage: mean %{customdata[1]:.1f}%<br>" +
+            "Memory Usage: mean %{customdata[2]:.1f}%<br>" +
+            "Critical: %{customdata[4]}, warning: %{customdata[5]}<br>" +
+            "Click to drill down<extra></extra>"
         )
-        
-        # Determine color based on prediction and status
-        if analysis['prediction']['status'] == 'critical':
-            color = '#e74c3c'  # Red
-        elif analysis['prediction']['status'] == 'warning':
-            color = '#f1c40f'  # Yellow
-        elif status['power_state'] == 'idle':
-            color = '#95a5a6'  # Gray
-        else:
-            color = '#2ecc71'  # Green
-        
-        # Create hover text with prediction information
-        hover_text = (
-            f"<b>{rack_id}</b><br>" +
-            f"Temperature: {status['temperature']:.1f}°C<br>" +
-            f"CPU Usage: {status['cpu_usage']:.1f}%<br>" +
-            f"Memory Usage: {status['memory_usage']:.1f}%<br>" +
-            f"Power State: {status['power_state'].title()}<br>"
+    else:
+        # Lay racks out by their row in the topology
+        positions = [topology.position(label) for label in labels]
+        x = [col_idx for _, col_idx in positions]
+        y = [row_idx for row_idx, _ in positions]
+        hovertemplate = (
+            "<b>%{text}</b><br>" +
+            "Temperature: %{customdata[0]:.1f}°C<br>" +
+            "CPU Usage: %{customdata[1]:.1f}%<br>" +
+            "Memory Usage: %{customdata[2]:.1f}%<br>" +
+            "Click for details<extra></extra>"
         )
-        
-        if analysis['prediction']['status'] != 'normal':
-            hover_text += (
-                f"<br><b>Prediction:</b><br>" +
-                f"Status: {analysis['prediction']['status'].title()}<br>" +
-                f"Confidence: {analysis['prediction']['confidence']*100:.1f}%<br>" +
-                "Reasons:<br>" +
-                "<br>".join(f"- {r}" for r in analysis['prediction']['reasons'])
-            )
-        
-        fig.add_trace(go.Scatter(
-            x=[col_idx],
-            y=[row_idx],
-            mode='markers+text',
-            name=rack_id,
-            text=[rack_id],
-            marker=dict(size=40, color=color, symbol='square'),
-            hovertemplate=hover_text + "<extra></extra>"
-        ))
+    
+    fig = go.Figure(go.Scatter(
+        x=x,
+        y=y,
+        mode='markers' if binned else 'markers+text',
+        text=labels,
+        marker=dict(size=24 if binned else 40, color=colors, symbol='square'),
+        customdata=np.stack([temperature['mean'], cpu, memory, temperature['count'], critical, warning], axis=-1),
+        hovertemplate=hovertemplate
+    ))
     
     fig.update_layout(
         showlegend=False,
@@ -138,59 +256,54 @@ def create_rack_map():
     
     return fig
 
-def create_server_load_visualization():
-    """Create heatmap of server loads with VM allocation."""
-    server_status = vm_manager.get_server_status()
+def create_server_load_visualization(node=''):
+    """Create heatmap of server loads, binned by row/hall/site for large fleets.
     
-    # Prepare data for heatmap
-    racks = list(server_status.keys())
-    metrics = ['CPU Usage', 'Memory Usage', 'Network Load']
+    Cells carry only numeric statistics, read from the topology's per-rack
+    columns; per-rack and per-VM details are built by create_bin_details()
+    when a cell is clicked.
+    """
+    import plotly.graph_objects as go
+    from datacenter_topology import bin_statistics
+    
+    bins, binned = topology.bins(node, HEATMAP_MAX_BINS)
+    labels = [label for label, _, _ in bins]
+    
+    vm_totals = bin_statistics(topology.values['vms'], bins)['sum']
     
     z_data = []
-    hover_text = []
-    
-    for metric in metrics:
-        metric_data = []
-        hover_row = []
-        for rack in racks:
-            if metric == 'CPU Usage':
-                value = server_status[rack]['cpu_usage']
-            elif metric == 'Memory Usage':
-                value = server_status[rack]['memory_usage']
-            else:
-                value = server_status[rack]['network_load']
-            
-            metric_data.append(value)
-            
-            # Create hover text with VM information
-            vms = server_status[rack]['virtual_machines']
-            vm_text = "<br>".join([
-                f"VM: {vm['id']} (from {vm['source_server']})"
-                for vm in vms
-            ])
-            
-            hover_row.append(
-                f"Rack: {rack}<br>" +
-                f"{metric}: {value:.1f}%<br>" +
-                f"Power State: {server_status[rack]['power_state']}<br>" +
-                (f"Hosted VMs:<br>{vm_text}" if vm_text else "No VMs")
-            )
-        
-        z_data.append(metric_data)
-        hover_text.append(hover_row)
+    customdata = []
+    for metric, key in HEATMAP_METRICS:
+        stats = bin_statistics(topology.values[key], bins)
+        z_data.append(stats['mean'])
+        customdata.append(np.stack([stats['max'], stats['p95'], stats['count'], vm_totals], axis=-1))
+    
+    if binned:
+        hovertemplate = (
+            "<b>%{x}</b><br>%{y}: mean %{z:.1f}%<br>" +
+            "Max: %{customdata[0]:.1f}%, p95: %{customdata[1]:.1f}%<br>" +
+            "Racks: %{customdata[2]}, VMs: %{customdata[3]}<br>" +
+            "Click to drill down<extra></extra>"
+        )
+    else:
+        hovertemplate = (
+            "<b>%{x}</b><br>%{y}: %{z:.1f}%<br>" +
+            "Hosted VMs: %{customdata[3]}<br>" +
+            "Click for VM details<extra></extra>"
+        )
     
     fig = go.Figure(data=go.Heatmap(
         z=z_data,
-        x=racks,
-        y=metrics,
+        x=labels,
+        y=[metric for metric, _ in HEATMAP_METRICS],
         colorscale='Viridis',
         hoverongaps=False,
-        hovertemplate="%{customdata}<extra></extra>",
-        customdata=hover_text
+        hovertemplate=hovertemplate,
+        customdata=customdata
     ))
     
     fig.update_layout(
-        title='Server Resource Utilization Heatmap',
+        title=f"Server Resource Utilization Heatmap: {node or 'All sites'}" + (" (mean per bin)" if binned else ""),
         height=300,
         margin=dict(l=50, r=20, t=50, b=20),
         paper_bgcolor='rgba(0,0,0,0)',
@@ -199,7 +312,61 @@ def create_server_load_visualization():
     
     return fig
 
+def create_bin_details(label):
+    """Aggregates and children of a clicked heatmap bin, or the VMs of a clicked rack."""
+    server_status = vm_manager.get_server_status()
+    bin_range = topology.range_of(label)
+    if bin_range is None:
+        # First page only; the rack details panel pages through the rest
+        vm_page = rack_details.vm_page(label, 0, HEATMAP_DETAIL_RACKS)
+        vms = vm_page['items']
+        return dbc.Card(dbc.CardBody([
+            html.H5(f"{label}: {vm_page['total']} VMs", className="card-title"),
+            dbc.ListGroup([
+                dbc.ListGroupItem(f"{vm['id']} (from {vm['source_server']}), load {vm['cpu_load']:.1f}%")
+                for vm in vms
+            ], flush=True) if vms else "No VMs",
+            html.Small(f"and {vm_page['total'] - len(vms)} more, see Rack Details", className="text-muted")
+            if vm_page['total'] > len(vms) else None
+        ]), className="shadow-sm")
+    
+    start, end = bin_range
+    summary = topology.aggregate(label)
+    if label in topology.ranges and topology.children[label]:
+        # A site or hall: O(log n) aggregates of each child from the topology trees
+        children = topology.drill_down(label)
+        items = [
+            f"{child['node']}: {child['racks']} racks, CPU {child['avg_load']:.1f}%, "
+            f"{child['total_power'] / 1000:.1f} kW, max {child['max_temperature']:.1f}°C, {child['alerts']} alerts"
+            for child in children[:HEATMAP_DETAIL_RACKS]
+        ]
+        total = len(children)
+    else:
+        # A row or chunk of racks: busiest racks first, capped so a large bin stays a small payload
+        busiest = start + np.argsort(-topology.values['load'][start:end], kind='stable')[:HEATMAP_DETAIL_RACKS]
+        items = [
+            f"{r}: CPU {server_status[r]['cpu_usage']:.1f}%, "
+            f"{len(server_status[r]['virtual_machines'])} VMs, {server_status[r]['power_state']}"
+            for r in (topology.rack_ids[i] for i in busiest.tolist())
+        ]
+        total = end - start
+    
+    return dbc.Card(dbc.CardBody([
+        html.H5(f"{label}: {summary['racks']} racks", className="card-title"),
+        html.P(
+            f"CPU {summary['avg_load']:.1f}% mean, {summary['total_power'] / 1000:.1f} kW, "
+            f"hottest {summary['hottest_rack']} at {summary['max_temperature']:.1f}°C, "
+            f"{summary['vms']} VMs, {summary['alerts']} open alerts, "
+            f"{summary['critical_racks']} critical / {summary['warning_racks']} warning racks",
+            className="card-text"
+        ),
+        dbc.ListGroup([dbc.ListGroupItem(item) for item in items], flush=True),
+        html.Small(f"and {total - len(items)} more", className="text-muted") if total > len(items) else None
+    ]), className="shadow-sm")
+
 def create_load_distribution_chart():
+    import plotly.graph_objects as go
+    
     df = generate_sample_data()
     latest_data = df.groupby('rack_id').first().reset_index()
     
@@ -250,7 +417,8 @@ def create_monitoring_tab():
         dbc.Row([
             dbc.Col([
                 html.H3("Data Center Rack Status", className="my-4"),
-                dcc.Graph(id='rack-map', figure=create_rack_map(), config={'displayModeBar': False}),
+                dbc.Button("All sites", id='rack-map-reset', color="secondary", outline=True, size="sm", className="mb-2"),
+                dcc.Graph(id='rack-map', figure=placeholder_figure(500), config={'displayModeBar': False}),
             ], width=12)
         ]),
         
@@ -259,7 +427,13 @@ def create_monitoring_tab():
                 html.H3("Rack Details", className="my-4"),
                 dbc.Card(
                     dbc.CardBody([
-                        html.Div(id='rack-details'),
+                        html.Div("Click on a rack to see details", id='rack-details'),
+                        html.Div([
+                            html.H5("Virtual Machines", className="mt-4 mb-3"),
+                            html.Div(id='rack-vm-list'),
+                            dbc.Pagination(id='vm-page', max_value=1, active_page=1, fully_expanded=False,
+                                           className="mt-2"),
+                        ], id='rack-vm-section', style={'display': 'none'}),
                         html.Div([
                             dbc.Button("Repair", color="primary", className="me-2", id="repair-btn"),
                             dbc.Button("Replace", color="danger", id="replace-btn"),
@@ -277,14 +451,16 @@ def create_virtualization_tab():
         dbc.Row([
             dbc.Col([
                 html.H3("Server Resource Utilization", className="my-4"),
-                dcc.Graph(figure=create_server_load_visualization(), config={'displayModeBar': False}),
+                dbc.Button("All sites", id='heatmap-reset', color="secondary", outline=True, size="sm", className="mb-2"),
+                dcc.Graph(id='server-load-viz', figure=placeholder_figure(300), config={'displayModeBar': False}),
+                html.Div(id='bin-details', className="mt-3"),
             ], width=12),
         ]),
         
         dbc.Row([
             dbc.Col([
                 html.H3("Load Distribution", className="my-4"),
-                dcc.Graph(figure=create_load_distribution_chart(), config={'displayModeBar': False}),
+                dcc.Graph(id='load-distribution', figure=placeholder_figure(300), config={'displayModeBar': False}),
             ], width=12),
         ]),
         
@@ -333,41 +509,146 @@ app.layout = dbc.Container([
         n_intervals=0
     ),
     
-    html.Div(id='maintenance-alert', className="mt-3")
+    # Rack, versions and VM page the details panel currently shows
+    dcc.Store(id='rack-details-version'),
+    
+    # Topology node the heatmap is drilled into ('' for all sites)
+    dcc.Store(id='heatmap-node', data=''),
 ], fluid=True, className="px-4")
 
 # Callbacks
 @app.callback(
     [Output('rack-map', 'figure'),
      Output('server-load-viz', 'figure')],
-    [Input('interval-component', 'n_intervals')]
+    [Input('interval-component', 'n_intervals'),
+     Input('heatmap-node', 'data')]
 )
-def update_graphs(n):
+def update_graphs(n, heatmap_node):
     """Update all graphs with latest data."""
-    vm_manager.update_server_loads()
-    vm_manager.optimize_workload()
+    get_engine()
+    triggered = {t['prop_id'] for t in callback_context.triggered}
+    with state_lock:
+        if triggered != {'heatmap-node.data'}:
+            # Drilling in redraws both maps without advancing the simulation
+            vm_manager.update_server_loads()
+            vm_manager.optimize_workload()
+            
+            # Collect this tick's sensor readings; the collector scores the fleet in one batch
+            collector.collect()
+            topology.sync(
+                vm_manager.get_server_status(), collector.latest,
+                detector.alerts.open_counts, detector.predictions
+            )
+        
+        return create_rack_map(heatmap_node or ''), create_server_load_visualization(heatmap_node or '')
+
+@app.callback(
+    [Output('heatmap-node', 'data'),
+     Output('bin-details', 'children')],
+    [Input('server-load-viz', 'clickData'),
+     Input('rack-map', 'clickData'),
+     Input('heatmap-reset', 'n_clicks'),
+     Input('rack-map-reset', 'n_clicks')],
+    [State('heatmap-node', 'data')]
+)
+def select_heatmap_bin(clickData, rack_clickData, reset_clicks, rack_reset_clicks, heatmap_node):
+    """Drill into a clicked row/hall/site bin of either map and load its details on demand."""
+    triggered = callback_context.triggered[0]['prop_id'].split('.')[0] if callback_context.triggered else None
+    if triggered in ('heatmap-reset', 'rack-map-reset') or not (clickData or rack_clickData):
+        return '', None
     
-    return create_rack_map(), create_server_load_visualization()
+    get_engine()
+    if triggered == 'rack-map':
+        label = rack_clickData['points'][0]['text']
+        if topology.range_of(label) is None:
+            raise PreventUpdate  # a single rack; update_rack_details shows it
+    else:
+        label = clickData['points'][0]['x']
+    with state_lock:
+        details = create_bin_details(label)
+    return (label if topology.range_of(label) is not None else heatmap_node), details
 
 @app.callback(
-    Output('rack-details', 'children'),
+    Output('load-distribution', 'figure'),
+    [Input('tabs', 'active_tab')],
+    [State('load-distribution', 'figure')]
+)
+def update_load_distribution(active_tab, figure):
+    """Build the load distribution chart when its tab is first opened."""
+    # The placeholder has no traces; once the chart is built, later tab switches keep it
+    if active_tab != 'virtualization' or (figure and figure.get('data')):
+        raise PreventUpdate
+    return create_load_distribution_chart()
+
+@app.callback(
+    [Output('rack-details', 'children'),
+     Output('rack-vm-list', 'children'),
+     Output('rack-vm-section', 'style'),
+     Output('vm-page', 'max_value'),
+     Output('vm-page', 'active_page'),
+     Output('rack-details-version', 'data')],
     [Input('rack-map', 'clickData'),
-     Input('interval-component', 'n_intervals')]
+     Input('interval-component', 'n_intervals'),
+     Input('vm-page', 'active_page')],
+    [State('rack-details-version', 'data')]
 )
-def update_rack_details(clickData, n):
+def update_rack_details(clickData, n, active_page, rendered):
+    """Re-render the selected rack only when its versioned record changes."""
     if not clickData:
-        return "Click on a rack to see details"
+        raise PreventUpdate
     
     rack_id = clickData['points'][0]['text']
-    server_status = vm_manager.get_server_status()[rack_id]
-    
-    # Get analysis from anomaly detector
-    analysis = detector.analyze_rack(
-        rack_id,
-        server_status['temperature'],
-        np.random.normal(0.5, 0.2),  # Simulated vibration
-        np.random.normal(1000, 100)   # Simulated power
+    get_engine()
+    if rack_id not in vm_manager.servers:
+        raise PreventUpdate  # a binned rack map marker; select_heatmap_bin drills into it
+    rendered = rendered or {}
+    same_rack = rendered.get('rack_id') == rack_id
+    page = (active_page or 1) - 1 if same_rack else 0
+    
+    with state_lock:
+        record = rack_details.get(rack_id)
+        vm_page = rack_details.vm_page(rack_id, page, VM_PAGE_SIZE)
+    
+    summary_changed = not same_rack or rendered.get('version') != record['version']
+    vms_changed = (not same_rack or rendered.get('vm_version') != vm_page['vm_version']
+                   or rendered.get('page') != vm_page['page'])
+    if not summary_changed and not vms_changed:
+        raise PreventUpdate
+    
+    return (
+        create_rack_summary(record) if summary_changed else dash.no_update,
+        create_vm_list(vm_page) if vms_changed else dash.no_update,
+        {'display': 'block'},
+        vm_page['pages'],
+        vm_page['page'] + 1,
+        {'rack_id': rack_id, 'version': record['version'], 'vm_version': vm_page['vm_version'],
+         'page': vm_page['page']}
     )
+
+def create_vm_list(vm_page):
+    """One page of a rack's VMs."""
+    if not vm_page['total']:
+        return "No virtual machines"
+    first = vm_page['page'] * VM_PAGE_SIZE
+    return html.Div([
+        html.Small(f"VMs {first + 1}-{first + len(vm_page['items'])} of {vm_page['total']}",
+                   className="text-muted"),
+        dbc.ListGroup([
+            dbc.ListGroupItem(
+                [
+                    html.Div(f"VM: {vm['id']}", className="fw-bold"),
+                    html.Small(f"From: {vm['source_server']}"),
+                    html.Div(f"Load: {vm['cpu_load']:.1f}%")
+                ]
+            ) for vm in vm_page['items']
+        ], className="mt-2")
+    ])
+
+def create_rack_summary(record):
+    """Status, hardware metrics and prediction of one rack from its detail record."""
+    rack_id = record['rack_id']
+    server_status = record
+    analysis = {'prediction': record['prediction']}
     
     # Create status color
     status_color = {
@@ -384,7 +665,7 @@ def update_rack_details(clickData, n):
             [
                 html.H5("Current Status", className="alert-heading"),
                 html.P(f"Power State: {server_status['power_state'].title()}", className="mb-0"),
-                html.P(f"VM Hosting: {'Yes' if server_status['virtual_machines'] else 'No'}", className="mb-0")
+                html.P(f"VM Hosting: {'Yes' if server_status['vm_count'] else 'No'}", className="mb-0")
             ],
             color=status_color,
             className="mb-3"
@@ -411,21 +692,7 @@ def update_rack_details(clickData, n):
                     f"Network Load: {server_status['network_load']:.1f}%"
                 ]),
             ], width=6),
-            
-            dbc.Col([
-                html.H5("Virtual Machines", className="mb-3"),
-                html.Div([
-                    dbc.ListGroup([
-                        dbc.ListGroupItem(
-                            [
-                                html.Div(f"VM: {vm['id']}", className="fw-bold"),
-                                html.Small(f"From: {vm['source_server']}"),
-                                html.Div(f"Load: {vm['cpu_load']:.1f}%")
-                            ]
-                        ) for vm in server_status['virtual_machines']
-                    ]) if server_status['virtual_machines'] else "No virtual machines"
-                ])
-            ], width=6),
+
         ]),
         
         # Prediction Information
@@ -449,14 +716,7 @@ def update_rack_details(clickData, n):
                 color=status_color
             )
         ]) if analysis['prediction']['status'] != 'normal' else None,
-        
-        # Action Buttons
-        html.Div([
-            dbc.Button("Repair", color="primary", className="me-2", id="repair-btn"),
-            dbc.Button("Replace", color="danger", id="replace-btn"),
-        ], className="mt-3"),
-        
-        html.Div(id='maintenance-alert', className="mt-3"),
+
     ])
 
 @app.callback(
@@ -473,16 +733,25 @@ def handle_maintenance(repair_clicks, replace_clicks, clickData):
     # Get the clicked rack
     rack_id = clickData['points'][0]['text']
     button_id = callback_context.triggered[0]['prop_id'].split('.')[0]
+    get_engine()
+    if rack_id not in vm_manager.servers:
+        return None  # a binned rack map marker, not a rack
     
     if button_id == 'repair-btn' and repair_clicks:
-        vm_manager.start_maintenance(rack_id, 'repair')
+        with state_lock:
+            vm_manager.start_maintenance(rack_id, 'repair')
+            detector.alerts.acknowledge(rack_id, timestamp=detector.clock())
+            detector.change_detector.reset(rack_id)  # relearn the baseline on the repaired hardware
         return dbc.Alert(
             f"Repair started for {rack_id}. This will take 1 minute.",
             color="info",
             duration=60000  # Alert will disappear after 60 seconds
         )
     elif button_id == 'replace-btn' and replace_clicks:
-        vm_manager.start_maintenance(rack_id, 'replace')
+        with state_lock:
+            vm_manager.start_maintenance(rack_id, 'replace')
+            detector.alerts.acknowledge(rack_id, timestamp=detector.clock())
+            detector.change_detector.reset(rack_id)  # relearn the baseline on the repaired hardware
         return dbc.Alert(
             f"Replacement started for {rack_id}. This will take 1 minute.",
             color="warning",
@@ -492,4 +761,12 @@ def handle_maintenance(repair_clicks, replace_clicks, clickData):
     return None
 
 if __name__ == '__main__':
-    app.run_server(debug=True) 
\ No newline at end of file
+    # Debug mode runs this module twice: a reloader parent that only watches files and the
+    # child that serves requests. Only the serving process builds the fleet, snapshots it
+    # and binds the API port; a parent snapshotter would overwrite the checkpoint with a
+    # fleet that never ticks.
+    if not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Build the fleet in the background so the first page load doesn't wait for it
+        threading.Thread(target=get_engine, daemon=True).start()
+        threading.Thread(target=serve_placement_api, daemon=True).start()
+    app.run_server(debug=DEBUG) 
\ No newline at end of file
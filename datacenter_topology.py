@@ -0,0 +1,318 @@
+import string
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Per-rack columns, each with a Fenwick tree; idle/critical/warning are 0/1 flags, so their sums count racks
+AGGREGATE_METRICS = (
+    'load', 'memory', 'network', 'vms', 'idle', 'critical', 'warning', 'power', 'temperature', 'alerts'
+)
+CHUNK_SEPARATOR = ' .. '  # between the first and last rack of a chunk label from bins()
+
+
+class FenwickTree:
+    """Prefix sums with O(log n) point updates and range queries."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = np.zeros(size + 1)
+
+    def build(self, values: np.ndarray):
+        """Rebuild from scratch in O(n), vectorized."""
+        prefix = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+        index = np.arange(1, self.size + 1)
+        self.tree[1:] = prefix[index] - prefix[index - (index & -index)]
+
+    def add(self, position: int, delta: float):
+        i = position + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, end: int) -> float:
+        """Sum of positions [0, end)."""
+        total, i = 0.0, end
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, start: int, end: int) -> float:
+        return self.prefix(end) - self.prefix(start)
+
+
+class MaxSegmentTree:
+    """Range maximum with its position, O(log n) point updates and queries."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.leaves = 1 << max(size - 1, 0).bit_length()
+        self.values = np.full(2 * self.leaves, -np.inf)
+        self.index = np.full(2 * self.leaves, -1, dtype=np.int64)
+        self.index[self.leaves:self.leaves + size] = np.arange(size)
+
+    def build(self, values: np.ndarray):
+        """Rebuild from scratch in O(n), one vectorized pass per level."""
+        self.values[self.leaves:self.leaves + self.size] = values
+        low = self.leaves
+        while low > 1:
+            parents = np.arange(low // 2, low)
+            left, right = 2 * parents, 2 * parents + 1
+            take_left = self.values[left] >= self.values[right]
+            self.values[parents] = np.where(take_left, self.values[left], self.values[right])
+            self.index[parents] = np.where(take_left, self.index[left], self.index[right])
+            low //= 2
+
+    def update(self, position: int, value: float):
+        node = position + self.leaves
+        self.values[node] = value
+        node //= 2
+        while node:
+            left, right = 2 * node, 2 * node + 1
+            child = left if self.values[left] >= self.values[right] else right
+            self.values[node] = self.values[child]
+            self.index[node] = self.index[child]
+            node //= 2
+
+    def query(self, start: int, end: int) -> Tuple[float, int]:
+        """Maximum over positions [start, end) and the position holding it."""
+        best, best_index = -np.inf, -1
+        low, high = start + self.leaves, end + self.leaves
+        while low < high:
+            if low & 1:
+                if self.values[low] > best:
+                    best, best_index = self.values[low], self.index[low]
+                low += 1
+            if high & 1:
+                high -= 1
+                if self.values[high] > best:
+                    best, best_index = self.values[high], self.index[high]
+            low //= 2
+            high //= 2
+        return float(best), int(best_index)
+
+
+class DataCenterTopology:
+    """Site -> hall -> row -> rack -> host hierarchy with incremental aggregates.
+
+    Racks are numbered contiguously in topology order, so every site, hall and
+    row covers one range of rack positions. Each metric is a column indexed by
+    rack position with a Fenwick tree over it (plus a segment tree for the
+    hottest rack), making any node's aggregate an O(log n) query. The
+    dashboard reads its maps from these columns, refreshed once per tick by
+    ``sync``, instead of scanning the server dicts on every redraw.
+    """
+
+    def __init__(self, rack_ids: Sequence[str], paths: Sequence[Tuple[str, str, str]], hosts_per_rack: int = 1):
+        self.rack_ids = list(rack_ids)
+        self.rack_index = {rack_id: i for i, rack_id in enumerate(self.rack_ids)}
+        self.hosts_per_rack = hosts_per_rack
+        n = len(self.rack_ids)
+
+        # Node path ('DC-1', 'DC-1/Hall-A', 'DC-1/Hall-A/Row-1') -> [start, end) rack range
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+        self.children: Dict[str, List[str]] = {'': []}
+        self.rack_paths: List[str] = []
+        self.rack_rows: List[int] = []  # global row number of each rack, for grid layouts
+        for i, (site, hall, row) in enumerate(paths):
+            parent = ''
+            for node in (site, f'{site}/{hall}', f'{site}/{hall}/{row}'):
+                if node not in self.ranges:
+                    self.ranges[node] = (i, i + 1)
+                    self.children[parent].append(node)
+                    self.children[node] = []
+                else:
+                    start, end = self.ranges[node]
+                    if end != i:
+                        raise ValueError(f"Racks of {node} are not contiguous")
+                    self.ranges[node] = (start, i + 1)
+                parent = node
+            new_row = not self.rack_paths or self.rack_paths[-1] != parent
+            self.rack_rows.append((self.rack_rows[-1] if self.rack_rows else -1) + int(new_row))
+            self.rack_paths.append(parent)
+
+        self.values = {metric: np.zeros(n) for metric in AGGREGATE_METRICS}
+        self.sums = {metric: FenwickTree(n) for metric in AGGREGATE_METRICS}
+        self.hottest = MaxSegmentTree(n)
+        self.hottest.build(self.values['temperature'])
+
+    @classmethod
+    def from_layout(cls, rack_ids: Sequence[str], racks_per_row: int = 5, rows_per_hall: int = 4,
+                    halls_per_site: int = 26, hosts_per_rack: int = 1) -> 'DataCenterTopology':
+        """Lay racks out in order: fill a row, then a hall, then a site."""
+        paths = []
+        for i in range(len(rack_ids)):
+            row, hall = i // racks_per_row, i // (racks_per_row * rows_per_hall)
+            site = hall // halls_per_site
+            paths.append((
+                f'DC-{site + 1}',
+                f'Hall-{_hall_letter(hall % halls_per_site)}',
+                f'Row-{row % rows_per_hall + 1}'
+            ))
+        return cls(rack_ids, paths, hosts_per_rack)
+
+    def hosts(self, rack_id: str) -> List[str]:
+        return [f'{rack_id}/Host-{h + 1}' for h in range(self.hosts_per_rack)]
+
+    def position(self, rack_id: str) -> Tuple[int, int]:
+        """Grid position (global row, slot in row) of a rack for the rack map."""
+        i = self.rack_index[rack_id]
+        row_start, _ = self.ranges[self.rack_paths[i]]
+        return self.rack_rows[i], i - row_start
+
+    def update_rack(self, rack_id: str, **metrics: float):
+        """Point update of one rack, e.g. update_rack('Rack-3', load=42.0, alerts=1)."""
+        i = self.rack_index[rack_id]
+        for metric, value in metrics.items():
+            delta = value - self.values[metric][i]
+            if delta:
+                self.values[metric][i] = value
+                self.sums[metric].add(i, delta)
+                if metric == 'temperature':
+                    self.hottest.update(i, value)
+
+    def update_metric(self, metric: str, values: np.ndarray):
+        """Replace a whole metric column, touching only the racks that changed.
+
+        When many racks changed a vectorized O(n) rebuild is cheaper than
+        O(log n) point updates for each of them.
+        """
+        values = np.asarray(values, dtype=float)
+        changed = np.flatnonzero(values != self.values[metric])
+        if len(changed) == 0:
+            return
+        if len(changed) * max(len(values).bit_length(), 1) > len(values):
+            self.values[metric] = values.copy()
+            self.sums[metric].build(values)
+            if metric == 'temperature':
+                self.hottest.build(values)
+            return
+        for i in changed.tolist():
+            self.update_rack(self.rack_ids[i], **{metric: float(values[i])})
+
+    def sync(self, server_status: Dict[str, Dict], readings: Optional[Dict[str, Dict[str, float]]] = None,
+             alert_counts: Optional[Dict[str, int]] = None, predictions: Optional[Dict[str, Dict]] = None):
+        """Refresh aggregates from the simulator, collector readings, alert counts and predictions."""
+        servers = [server_status[r] for r in self.rack_ids]
+        self.update_metric('load', [s['cpu_usage'] for s in servers])
+        self.update_metric('memory', [s['memory_usage'] for s in servers])
+        self.update_metric('network', [s['network_load'] for s in servers])
+        self.update_metric('vms', [len(s['virtual_machines']) for s in servers])
+        self.update_metric('idle', [s['power_state'] == 'idle' for s in servers])
+        self.update_metric('temperature', [s['temperature'] for s in servers])
+        if readings is not None:
+            self.update_metric('power', [readings.get(r, {}).get('power', 0.0) for r in self.rack_ids])
+        if alert_counts is not None:
+            self.update_metric('alerts', [alert_counts.get(r, 0) for r in self.rack_ids])
+        if predictions is not None:
+            status = [predictions.get(r, {}).get('status') for r in self.rack_ids]
+            self.update_metric('critical', [p == 'critical' for p in status])
+            self.update_metric('warning', [p == 'warning' for p in status])
+
+    def aggregate(self, node: str) -> Dict:
+        """Aggregates of a site, hall, row or bins() chunk in O(log n), e.g. aggregate('DC-1/Hall-B/Row-7')."""
+        start, end = self.range_of(node)
+        count = end - start
+        temperature_max, hottest = self.hottest.query(start, end)
+        return {
+            'racks': count,
+            'hosts': count * self.hosts_per_rack,
+            'total_load': self.sums['load'].range_sum(start, end),
+            'avg_load': self.sums['load'].range_sum(start, end) / count,
+            'avg_memory': self.sums['memory'].range_sum(start, end) / count,
+            'total_power': self.sums['power'].range_sum(start, end),
+            'avg_temperature': self.sums['temperature'].range_sum(start, end) / count,
+            'max_temperature': temperature_max,
+            'hottest_rack': self.rack_ids[hottest],
+            'alerts': int(self.sums['alerts'].range_sum(start, end)),
+            'vms': int(self.sums['vms'].range_sum(start, end)),
+            'idle_racks': int(self.sums['idle'].range_sum(start, end)),
+            'critical_racks': int(self.sums['critical'].range_sum(start, end)),
+            'warning_racks': int(self.sums['warning'].range_sum(start, end)),
+        }
+
+    def range_of(self, label: str) -> Optional[Tuple[int, int]]:
+        """Rack range of a node or of a chunk label from bins(); None for a single rack."""
+        if label in self.ranges:
+            return self.ranges[label]
+        first, separator, last = label.partition(CHUNK_SEPARATOR)
+        if separator and first in self.rack_index and last in self.rack_index:
+            return self.rack_index[first], self.rack_index[last] + 1
+        return None
+
+    def bins(self, node: str = '', max_bins: int = 200) -> Tuple[List[Tuple[str, int, int]], bool]:
+        """Finest level under a node with at most ``max_bins`` bins, as (label, start, end) ranges.
+
+        The racks themselves when there are few enough, otherwise rows, halls
+        or sites. A node whose children can't be used (none, e.g. one long
+        row, or too many) is split into ``max_bins`` contiguous chunks of
+        racks labelled 'first .. last'; a chunk of one rack keeps the rack's
+        name. Bins are contiguous and cover the node's racks in order. The
+        flag is False only when every bin is one rack in its own right, so
+        callers can lay bins out without inspecting labels.
+        """
+        start, end = self.range_of(node) if node else (0, len(self.rack_ids))
+        if end - start <= max_bins:
+            return [(self.rack_ids[i], i, i + 1) for i in range(start, end)], False
+
+        level = self.children.get(node, [])
+        if not level or len(level) > max_bins:
+            edges = np.linspace(start, end, max_bins + 1).round().astype(np.int64).tolist()
+            return [(self._chunk_label(a, b), a, b) for a, b in zip(edges, edges[1:]) if b > a], True
+        while True:
+            deeper = [child for parent in level for child in self.children[parent]]
+            if not deeper or len(deeper) > max_bins:
+                break
+            level = deeper
+        return [(label, *self.ranges[label]) for label in level], True
+
+    def _chunk_label(self, start: int, end: int) -> str:
+        if end - start == 1:
+            return self.rack_ids[start]
+        return f'{self.rack_ids[start]}{CHUNK_SEPARATOR}{self.rack_ids[end - 1]}'
+
+    def drill_down(self, node: str = '') -> List[Dict]:
+        """Aggregates of the children of a node (sites for the root, racks for a row)."""
+        if node in self.ranges and not self.children[node]:
+            start, end = self.ranges[node]
+            return [
+                {
+                    'node': self.rack_ids[i],
+                    **{metric: float(self.values[metric][i]) for metric in AGGREGATE_METRICS},
+                    'hosts': self.hosts(self.rack_ids[i]),
+                }
+                for i in range(start, end)
+            ]
+        return [{'node': child, **self.aggregate(child)} for child in self.children[node]]
+
+
+def bin_statistics(values: np.ndarray, bins: Sequence[Tuple[str, int, int]]) -> Dict[str, np.ndarray]:
+    """Sum, mean, max and 95th percentile of ``values`` over contiguous bins, vectorized.
+
+    ``values`` is indexed by rack position; ``bins`` comes from DataCenterTopology.bins().
+    """
+    starts = np.array([start for _, start, _ in bins], dtype=np.int64)
+    ends = np.array([end for _, _, end in bins], dtype=np.int64)
+    values = np.asarray(values, dtype=float)[starts[0]:ends[-1]]
+    offsets, counts = starts - starts[0], ends - starts
+
+    # Sort within each bin, then read the p95 sample at its offset
+    bin_ids = np.repeat(np.arange(len(bins)), counts)
+    ordered = values[np.lexsort((values, bin_ids))]
+    sums = np.add.reduceat(values, offsets)
+    return {
+        'sum': sums,
+        'mean': sums / counts,
+        'max': np.maximum.reduceat(values, offsets),
+        'p95': ordered[offsets + np.floor(0.95 * (counts - 1)).astype(np.int64)],
+        'count': counts,
+    }
+
+
+def _hall_letter(index: int) -> str:
+    """Hall-A ... Hall-Z, then Hall-AA, Hall-AB, ..."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = string.ascii_uppercase[remainder] + letters
+    return letters
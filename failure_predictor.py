@@ -0,0 +1,329 @@
+import os
+import argparse
+import numpy as np
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import brier_score_loss, roc_auc_score
+    from sklearn.model_selection import GroupShuffleSplit, train_test_split
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    SKLEARN_AVAILABLE = True
+except ImportError:  # scikit-learn is optional, the rule-based scorer is used instead
+    SKLEARN_AVAILABLE = False
+
+METRICS = ('temperature', 'vibration', 'power')
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'failure_model.joblib')
+MIN_HELD_OUT_AUC = 0.7  # models that rank failures no better than this are not enabled
+
+
+class FailurePredictor:
+    """Rolling per-rack features and a batched scikit-learn failure model.
+
+    Features are kept as running sums over the same window as the detector's
+    metric deques, so each new sample costs O(1) per rack and the whole fleet
+    is scored with a single ``predict_proba`` call. The alert-rate feature is
+    an EWMA of deduplicated alerts (opens and escalations), not raw breaches.
+    """
+
+    FEATURE_NAMES = (
+        [f'{metric}_slope' for metric in METRICS] +
+        [f'{metric}_ewma' for metric in METRICS] +
+        [f'{metric}_variance' for metric in METRICS] +
+        ['alert_rate']
+    )
+
+    def __init__(self, ewma_alpha: float = 0.1, alert_alpha: float = 1 / 60, min_samples: int = 30,
+                 model_path: Optional[str] = DEFAULT_MODEL_PATH, capacity: int = 64):
+        self.ewma_alpha = ewma_alpha
+        self.alert_alpha = alert_alpha  # ~1 hour of minute samples
+        self.min_samples = min_samples
+        self.model_path = model_path
+
+        self.rack_index: Dict[str, int] = {}
+        self.rack_ids: List[str] = []
+
+        # Running window sums, one row per rack and one column per metric
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._sum = np.zeros((capacity, len(METRICS)))
+        self._sum_sq = np.zeros((capacity, len(METRICS)))
+        self._sum_xy = np.zeros((capacity, len(METRICS)))
+        self._ewma = np.zeros((capacity, len(METRICS)))
+        self._alert_rate = np.zeros(capacity)
+
+        self.model = None
+        self.metrics: Dict[str, float] = {}  # held-out evaluation of the current model
+        if model_path and os.path.exists(model_path):
+            self.load_model(model_path)
+
+    @property
+    def available(self) -> bool:
+        """Whether a trained model is loaded and can score racks."""
+        return self.model is not None
+
+    def _row(self, rack_id: str) -> int:
+        """Return the feature row for a rack, growing the arrays if needed."""
+        row = self.rack_index.get(rack_id)
+        if row is not None:
+            return row
+
+        row = len(self.rack_ids)
+        if row == len(self._count):
+            grow = len(self._count)
+            self._count = np.concatenate([self._count, np.zeros(grow, dtype=np.int64)])
+            self._alert_rate = np.concatenate([self._alert_rate, np.zeros(grow)])
+            for name in ('_sum', '_sum_sq', '_sum_xy', '_ewma'):
+                array = getattr(self, name)
+                setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+
+        self.rack_index[rack_id] = row
+        self.rack_ids.append(rack_id)
+        return row
+
+    def update(self, rack_id: str, values: Sequence[float], evicted: Optional[Sequence[float]] = None,
+               alert: bool = False):
+        """Add one sample for a rack.
+
+        ``evicted`` is the sample that dropped out of the metric deque (if it
+        was full), so the window sums slide together with the deque.
+        """
+        row = self._row(rack_id)
+        y = np.asarray(values, dtype=float)
+
+        if evicted is not None and self._count[row] > 0:
+            old = np.asarray(evicted, dtype=float)
+            self._sum[row] -= old
+            self._sum_sq[row] -= old * old
+            # The evicted sample sat at index 0; every other sample shifts down by one
+            self._sum_xy[row] -= self._sum[row]
+        else:
+            self._count[row] += 1
+
+        n = self._count[row]
+        self._sum[row] += y
+        self._sum_sq[row] += y * y
+        self._sum_xy[row] += (n - 1) * y
+
+        if n == 1:
+            self._ewma[row] = y
+        else:
+            self._ewma[row] += self.ewma_alpha * (y - self._ewma[row])
+
+        self._alert_rate[row] += self.alert_alpha * (float(alert) - self._alert_rate[row])
+
+    def features(self) -> np.ndarray:
+        """Return the feature matrix for all known racks, one row per rack."""
+        size = len(self.rack_ids)
+        n = self._count[:size].astype(float)[:, None]
+        safe_n = np.maximum(n, 1)
+
+        # Least-squares slope over sample indices 0..n-1
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        denom = n * sum_xx - sum_x ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denom > 0, (n * self._sum_xy[:size] - sum_x * self._sum[:size]) / denom, 0.0)
+
+        mean = self._sum[:size] / safe_n
+        variance = np.maximum(self._sum_sq[:size] / safe_n - mean ** 2, 0.0)
+
+        return np.hstack([slope, self._ewma[:size], variance, self._alert_rate[:size, None]])
+
+    def predict_proba(self) -> Dict[str, float]:
+        """Score every rack with enough history in one batched model call."""
+        if not self.available or not self.rack_ids:
+            return {}
+
+        ready = np.flatnonzero(self._count[:len(self.rack_ids)] >= self.min_samples)
+        if len(ready) == 0:
+            return {}
+
+        probabilities = self.model.predict_proba(self.features()[ready])[:, 1]
+        return {self.rack_ids[row]: float(p) for row, p in zip(ready, probabilities)}
+
+    def fit(self, features: np.ndarray, labels: np.ndarray, groups: Optional[np.ndarray] = None,
+            test_size: float = 0.25, min_auc: float = MIN_HELD_OUT_AUC) -> Dict[str, float]:
+        """Train the failure model on a feature matrix and binary labels.
+
+        The model is first evaluated on a held-out split (whole racks when
+        ``groups`` gives each row's rack, so correlated rows never straddle the
+        split) and only enabled if its held-out AUC reaches ``min_auc``. It is
+        then refit on all rows. The logistic regression is left unweighted so
+        its probabilities stay calibrated to the real failure rate, which the
+        0.5/0.8 prediction thresholds rely on.
+        """
+        if not SKLEARN_AVAILABLE:
+            raise RuntimeError("scikit-learn is required to train the failure model")
+        if len(np.unique(labels)) < 2:
+            raise ValueError("Training data must contain both failing and healthy samples")
+
+        if groups is not None:
+            splitter = GroupShuffleSplit(n_splits=1, test_size=test_size, random_state=0)
+            train, test = next(splitter.split(features, labels, groups))
+        else:
+            train, test = train_test_split(np.arange(len(labels)), test_size=test_size,
+                                           stratify=labels, random_state=0)
+        if len(np.unique(labels[train])) < 2 or len(np.unique(labels[test])) < 2:
+            raise ValueError("Both splits must contain failing and healthy samples")
+
+        model = self._make_model().fit(features[train], labels[train])
+        probabilities = model.predict_proba(features[test])[:, 1]
+        metrics = {
+            'auc': float(roc_auc_score(labels[test], probabilities)),
+            'brier': float(brier_score_loss(labels[test], probabilities)),
+            'positive_rate': float(labels[test].mean()),
+            'warning_rate': float((probabilities >= 0.5).mean()),
+        }
+
+        self.model = None
+        self.metrics = metrics
+        if metrics['auc'] < min_auc:
+            raise ValueError(
+                f"Held-out AUC {metrics['auc']:.2f} is below {min_auc:.2f}; the model is not enabled"
+            )
+
+        self.model = self._make_model().fit(features, labels)
+        return metrics
+
+    @staticmethod
+    def _make_model():
+        """Build an untrained (unweighted, hence calibrated) logistic regression pipeline."""
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+
+    def save_model(self, path: Optional[str] = None):
+        """Persist the trained model and its held-out metrics with joblib."""
+        path = path or self.model_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump({'model': self.model, 'metrics': self.metrics}, path)
+
+    def load_model(self, path: Optional[str] = None, min_auc: float = MIN_HELD_OUT_AUC):
+        """Load a trained model, leaving the predictor unavailable if that fails.
+
+        Files without held-out metrics, or whose held-out AUC is below
+        ``min_auc``, are ignored so the rule-based scorer stays in charge.
+        """
+        if not SKLEARN_AVAILABLE:
+            return
+        self.model = None
+        try:
+            payload = joblib.load(path or self.model_path)
+        except Exception:
+            return
+        if not isinstance(payload, dict) or payload.get('metrics', {}).get('auc', 0.0) < min_auc:
+            return
+        self.model = payload['model']
+        self.metrics = payload['metrics']
+
+
+def generate_training_data(num_racks: int = 200, ticks: int = 720, horizon: int = 30,
+                           fault_rate: float = 0.002, precursor_ticks: Sequence[int] = (20, 60)):
+    """Run the simulator and collect (features, label, rack) rows.
+
+    Faults do not strike out of the blue: a rack that is going to fail first
+    degrades for a random number of ticks in ``precursor_ticks``, with
+    vibration, temperature and power drifting upwards until the fault fires.
+    A sample is labelled positive when the rack develops a fault within the
+    next ``horizon`` ticks. Faulty racks are repaired immediately so they keep
+    producing training data. The third array gives each row's rack, for
+    splitting by rack in ``FailurePredictor.fit``.
+    """
+    from anomaly_detector import AnomalyDetector
+    from virtualization_manager import VirtualizationManager
+
+    vm_manager = VirtualizationManager(num_servers=num_racks)
+    vm_manager.fault_interval = timedelta(days=365)  # faults are injected per tick below
+    predictor = FailurePredictor(model_path=None)
+    detector = AnomalyDetector(predictor=predictor)
+
+    snapshots = []  # (tick, rack ids, feature matrix, sample counts at that tick)
+    fault_ticks: Dict[str, List[int]] = {}
+    degrading: Dict[str, tuple] = {}  # rack id -> (first precursor tick, fault tick, fault type)
+
+    for tick in range(ticks):
+        vm_manager.update_server_loads()
+        vm_manager.optimize_workload()
+
+        healthy = [sid for sid, s in vm_manager.servers.items()
+                   if s['status'] == 'active' and not s['has_fault'] and sid not in degrading]
+        starting = np.random.binomial(len(healthy), fault_rate) if healthy else 0
+        for index in np.random.choice(len(healthy), starting, replace=False):
+            duration = np.random.randint(precursor_ticks[0], precursor_ticks[1] + 1)
+            fault_type = np.random.choice(['temperature', 'load', 'power'])
+            degrading[healthy[index]] = (tick, tick + duration, fault_type)
+
+        for rack_id, status in vm_manager.get_server_status().items():
+            temperature = status['temperature']
+            vibration = np.random.normal(0.5, 0.2)
+            power = np.random.normal(1000, 100)
+
+            if rack_id in degrading:
+                first, fault_tick, fault_type = degrading[rack_id]
+                progress = (tick - first) / max(fault_tick - first, 1)
+                temperature += 4.0 * progress
+                vibration += 0.4 * progress
+                power += 150.0 * progress
+                if tick >= fault_tick:
+                    del degrading[rack_id]
+                    status['has_fault'] = True
+                    status['fault_type'] = fault_type
+
+            if status['has_fault']:
+                vibration += 0.6
+                power += 300 if status['fault_type'] == 'power' else 0
+            detector.analyze_rack(rack_id, temperature, vibration, power)
+
+            if status['has_fault']:
+                fault_ticks.setdefault(rack_id, []).append(tick)
+                # Repair immediately so the rack keeps producing samples
+                status['has_fault'] = False
+                status['fault_type'] = None
+                status['power_state'] = 'normal'
+
+        counts = predictor._count[:len(predictor.rack_ids)].copy()
+        snapshots.append((tick, list(predictor.rack_ids), predictor.features(), counts))
+
+    features, labels, groups = [], [], []
+    for tick, rack_ids, matrix, counts in snapshots:
+        if tick + horizon >= ticks:
+            break
+        for row, rack_id in enumerate(rack_ids):
+            # Skip rows whose rolling window was still filling when they were taken
+            if counts[row] < predictor.min_samples:
+                continue
+            upcoming = fault_ticks.get(rack_id, [])
+            features.append(matrix[row])
+            labels.append(any(tick < t <= tick + horizon for t in upcoming))
+            groups.append(row)
+
+    return np.array(features), np.array(labels, dtype=int), np.array(groups)
+
+
+def train_from_simulator(model_path: str = DEFAULT_MODEL_PATH, **kwargs) -> FailurePredictor:
+    """Train the failure model offline on simulator data and save it.
+
+    Raises ``ValueError`` without saving anything if the held-out AUC is too
+    low for the model to be trusted over the rule-based scorer.
+    """
+    features, labels, groups = generate_training_data(**kwargs)
+    predictor = FailurePredictor(model_path=model_path)
+    predictor.fit(features, labels, groups=groups)
+    predictor.save_model(model_path)
+    return predictor
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the rack failure model on simulator data")
+    parser.add_argument('--racks', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=720)
+    parser.add_argument('--horizon', type=int, default=30)
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args()
+
+    predictor = train_from_simulator(args.output, num_racks=args.racks, ticks=args.ticks, horizon=args.horizon)
+    metrics = predictor.metrics
+    print(f"Held-out AUC {metrics['auc']:.3f}, Brier {metrics['brier']:.4f}, "
+          f"{metrics['warning_rate']:.1%} of racks at warning vs {metrics['positive_rate']:.1%} failing")
+    print(f"Saved failure model to {args.output}")
@@ -0,0 +1,264 @@
+import math
+import random
+import argparse
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+
+class LoadForecaster:
+    """Additive Holt-Winters load forecaster, vectorized across every host.
+
+    Level, trend and seasonal state live in arrays with one row per host, so a
+    tick updates the whole fleet in a few NumPy operations. With
+    ``season_length=0`` this is Holt's linear method.
+    """
+
+    def __init__(self, alpha: float = 0.5, beta: float = 0.1, gamma: float = 0.1,
+                 season_length: int = 0):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.season_length = season_length
+        self.host_ids: List[str] = []
+        self.host_index: Dict[str, int] = {}
+
+        capacity = 64
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._level = np.zeros(capacity)
+        self._trend = np.zeros(capacity)
+        self._season = np.zeros((capacity, max(season_length, 1)))
+
+    def _rows(self, host_ids: Sequence[str]) -> np.ndarray:
+        for host_id in host_ids:
+            if host_id not in self.host_index:
+                self.host_index[host_id] = len(self.host_ids)
+                self.host_ids.append(host_id)
+        rows = np.fromiter((self.host_index[host_id] for host_id in host_ids), dtype=np.int64,
+                           count=len(host_ids))
+        if len(self.host_ids) > len(self._count):
+            grow = 2 * len(self.host_ids) - len(self._count)
+            self._count = np.concatenate([self._count, np.zeros(grow, dtype=np.int64)])
+            self._level = np.concatenate([self._level, np.zeros(grow)])
+            self._trend = np.concatenate([self._trend, np.zeros(grow)])
+            self._season = np.concatenate([self._season, np.zeros((grow, self._season.shape[1]))])
+        return rows
+
+    def update(self, host_ids: Sequence[str], loads: Sequence[float]):
+        """Add one observation per host and update the smoothing state in one step."""
+        rows = self._rows(host_ids)
+        loads = np.asarray(loads, dtype=float)
+
+        count = self._count[rows]
+        first = count == 0
+        level, trend = self._level[rows], self._trend[rows]
+
+        if self.season_length:
+            slot = count % self.season_length
+            season = self._season[rows, slot]
+        else:
+            season = np.zeros(len(rows))
+
+        new_level = self.alpha * (loads - season) + (1 - self.alpha) * (level + trend)
+        new_trend = self.beta * (new_level - level) + (1 - self.beta) * trend
+        self._level[rows] = np.where(first, loads, new_level)
+        self._trend[rows] = np.where(first, 0.0, new_trend)
+        if self.season_length:
+            self._season[rows, slot] = np.where(
+                first, 0.0, self.gamma * (loads - new_level) + (1 - self.gamma) * season
+            )
+        self._count[rows] = count + 1
+
+    def forecast(self, host_ids: Sequence[str], steps: int = 1) -> np.ndarray:
+        """Forecast the next ``steps`` loads per host, shape (hosts, steps)."""
+        rows = self._rows(host_ids)
+        horizon = np.arange(1, steps + 1)
+        forecast = self._level[rows, None] + self._trend[rows, None] * horizon
+        if self.season_length:
+            slots = (self._count[rows, None] - 1 + horizon) % self.season_length
+            forecast = forecast + self._season[rows[:, None], slots]
+        return np.clip(forecast, 0, 100)
+
+
+class ProactiveScheduler:
+    """Wake hosts ahead of forecast peaks and consolidate ahead of forecast troughs.
+
+    Replaces the random wake-ups in VirtualizationManager.optimize_workload:
+    the number of powered hosts follows the forecast peak demand over the
+    horizon, and a host can't change power state again for ``min_dwell``
+    ticks, which limits churn. It is opt-in (set ``vm_manager.power_scheduler``):
+    compare_policies shows no benefit over the reactive policy on the
+    current simulator, so the dashboard doesn't enable it.
+    """
+
+    def __init__(self, forecaster: Optional[LoadForecaster] = None, horizon: int = 10,
+                 target_utilization: float = 60.0, headroom_hosts: int = 1, min_dwell: int = 10):
+        self.forecaster = forecaster or LoadForecaster()
+        self.horizon = horizon  # ticks to look ahead
+        self.target_utilization = target_utilization  # planned % CPU per powered host
+        self.headroom_hosts = headroom_hosts
+        self.min_dwell = min_dwell
+        self.tick = 0
+        self.last_flip: Dict[str, int] = {}
+        self.power_state_changes = 0
+        self.migrations = 0
+        self.draining = set()  # hosts emptying through vm_manager.migration_scheduler
+
+    def _can_flip(self, server_id: str) -> bool:
+        return self.tick - self.last_flip.get(server_id, -self.min_dwell) >= self.min_dwell
+
+    def _set_power_state(self, server: Dict, server_id: str, power_state: str):
+        server['power_state'] = power_state
+        self.last_flip[server_id] = self.tick
+        self.power_state_changes += 1
+
+    def _evacuate(self, vm_manager, source_id: str, targets: List[str]) -> bool:
+        """Move every VM off ``source_id`` if they all fit below the overload threshold."""
+        servers = vm_manager.servers
+        limit = vm_manager.consolidation_thresholds['overloaded']
+        projected = {target: servers[target]['cpu_usage'] for target in targets}
+        plan = []
+        for vm in sorted(servers[source_id]['virtual_machines'], key=lambda vm: vm['cpu_load'], reverse=True):
+            target = min(projected, key=projected.get, default=None)
+            if target is None or projected[target] + vm['cpu_load'] > limit:
+                return False
+            projected[target] += vm['cpu_load']
+            plan.append((vm, target))
+
+        for vm, target in plan:
+            servers[target]['virtual_machines'].append(vm)
+            servers[target]['cpu_usage'] = np.clip(servers[target]['cpu_usage'] + vm['cpu_load'], 10, 95)
+            servers[target]['memory_usage'] = np.clip(servers[target]['memory_usage'] + vm['memory_load'], 20, 90)
+            servers[target]['network_load'] = np.clip(servers[target]['network_load'] + vm['network_load'], 5, 100)
+        servers[source_id]['virtual_machines'] = []
+        self.migrations += len(plan)
+        vm_manager.migration_count += len(plan)
+        return True
+
+    def _drain_with_queue(self, vm_manager, powered: List[str], candidates: List[str], surplus: int):
+        """Queue live migrations off the hosts that are cheapest to empty."""
+        migrations = vm_manager.migration_scheduler
+        servers = vm_manager.servers
+
+        def targets(server_id):
+            return [sid for sid in powered if sid != server_id and sid not in self.draining]
+
+        costs = {sid: migrations.consolidation_cost(sid, targets(sid)) for sid in candidates}
+        for server_id in sorted((sid for sid in candidates if costs[sid] is not None), key=costs.get):
+            if surplus <= 0:
+                break
+            if migrations.consolidate(server_id, targets(server_id)) is not None:
+                self.draining.add(server_id)
+                servers[server_id]['can_host_vms'] = False  # don't refill it while it empties
+                surplus -= 1
+
+    def _finish_draining(self, vm_manager):
+        """Power down drained hosts once their last VM has left."""
+        servers = vm_manager.servers
+        for server_id in list(self.draining):
+            server = servers[server_id]
+            if server['status'] != 'active' or server['power_state'] == 'idle':
+                self.draining.discard(server_id)
+                server['can_host_vms'] = True
+            elif not server['virtual_machines'] and not vm_manager.migration_scheduler.busy(server_id):
+                self.draining.discard(server_id)
+                server['can_host_vms'] = True
+                self._set_power_state(server, server_id, 'idle')
+                server['cpu_usage'] = 5
+            elif not vm_manager.migration_scheduler.busy(server_id):
+                # Some moves were dropped; give the host back to the pool
+                self.draining.discard(server_id)
+                server['can_host_vms'] = True
+
+    def apply(self, vm_manager, active_servers: List[str]):
+        """Decide power states for this tick; called from optimize_workload."""
+        self.tick += 1
+        servers = vm_manager.servers
+        thresholds = vm_manager.consolidation_thresholds
+        powered = [sid for sid in active_servers if servers[sid]['power_state'] != 'idle']
+        idle = [sid for sid in active_servers if servers[sid]['power_state'] == 'idle']
+        if not powered:
+            return
+        self._finish_draining(vm_manager)
+
+        self.forecaster.update(powered, [servers[sid]['cpu_usage'] for sid in powered])
+        peak = self.forecaster.forecast(powered, self.horizon).max(axis=1)
+        needed = math.ceil(peak.sum() / self.target_utilization) + self.headroom_hosts
+
+        if needed > len(powered):
+            # Wake hosts now so capacity is there before the peak arrives
+            for server_id in [sid for sid in idle if self._can_flip(sid)][:needed - len(powered)]:
+                self._set_power_state(servers[server_id], server_id, 'normal')
+                servers[server_id]['cpu_usage'] = np.random.normal(30, 10)
+        elif needed < len(powered) - len(self.draining):
+            # Drain the hosts with the lowest forecast ahead of the trough
+            order = np.argsort(peak)
+            candidates = [powered[i] for i in order
+                          if peak[i] < thresholds['underutilized'] and self._can_flip(powered[i])
+                          and powered[i] not in self.draining]
+            surplus = len(powered) - len(self.draining) - needed
+            if vm_manager.migration_scheduler is not None:
+                self._drain_with_queue(vm_manager, powered, candidates, surplus)
+                return
+            draining = set(candidates[:surplus])
+            targets = [sid for sid in powered if sid not in draining]
+            for server_id in candidates[:surplus]:
+                if self._evacuate(vm_manager, server_id, targets):
+                    self._set_power_state(servers[server_id], server_id, 'idle')
+                    servers[server_id]['cpu_usage'] = 5
+
+
+def compare_policies(num_servers: int = 100, ticks: int = 500, seed: int = 0,
+                     scheduler_factory=ProactiveScheduler) -> Dict[str, Dict[str, float]]:
+    """Run the reactive and proactive policies on the same seeded simulator.
+
+    VirtualizationManager adds each host's VM load to its CPU usage on every
+    tick, so powered hosts climb to the 95% clip within a few dozen ticks and
+    neither policy finds hosts it can power down. The proactive run's lower
+    migration count comes from dropping the random wake-ups, which create
+    fresh underutilized targets for rebalancing, not from the forecast.
+    """
+    from virtualization_manager import VirtualizationManager
+
+    results = {}
+    for name in ('reactive', 'proactive'):
+        random.seed(seed)
+        np.random.seed(seed)
+        start = datetime(2024, 1, 1)
+        vm_manager = VirtualizationManager(num_servers=num_servers)
+        vm_manager.power_scheduler = scheduler_factory() if name == 'proactive' else None
+
+        flips, powered_ticks = 0, 0
+        previous = {sid: s['power_state'] == 'idle' for sid, s in vm_manager.servers.items()}
+        for tick in range(ticks):
+            vm_manager.clock = lambda tick=tick: start + timedelta(minutes=tick)
+            vm_manager.update_server_loads()
+            vm_manager.optimize_workload()
+
+            current = {sid: s['power_state'] == 'idle' for sid, s in vm_manager.servers.items()}
+            flips += sum(1 for sid in current if current[sid] != previous[sid])
+            powered_ticks += sum(1 for is_idle in current.values() if not is_idle)
+            previous = current
+
+        results[name] = {
+            'migrations': vm_manager.migration_count,
+            'power_state_changes': flips,
+            'avg_powered_hosts': powered_ticks / ticks,
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare reactive and proactive power policies")
+    parser.add_argument('--servers', type=int, default=100)
+    parser.add_argument('--ticks', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = compare_policies(args.servers, args.ticks, args.seed)
+    print(f"{'policy':<10} {'migrations':>11} {'power flips':>12} {'avg powered':>12}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['migrations']:>11} {result['power_state_changes']:>12} "
+              f"{result['avg_powered_hosts']:>12.1f}")
+    print("Note: the simulator's load model saturates powered hosts, so neither policy can consolidate;\n"
+          "see compare_policies for what the migration difference does and doesn't show.")
@@ -0,0 +1,173 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS = ('temperature', 'vibration', 'power')
+
+
+class RingView:
+    """Read-only, deque-like view of one rack's samples for one metric."""
+
+    def __init__(self, history: 'MetricHistory', row: int, metric: Optional[int]):
+        self._history = history
+        self._row = row
+        self._metric = metric  # None selects the timestamps
+
+    @property
+    def maxlen(self) -> int:
+        return self._history.window
+
+    def __len__(self) -> int:
+        return int(self._history._length[self._row])
+
+    def array(self) -> np.ndarray:
+        """Samples oldest to newest as an array (epoch seconds for timestamps)."""
+        history = self._history
+        buffer = history._times if self._metric is None else history._values[self._metric]
+        return buffer[self._row, history._order(self._row)]
+
+    def __getitem__(self, index: int):
+        length = len(self)
+        if not -length <= index < length:
+            raise IndexError('history index out of range')
+        history = self._history
+        position = (history._head[self._row] - length + index % length) % history.window
+        if self._metric is None:
+            return datetime.fromtimestamp(history._times[self._row, position])
+        return float(history._values[self._metric, self._row, position])
+
+    def __iter__(self) -> Iterator:
+        if self._metric is None:
+            return iter(datetime.fromtimestamp(t) for t in self.array().tolist())
+        return iter(self.array().tolist())
+
+
+class RackHistory:
+    """Mapping-style access to one rack's metric windows, keyed like the old deques."""
+
+    def __init__(self, history: 'MetricHistory', row: int):
+        self._history = history
+        self._row = row
+
+    def __getitem__(self, name: str) -> RingView:
+        if name == 'timestamps':
+            return RingView(self._history, self._row, None)
+        return RingView(self._history, self._row, self._history.metrics.index(name))
+
+    def keys(self) -> List[str]:
+        return list(self._history.metrics) + ['timestamps']
+
+
+class MetricHistory:
+    """Fixed-window ring buffers of rack metrics, one row per rack.
+
+    All racks share preallocated NumPy arrays, so appending is O(1), the
+    window never reallocates, and the whole history can be saved or restored
+    as a few contiguous buffers.
+    """
+
+    def __init__(self, metrics: Sequence[str] = METRICS, window: int = 240, capacity: int = 64):
+        self.metrics = tuple(metrics)
+        self.window = window
+        self.rack_index: Dict[str, int] = {}
+        self.rack_ids: List[str] = []
+        self._values = np.zeros((len(self.metrics), capacity, window))
+        self._times = np.zeros((capacity, window))  # epoch seconds
+        self._head = np.zeros(capacity, dtype=np.int64)  # next write position
+        self._length = np.zeros(capacity, dtype=np.int64)
+
+    def __contains__(self, rack_id: str) -> bool:
+        return rack_id in self.rack_index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.rack_ids)
+
+    def __len__(self) -> int:
+        return len(self.rack_ids)
+
+    def __getitem__(self, rack_id: str) -> RackHistory:
+        return RackHistory(self, self.rack_index[rack_id])
+
+    def keys(self) -> List[str]:
+        return list(self.rack_ids)
+
+    def add_rack(self, rack_id: str) -> int:
+        """Allocate a row for a rack, growing the buffers if needed."""
+        row = self.rack_index.get(rack_id)
+        if row is not None:
+            return row
+
+        row = len(self.rack_ids)
+        if row == len(self._head):
+            self._resize(2 * len(self._head))
+        self.rack_index[rack_id] = row
+        self.rack_ids.append(rack_id)
+        return row
+
+    def _resize(self, capacity: int):
+        size = len(self.rack_ids)
+        values = np.zeros((len(self.metrics), capacity, self.window))
+        times = np.zeros((capacity, self.window))
+        head = np.zeros(capacity, dtype=np.int64)
+        length = np.zeros(capacity, dtype=np.int64)
+        values[:, :size] = self._values[:, :size]
+        times[:size] = self._times[:size]
+        head[:size] = self._head[:size]
+        length[:size] = self._length[:size]
+        self._values, self._times, self._head, self._length = values, times, head, length
+
+    def _order(self, row: int) -> np.ndarray:
+        """Buffer positions of a row's samples, oldest first."""
+        length = self._length[row]
+        return (self._head[row] - length + np.arange(length)) % self.window
+
+    def append(self, rack_id: str, values: Sequence[float], timestamp: datetime) -> Optional[Tuple[float, ...]]:
+        """Add one sample; return the evicted metric values if the window was full."""
+        row = self.add_rack(rack_id)
+        position = self._head[row]
+
+        evicted = None
+        if self._length[row] == self.window:
+            evicted = tuple(self._values[:, row, position].tolist())
+        else:
+            self._length[row] += 1
+
+        self._values[:, row, position] = values
+        self._times[row, position] = timestamp.timestamp()
+        self._head[row] = (position + 1) % self.window
+        return evicted
+
+    def values(self, rack_id: str, metric: str) -> np.ndarray:
+        """Samples of one metric for a rack, oldest to newest."""
+        return self[rack_id][metric].array()
+
+    def lengths(self) -> np.ndarray:
+        """Number of samples held for every rack, in rack_ids order."""
+        return self._length[:len(self.rack_ids)]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Export the buffers for snapshotting."""
+        size = len(self.rack_ids)
+        return {
+            'metrics': np.array(self.metrics, dtype=str),
+            'window': np.array(self.window),
+            'rack_ids': np.array(self.rack_ids, dtype=str),
+            'values': self._values[:, :size],
+            'times': self._times[:size],
+            'head': self._head[:size],
+            'length': self._length[:size],
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'MetricHistory':
+        """Rebuild a history exported by to_arrays."""
+        rack_ids = arrays['rack_ids'].tolist()
+        history = cls(arrays['metrics'].tolist(), int(arrays['window']), capacity=max(2 * len(rack_ids), 64))
+        size = len(rack_ids)
+        history.rack_ids = rack_ids
+        history.rack_index = {rack_id: i for i, rack_id in enumerate(rack_ids)}
+        history._values[:, :size] = arrays['values']
+        history._times[:size] = arrays['times']
+        history._head[:size] = arrays['head']
+        history._length[:size] = arrays['length']
+        return history
@@ -0,0 +1,505 @@
+import heapq
+import itertools
+import random
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Queue priorities, lower runs first
+EVACUATION = 0
+REBALANCE = 1
+
+
+class MigrationCostModel:
+    """Pre-copy live migration cost.
+
+    Memory is copied in rounds while the guest keeps dirtying pages; each
+    round resends what was dirtied during the previous one, until the dirty
+    set is small enough to stop the VM and copy the rest. The geometric
+    series has a closed form, so costs for many VMs come from one vectorized
+    call.
+    """
+
+    def __init__(self, link_bandwidth: float = 1250.0, memory_mb_per_unit: float = 256.0,
+                 dirty_mb_per_cpu: float = 1.0, stop_copy_mb: float = 64.0, max_rounds: int = 30,
+                 setup_seconds: float = 0.5, failure_rate: float = 0.01):
+        self.link_bandwidth = link_bandwidth  # MB/s of an idle 10 Gbit/s link
+        self.memory_mb_per_unit = memory_mb_per_unit  # VM memory per unit of memory_load
+        self.dirty_mb_per_cpu = dirty_mb_per_cpu  # page dirty rate (MB/s) per unit of cpu_load
+        self.stop_copy_mb = stop_copy_mb
+        self.max_rounds = max_rounds
+        self.setup_seconds = setup_seconds
+        self.failure_rate = failure_rate
+
+    def bandwidth(self, source_network: np.ndarray, target_network: np.ndarray) -> np.ndarray:
+        """Bandwidth left for migration traffic given the busier end's network_load (%)."""
+        busiest = np.maximum(source_network, target_network)
+        return self.link_bandwidth * np.clip(1 - busiest / 100, 0.25, 1)
+
+    def estimate(self, memory_mb: np.ndarray, dirty_rate: np.ndarray,
+                 bandwidth: np.ndarray) -> Dict[str, np.ndarray]:
+        """Duration (s), MB sent, copy rounds and convergence for each migration."""
+        memory_mb, dirty_rate, bandwidth = np.broadcast_arrays(
+            np.asarray(memory_mb, dtype=float), np.asarray(dirty_rate, dtype=float),
+            np.asarray(bandwidth, dtype=float)
+        )
+        ratio = dirty_rate / bandwidth
+        converged = ratio < 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rounds = np.ceil(np.log(self.stop_copy_mb / memory_mb) / np.log(ratio))
+        rounds = np.where(memory_mb <= self.stop_copy_mb, 0, rounds)
+        rounds = np.where(converged & np.isfinite(rounds), rounds, self.max_rounds)
+        rounds = np.clip(rounds, 0, self.max_rounds)
+
+        # memory * (1 + r + ... + r^rounds), the last term being the stop-and-copy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            series = (1 - ratio ** (rounds + 1)) / (1 - ratio)
+        series = np.where(np.isclose(ratio, 1), rounds + 1, series)
+        transferred = memory_mb * series
+        return {
+            'duration': transferred / bandwidth + self.setup_seconds,
+            'transferred': transferred,
+            'rounds': rounds,
+            'converged': converged,
+        }
+
+    def failure_probability(self, rounds: np.ndarray, converged: np.ndarray) -> np.ndarray:
+        """Longer migrations fail more often; forced stop-and-copy most of all."""
+        return np.clip(self.failure_rate * (1 + rounds / self.max_rounds) * np.where(converged, 1, 3), 0, 1)
+
+    def vm_costs(self, vms: Sequence[Dict], source_network: np.ndarray,
+                 target_network: np.ndarray) -> Dict[str, np.ndarray]:
+        """Estimate migrating each VM between hosts with the given network_load.
+
+        Pass 2-D network loads (e.g. shape (1, targets)) to get one row of costs per VM.
+        """
+        memory_mb = np.array([vm['memory_load'] for vm in vms], dtype=float) * self.memory_mb_per_unit
+        dirty_rate = np.array([vm['cpu_load'] for vm in vms], dtype=float) * self.dirty_mb_per_cpu
+        if np.ndim(source_network) == 2 or np.ndim(target_network) == 2:
+            memory_mb, dirty_rate = memory_mb[:, None], dirty_rate[:, None]  # one row per VM
+        bandwidth = self.bandwidth(np.asarray(source_network, dtype=float), np.asarray(target_network, dtype=float))
+        return self.estimate(memory_mb, dirty_rate, bandwidth)
+
+
+class MigrationScheduler:
+    """Prioritized, bandwidth-constrained live migration queue for VirtualizationManager.
+
+    Migrations wait in a heap ordered by priority then submission order, so
+    evacuations always run before rebalancing. At most ``max_per_host``
+    migrations touch a host and ``max_per_link`` share a network link at
+    once; a blocked evacuation pre-empts running rebalance migrations. A VM
+    stays on its source until its copy finishes, and failed copies are
+    retried up to ``max_retries`` times.
+    """
+
+    def __init__(self, vm_manager, cost_model: Optional[MigrationCostModel] = None, max_per_host: int = 2,
+                 max_per_link: int = 4, max_retries: int = 2, link_of: Optional[Callable[[str], str]] = None):
+        self.vm_manager = vm_manager
+        self.cost_model = cost_model or MigrationCostModel()
+        self.max_per_host = max_per_host
+        self.max_per_link = max_per_link
+        self.max_retries = max_retries
+        self.link_of = link_of or (lambda server_id: server_id)  # e.g. the rack's row switch
+
+        self.queue: List[Tuple[int, int, Dict]] = []  # (priority, seq, migration)
+        self.running: List[Tuple[datetime, int, Dict]] = []  # (finish time, run seq, migration)
+        self.pending: Dict[int, Dict] = {}  # id(vm) -> queued or running migration
+        self.holders: Dict[Tuple[str, str], List[Dict]] = {}  # ('host'|'link', id) -> running migrations
+        self.host_pending: Dict[str, int] = {}  # queued or running migrations touching each host
+        self.inbound_cpu: Dict[str, float] = {}  # CPU load already on its way to each host
+        self._seq = itertools.count()
+        self.stats = {
+            'submitted': 0, 'started': 0, 'completed': 0, 'failed': 0,
+            'preempted': 0, 'dropped': 0, 'transferred_mb': 0.0, 'migration_seconds': 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def busy(self, server_id: str) -> bool:
+        """Whether any queued or running migration involves a host."""
+        return self.host_pending.get(server_id, 0) > 0
+
+    def _usable_targets(self, source_id: str, targets: Optional[Sequence[str]] = None) -> List[str]:
+        servers = self.vm_manager.servers
+        if targets is None:
+            targets = servers.keys()
+        return [sid for sid in targets
+                if sid != source_id and servers[sid]['status'] == 'active' and servers[sid]['power_state'] != 'idle'
+                and not servers[sid]['maintenance_start'] and servers[sid]['can_host_vms']]
+
+    def cost_matrix(self, vms: Sequence[Dict], source_id: str, targets: Sequence[str]) -> np.ndarray:
+        """Migration duration (s) of every VM to every target, shape (vms, targets)."""
+        servers = self.vm_manager.servers
+        target_network = np.array([servers[t]['network_load'] for t in targets], dtype=float)
+        return self.cost_model.vm_costs(
+            vms, np.full((len(vms), 1), servers[source_id]['network_load']), target_network[None, :]
+        )['duration']
+
+    def plan(self, source_id: str, targets: Sequence[str], vms: Optional[Sequence[Dict]] = None,
+             limit: Optional[float] = None, require_all: bool = True) -> Optional[List[Tuple[Dict, str, float]]]:
+        """Cheapest placement of VMs from a host onto targets that stay under ``limit`` CPU.
+
+        Largest VMs are placed first, each on the feasible target it can
+        reach in the least time. Returns None if ``require_all`` and some VM
+        doesn't fit.
+        """
+        servers = self.vm_manager.servers
+        limit = self.vm_manager.consolidation_thresholds['overloaded'] if limit is None else limit
+        if vms is None:
+            vms = servers[source_id]['virtual_machines']
+        vms = sorted((vm for vm in vms if id(vm) not in self.pending), key=lambda vm: vm['cpu_load'], reverse=True)
+        if not vms:
+            return []
+        if not targets:
+            return None if require_all else []
+
+        costs = self.cost_matrix(vms, source_id, targets)
+        projected = np.array([servers[t]['cpu_usage'] + self.inbound_cpu.get(t, 0.0) for t in targets])
+        moves = []
+        for i, vm in enumerate(vms):
+            feasible = np.where(projected + vm['cpu_load'] <= limit, costs[i], np.inf)
+            j = int(np.argmin(feasible))
+            if not np.isfinite(feasible[j]):
+                if require_all:
+                    return None
+                continue
+            projected[j] += vm['cpu_load']
+            moves.append((vm, targets[j], float(costs[i, j])))
+        return moves
+
+    def submit(self, vm: Dict, source_id: str, target_id: str, priority: int = REBALANCE,
+               reason: str = '') -> Optional[Dict]:
+        """Queue one migration; a VM already queued can only be upgraded to a higher priority."""
+        existing = self.pending.get(id(vm))
+        if existing is not None:
+            if priority >= existing['priority'] or existing['state'] != 'queued':
+                return None
+            self._finish(existing, 'cancelled')  # its heap entry is skipped when popped
+
+        migration = {
+            'vm': vm, 'source': source_id, 'target': target_id, 'priority': priority, 'reason': reason,
+            'attempts': 0, 'state': 'queued', 'run_seq': None, 'finish': None, 'duration': 0.0,
+            'transferred': 0.0, 'bandwidth': 0.0, 'failure_probability': 0.0, 'resources': None,
+            'network_added': {}
+        }
+        self.pending[id(vm)] = migration
+        self._track(migration, 1)
+        heapq.heappush(self.queue, (priority, next(self._seq), migration))
+        self.stats['submitted'] += 1
+        return migration
+
+    def evacuate(self, source_id: str, targets: Optional[Sequence[str]] = None) -> int:
+        """Queue every VM of a host for evacuation at the cheapest target with room."""
+        targets = self._usable_targets(source_id, targets)
+        if not targets:
+            return 0
+        servers = self.vm_manager.servers
+        vms = servers[source_id]['virtual_machines']
+        moves = self.plan(source_id, targets, vms, require_all=False)
+        placed = {id(vm) for vm, _, _ in moves}
+
+        # Anything that doesn't fit under the threshold still has to leave the host
+        for vm in vms:
+            if id(vm) not in placed and id(vm) not in self.pending:
+                moves.append((vm, min(targets, key=lambda t: servers[t]['cpu_usage']), 0.0))
+        for vm, target_id, _ in moves:
+            self.submit(vm, source_id, target_id, EVACUATION, 'evacuation')
+
+        # Rebalance moves already queued from this host become evacuations
+        for vm in vms:
+            migration = self.pending.get(id(vm))
+            if migration is not None and migration['priority'] != EVACUATION and migration['state'] == 'queued':
+                self.submit(vm, source_id, migration['target'], EVACUATION, 'evacuation')
+        return len(moves)
+
+    def rebalance(self, overloaded: Sequence[str], underutilized: Sequence[str], goal: float = 60.0) -> float:
+        """Queue the cheapest VM moves that bring overloaded hosts down towards ``goal`` CPU.
+
+        VMs are picked by migration seconds per unit of CPU shed, so plans
+        prefer a few cheap moves over many expensive ones. Returns the total
+        estimated migration time queued.
+        """
+        servers = self.vm_manager.servers
+        total = 0.0
+        for source_id in overloaded:
+            targets = self._usable_targets(source_id, underutilized)
+            vms = [vm for vm in servers[source_id]['virtual_machines'] if id(vm) not in self.pending]
+            if not targets or not vms:
+                continue
+            moves = self.plan(source_id, targets, vms, require_all=False)
+            excess = servers[source_id]['cpu_usage'] - goal
+            for vm, target_id, cost in sorted(moves, key=lambda m: m[2] / max(m[0]['cpu_load'], 1e-6)):
+                if excess <= 0:
+                    break
+                self.submit(vm, source_id, target_id, REBALANCE, 'rebalance')
+                excess -= vm['cpu_load']
+                total += cost
+        return total
+
+    def consolidate(self, source_id: str, targets: Sequence[str]) -> Optional[float]:
+        """Queue emptying a host if all its VMs fit elsewhere; returns the plan's cost."""
+        moves = self.plan(source_id, self._usable_targets(source_id, targets))
+        if moves is None:
+            return None
+        for vm, target_id, _ in moves:
+            self.submit(vm, source_id, target_id, REBALANCE, 'consolidation')
+        return sum(cost for _, _, cost in moves)
+
+    def consolidation_cost(self, source_id: str, targets: Sequence[str]) -> Optional[float]:
+        """Estimated time to empty a host, or None if its VMs don't fit on the targets."""
+        moves = self.plan(source_id, self._usable_targets(source_id, targets))
+        return None if moves is None else sum(cost for _, _, cost in moves)
+
+    def _track(self, migration: Dict, delta: int):
+        """Count a migration against its hosts and the CPU heading to its target."""
+        for host in {migration['source'], migration['target']}:
+            self.host_pending[host] = self.host_pending.get(host, 0) + delta
+        target_id = migration['target']
+        self.inbound_cpu[target_id] = self.inbound_cpu.get(target_id, 0.0) + delta * migration['vm']['cpu_load']
+
+    def _finish(self, migration: Dict, state: str):
+        migration['state'] = state
+        self._track(migration, -1)
+        if self.pending.get(id(migration['vm'])) is migration:
+            del self.pending[id(migration['vm'])]
+
+    def _resources(self, migration: Dict) -> set:
+        """Hosts and links a migration occupies while it runs, cached until its target changes."""
+        if migration['resources'] is None:
+            source, target = migration['source'], migration['target']
+            migration['resources'] = {('host', source), ('host', target),
+                                      ('link', self.link_of(source)), ('link', self.link_of(target))}
+        return migration['resources']
+
+    def _limit(self, resource: Tuple[str, str]) -> int:
+        return self.max_per_host if resource[0] == 'host' else self.max_per_link
+
+    def _blocked_on(self, migration: Dict) -> List[Tuple[str, str]]:
+        return [r for r in self._resources(migration) if len(self.holders.get(r, ())) >= self._limit(r)]
+
+    def _reserve(self, migration: Dict, delta: int):
+        for resource in self._resources(migration):
+            holders = self.holders.setdefault(resource, [])
+            if delta > 0:
+                holders.append(migration)
+            else:
+                holders.remove(migration)
+
+        # Copy traffic shows up in both hosts' network load while it runs. The share
+        # actually added (after clipping at 100%) is remembered, so releasing it
+        # takes off exactly that much and no more
+        servers = self.vm_manager.servers
+        if delta > 0:
+            share = 100 * migration['bandwidth'] / self.cost_model.link_bandwidth
+            for host in (migration['source'], migration['target']):
+                before = servers[host]['network_load']
+                servers[host]['network_load'] = np.clip(before + share, 3, 100)
+                migration['network_added'][host] = servers[host]['network_load'] - before
+        else:
+            for host, added in migration['network_added'].items():
+                if host in servers:
+                    servers[host]['network_load'] = np.clip(servers[host]['network_load'] - added, 3, 100)
+            migration['network_added'] = {}
+
+    def _preempt_for(self, migration: Dict) -> bool:
+        """Abort running lower-priority migrations holding the hosts or links a migration needs."""
+        chosen = {}
+        for resource in self._blocked_on(migration):
+            holders = self.holders[resource]
+            victims = sorted((m for m in holders if m['priority'] > migration['priority']),
+                             key=lambda m: m['finish'], reverse=True)  # furthest from finishing first
+            excess = len(holders) - self._limit(resource) + 1
+            if len(victims) < excess:
+                return False
+            for victim in victims[:excess]:
+                chosen[id(victim)] = victim
+
+        for victim in chosen.values():
+            self._reserve(victim, -1)
+            victim['state'] = 'queued'  # its running heap entry is now stale
+            victim['attempts'] -= 1  # pre-emption isn't a failed attempt
+            heapq.heappush(self.queue, (victim['priority'], next(self._seq), victim))
+            self.stats['preempted'] += 1
+        return True
+
+    def _start(self, migration: Dict, now: datetime):
+        servers = self.vm_manager.servers
+        source, target, vm = migration['source'], migration['target'], migration['vm']
+        bandwidth = self.cost_model.bandwidth(np.array(servers[source]['network_load']),
+                                              np.array(servers[target]['network_load']))
+        memory_mb = vm['memory_load'] * self.cost_model.memory_mb_per_unit
+        dirty_rate = vm['cpu_load'] * self.cost_model.dirty_mb_per_cpu
+        cost = self.cost_model.estimate(memory_mb, dirty_rate, bandwidth)
+
+        migration['bandwidth'] = float(bandwidth)
+        migration['transferred'] = float(cost['transferred'])
+        migration['failure_probability'] = float(
+            self.cost_model.failure_probability(cost['rounds'], cost['converged'])
+        )
+        migration['duration'] = float(cost['duration'])
+        migration['finish'] = now + timedelta(seconds=migration['duration'])
+        migration['state'] = 'running'
+        migration['run_seq'] = next(self._seq)
+        migration['attempts'] += 1
+        self._reserve(migration, 1)
+        heapq.heappush(self.running, (migration['finish'], migration['run_seq'], migration))
+        self.stats['started'] += 1
+
+    def _dispatch(self, now: datetime):
+        """Start queued migrations in priority order while hosts and links have room."""
+        deferred = []
+        while self.queue:
+            entry = heapq.heappop(self.queue)
+            migration = entry[2]
+            if migration['state'] != 'queued':
+                continue
+            # A stale migration must not pre-empt running ones on its way to being dropped
+            if not self._still_valid(migration):
+                self._drop(migration)
+            elif self._blocked_on(migration) and (migration['priority'] != EVACUATION
+                                                  or not self._preempt_for(migration)):
+                deferred.append(entry)
+            else:
+                self._start(migration, now)
+        # Entries were popped in order, so the deferred list is already a valid heap
+        self.queue = deferred
+
+    def _still_valid(self, migration: Dict) -> bool:
+        servers = self.vm_manager.servers
+        source, target = migration['source'], migration['target']
+        return (source in servers and target in servers
+                and any(vm is migration['vm'] for vm in servers[source]['virtual_machines']))
+
+    def _target_usable(self, migration: Dict) -> bool:
+        return bool(self._usable_targets(migration['source'], [migration['target']]))
+
+    def _drop(self, migration: Dict):
+        self._finish(migration, 'dropped')
+        self.stats['dropped'] += 1
+
+    def _retry(self, migration: Dict):
+        """Requeue a failed copy, moving an evacuation to a new target if its old one went away."""
+        if migration['attempts'] > self.max_retries:
+            self._drop(migration)
+            return
+        if not self._target_usable(migration):
+            targets = self._usable_targets(migration['source'])
+            if migration['priority'] != EVACUATION or not targets:
+                self._drop(migration)
+                return
+            self._track(migration, -1)
+            migration['target'] = min(targets, key=lambda t: self.vm_manager.servers[t]['cpu_usage'])
+            migration['resources'] = None
+            self._track(migration, 1)
+        migration['state'] = 'queued'
+        heapq.heappush(self.queue, (migration['priority'], next(self._seq), migration))
+
+    def _complete(self, migration: Dict):
+        self._reserve(migration, -1)
+        self.stats['transferred_mb'] += migration['transferred']
+        self.stats['migration_seconds'] += migration['duration']
+
+        if not self._still_valid(migration):
+            self._drop(migration)
+            return
+        if not self._target_usable(migration) or random.random() < migration['failure_probability']:
+            self.stats['failed'] += 1
+            self._retry(migration)
+            return
+
+        servers = self.vm_manager.servers
+        vm, source, target = migration['vm'], servers[migration['source']], servers[migration['target']]
+        source['virtual_machines'] = [v for v in source['virtual_machines'] if v is not vm]
+        target['virtual_machines'].append(vm)
+        source['cpu_usage'] = np.clip(source['cpu_usage'] - vm['cpu_load'], 10, 95)
+        source['memory_usage'] = np.clip(source['memory_usage'] - vm['memory_load'], 20, 90)
+        source['network_load'] = np.clip(source['network_load'] - vm['network_load'], 5, 100)
+        target['cpu_usage'] = np.clip(target['cpu_usage'] + vm['cpu_load'], 10, 95)
+        target['memory_usage'] = np.clip(target['memory_usage'] + vm['memory_load'], 20, 90)
+        target['network_load'] = np.clip(target['network_load'] + vm['network_load'], 5, 100)
+
+        self._finish(migration, 'completed')
+        self.vm_manager.migration_count += 1
+        self.stats['completed'] += 1
+
+    def tick(self, now: Optional[datetime] = None):
+        """Finish migrations whose copy is done, then start what now fits."""
+        now = now or self.vm_manager.clock()
+        while self.running and self.running[0][0] <= now:
+            _, run_seq, migration = heapq.heappop(self.running)
+            if migration['state'] == 'running' and migration['run_seq'] == run_seq:
+                self._complete(migration)
+        self._dispatch(now)
+
+
+def simulate(num_servers: int = 100, ticks: int = 300, evacuate_every: int = 20, seed: int = 0,
+             max_per_host: int = 2, max_per_link: int = 4) -> Dict:
+    """Run the simulator with queued live migrations and periodic evacuations."""
+    from virtualization_manager import VirtualizationManager
+
+    random.seed(seed)
+    np.random.seed(seed)
+    start = datetime(2024, 1, 1)
+    vm_manager = VirtualizationManager(num_servers=num_servers)
+    scheduler = MigrationScheduler(vm_manager, max_per_host=max_per_host, max_per_link=max_per_link,
+                                   link_of=lambda server_id: f"Row-{(int(server_id.split('-')[1]) - 1) // 5}")
+    vm_manager.migration_scheduler = scheduler
+
+    peak_queue = 0
+    for tick in range(ticks):
+        vm_manager.clock = lambda tick=tick: start + timedelta(seconds=10 * tick)
+        if evacuate_every and tick % evacuate_every == 0:
+            loaded = [sid for sid, s in vm_manager.servers.items()
+                      if s['virtual_machines'] and not s['maintenance_start']]
+            if loaded:
+                vm_manager.start_maintenance(random.choice(loaded), 'repair')
+        vm_manager.update_server_loads()
+        vm_manager.optimize_workload()
+        peak_queue = max(peak_queue, len(scheduler))
+    return {**scheduler.stats, 'peak_pending': peak_queue}
+
+
+def benchmark(num_servers: int = 2000, migrations: int = 10000, ticks: int = 50, seed: int = 0) -> Dict:
+    """Time ticks of a scheduler holding thousands of queued migrations."""
+    import time
+    from virtualization_manager import VirtualizationManager
+
+    random.seed(seed)
+    np.random.seed(seed)
+    start = datetime(2024, 1, 1)
+    vm_manager = VirtualizationManager(num_servers=num_servers)
+    scheduler = MigrationScheduler(vm_manager, link_of=lambda server_id: f"Row-{(int(server_id.split('-')[1]) - 1) // 5}")
+    servers = [sid for sid, s in vm_manager.servers.items() if s['power_state'] != 'idle']
+    for i in range(migrations):
+        source, target = random.sample(servers, 2)
+        load = random.uniform(10, 30)
+        vm = {'id': f'VM-bench-{i}', 'source_server': source, 'cpu_load': load,
+              'memory_load': load * 1.2, 'network_load': load * 0.8}
+        vm_manager.servers[source]['virtual_machines'].append(vm)
+        scheduler.submit(vm, source, target, EVACUATION if i % 10 == 0 else REBALANCE)
+
+    elapsed = time.perf_counter()
+    for tick in range(ticks):
+        scheduler.tick(start + timedelta(seconds=10 * tick))
+    elapsed = time.perf_counter() - elapsed
+    return {'ms_per_tick': 1000 * elapsed / ticks, 'pending': len(scheduler), **scheduler.stats}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Live migration queue simulation and benchmark")
+    parser.add_argument('command', choices=['simulate', 'benchmark'])
+    parser.add_argument('--servers', type=int, default=None)
+    parser.add_argument('--ticks', type=int, default=None)
+    parser.add_argument('--migrations', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'simulate':
+        result = simulate(args.servers or 100, args.ticks or 300, seed=args.seed)
+    else:
+        result = benchmark(args.servers or 2000, args.migrations, args.ticks or 50, args.seed)
+    for key, value in result.items():
+        print(f"{key:>18}: {value:.2f}" if isinstance(value, float) else f"{key:>18}: {value}")
@@ -0,0 +1,380 @@
+import heapq
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from fastapi import FastAPI, HTTPException
+    from pydantic import BaseModel
+    FASTAPI_AVAILABLE = True
+except ImportError:  # fastapi is optional, the in-process API works without it
+    FASTAPI_AVAILABLE = False
+
+RESOURCES = ('cpu', 'memory', 'network')
+USAGE_KEYS = ('cpu_usage', 'memory_usage', 'network_load')
+
+
+class PlacementService:
+    """Admission control for VM placement requests.
+
+    Places batches of VM specs (cpu/memory/network, in % of one host) against
+    a residual-capacity index: per host, ``limits`` minus current usage minus
+    CPU arriving by live migration minus capacity held by open reservations.
+    Hosts that are idle, faulty, draining or in maintenance have no residual
+    capacity. The index is rebuilt only when the simulation ticks
+    (``state_version`` moves) or the server table is replaced; placements
+    update it in place.
+
+    Each VM goes to the feasible host with the least CPU headroom left (best
+    fit), larger VMs first. Specs that can't be placed come back with a
+    reason instead of raising. ``reserve`` holds capacity until ``commit`` or
+    ``release`` (or the TTL runs out); ``place`` does both at once. With
+    ``atomic=True`` a batch is placed entirely or not at all.
+
+    Every call takes ``lock``; pass the lock the simulation tick holds so
+    placements never interleave with a tick.
+    """
+
+    def __init__(self, vm_manager, lock=None, limits: Optional[Dict[str, float]] = None,
+                 reservation_ttl: float = 30.0):
+        self.vm_manager = vm_manager
+        self.lock = lock or threading.Lock()
+        limits = limits or {}
+        self.limits = np.array([
+            limits.get('cpu', vm_manager.consolidation_thresholds['overloaded']),
+            limits.get('memory', 90.0),
+            limits.get('network', 90.0)
+        ], dtype=float)
+        self.reservation_ttl = reservation_ttl
+
+        self.reservations: Dict[int, Dict] = {}
+        self._expiry: List = []  # heap of (expires, reservation id)
+        self._next_reservation = 1
+        self._next_vm = 1
+        self._rack_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Resource-major (resource, host) arrays: comparing whole rows is much faster than reducing over axis 1
+        self._residual = np.empty((len(RESOURCES), 0))
+        self._reserved = np.empty((len(RESOURCES), 0))
+        self._servers = None
+        self._version = None
+        self.stats = {'placed': 0, 'reserved': 0, 'rejected': 0, 'released': 0, 'expired': 0, 'rebuilds': 0}
+
+    def place(self, specs: List[Dict], atomic: bool = False) -> List[Dict]:
+        """Place a batch of VMs now; returns one result per spec, in order."""
+        with self.lock:
+            self._sync()
+            results, holds = self._admit(specs, atomic)
+            for result, hold in zip(results, holds):
+                if hold is not None:
+                    self._create(result, hold)
+            return results
+
+    def reserve(self, specs: List[Dict], atomic: bool = False, ttl: Optional[float] = None) -> Dict:
+        """Hold capacity for a batch; commit or release it before ``ttl`` seconds pass."""
+        with self.lock:
+            self._sync()
+            results, holds = self._admit(specs, atomic)
+            holds = [hold for hold in holds if hold is not None]
+            if not holds:
+                return {'reservation_id': None, 'expires_in': 0.0, 'results': results}
+
+            ttl = self.reservation_ttl if ttl is None else ttl
+            reservation_id = self._next_reservation
+            self._next_reservation += 1
+            expires = time.monotonic() + ttl
+            self.reservations[reservation_id] = {'holds': holds, 'results': results, 'expires': expires}
+            heapq.heappush(self._expiry, (expires, reservation_id))
+            for result in results:
+                if result['status'] == 'placed':
+                    result['status'] = 'reserved'
+            self.stats['reserved'] += len(holds)
+            return {'reservation_id': reservation_id, 'expires_in': ttl, 'results': results}
+
+    def commit(self, reservation_id: int) -> List[Dict]:
+        """Create the VMs of a reservation; a VM whose host became unavailable is re-placed if possible."""
+        with self.lock:
+            self._sync()
+            reservation = self.reservations.pop(reservation_id)  # KeyError if unknown or expired
+            results = []
+            for hold in reservation['holds']:
+                result = reservation['results'][hold['index']]
+                row = self._rows.get(hold['rack_id'])
+                if row is None or not np.isfinite(self._residual[0, row]):
+                    self._unhold(hold)
+                    row = self._pick(hold['demand'])
+                    if row is None:
+                        result.update(status='rejected', rack_id=None, reason='host_unavailable')
+                        self.stats['rejected'] += 1
+                        results.append(result)
+                        continue
+                    hold = self._hold(hold['index'], row, hold['demand'])
+                self._create(result, hold)
+                results.append(result)
+            return results
+
+    def release(self, reservation_id: int) -> int:
+        """Give back a reservation's capacity; returns how many VMs it held."""
+        with self.lock:
+            self._sync()
+            reservation = self.reservations.pop(reservation_id)  # KeyError if unknown or expired
+            for hold in reservation['holds']:
+                self._unhold(hold)
+            self.stats['released'] += len(reservation['holds'])
+            return len(reservation['holds'])
+
+    def capacity(self) -> Dict:
+        """Eligible hosts, free and reserved capacity per resource, and the largest free slot."""
+        with self.lock:
+            self._sync()
+            eligible = np.isfinite(self._residual[0])
+            free = np.clip(self._residual[:, eligible], 0, None)
+            return {
+                'hosts': int(eligible.sum()),
+                'free': {r: float(free[i].sum()) for i, r in enumerate(RESOURCES)},
+                'reserved': {r: max(0.0, float(self._reserved[i].sum())) for i, r in enumerate(RESOURCES)},
+                'largest_cpu': float(free[0].max()) if free.shape[1] else 0.0,
+                'open_reservations': len(self.reservations)
+            }
+
+    def _sync(self):
+        """Drop expired reservations and rebuild the index if the simulation moved on."""
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, reservation_id = heapq.heappop(self._expiry)
+            reservation = self.reservations.pop(reservation_id, None)
+            if reservation is not None:
+                for hold in reservation['holds']:
+                    self._unhold(hold)
+                self.stats['expired'] += len(reservation['holds'])
+
+        vm_manager = self.vm_manager
+        if vm_manager.servers is self._servers and vm_manager.state_version == self._version:
+            return
+        servers = vm_manager.servers
+        self._rack_ids = list(servers.keys())
+        self._rows = {rack_id: row for row, rack_id in enumerate(self._rack_ids)}
+        usage = np.array([[s[key] for s in servers.values()] for key in USAGE_KEYS], dtype=float)
+        usage = usage.reshape(len(RESOURCES), len(self._rack_ids))
+        # VMs still being live-migrated in count against their target already
+        if vm_manager.migration_scheduler is not None:
+            for rack_id, cpu in vm_manager.migration_scheduler.inbound_cpu.items():
+                row = self._rows.get(rack_id)
+                if row is not None:
+                    usage[0, row] += cpu
+        eligible = np.array([
+            s['status'] == 'active' and not s['maintenance_start'] and s['can_host_vms']
+            and s['power_state'] != 'idle' and not s['has_fault']
+            for s in servers.values()
+        ], dtype=bool)
+
+        self._reserved = np.zeros_like(usage)
+        for reservation in self.reservations.values():
+            for hold in reservation['holds']:
+                row = self._rows.get(hold['rack_id'])
+                if row is not None:
+                    self._reserved[:, row] += hold['demand']
+        self._residual = self.limits[:, None] - usage - self._reserved
+        self._residual[:, ~eligible] = -np.inf
+        self._servers = servers
+        self._version = vm_manager.state_version
+        self.stats['rebuilds'] += 1
+
+    def _admit(self, specs: List[Dict], atomic: bool):
+        """Pick hosts for a batch, largest CPU demand first; returns (results, holds) in spec order."""
+        results = [{'index': i, 'status': 'rejected', 'rack_id': None, 'vm_id': None, 'reason': None}
+                   for i in range(len(specs))]
+        holds = [None] * len(specs)
+        demands = [_demand(spec) for spec in specs]
+        order = sorted(range(len(specs)), key=lambda i: -demands[i][0] if demands[i] is not None else 0)
+
+        failed = False
+        for i in order:
+            demand = demands[i]
+            if demand is None:
+                results[i]['reason'] = 'invalid_spec'
+            elif (demand > self.limits).any():
+                results[i]['reason'] = 'exceeds_host_limits'
+            else:
+                row = self._pick(demand)
+                if row is not None:
+                    holds[i] = self._hold(i, row, demand)
+                    results[i].update(status='placed', rack_id=holds[i]['rack_id'])
+                    continue
+                results[i]['reason'] = 'no_capacity'
+            failed = True
+            if atomic:
+                break
+
+        if atomic and failed:
+            for i, hold in enumerate(holds):
+                if hold is not None:
+                    self._unhold(hold)
+                    holds[i] = None
+                    results[i].update(status='rejected', rack_id=None)
+                if results[i]['reason'] is None:
+                    results[i]['reason'] = 'batch_rejected'
+        self.stats['rejected'] += sum(result['status'] == 'rejected' for result in results)
+        return results, holds
+
+    def _pick(self, demand: np.ndarray) -> Optional[int]:
+        cpu, memory, network = self._residual
+        if not len(cpu):
+            return None
+        fits = (cpu >= demand[0]) & (memory >= demand[1]) & (network >= demand[2])
+        # Best fit: keep the big gaps free for big VMs
+        row = int(np.where(fits, cpu, np.inf).argmin())
+        return row if fits[row] else None
+
+    def _hold(self, index: int, row: int, demand: np.ndarray) -> Dict:
+        self._residual[:, row] -= demand
+        self._reserved[:, row] += demand
+        return {'index': index, 'rack_id': self._rack_ids[row], 'demand': demand}
+
+    def _unhold(self, hold: Dict):
+        row = self._rows.get(hold['rack_id'])
+        if row is not None:
+            self._residual[:, row] += hold['demand']
+            self._reserved[:, row] -= hold['demand']
+
+    def _create(self, result: Dict, hold: Dict):
+        """Turn a hold into a VM on its host; the capacity moves from reserved to used."""
+        rack_id = hold['rack_id']
+        cpu, memory, network = (float(x) for x in hold['demand'])
+        vm_id = result.get('vm_id') or f"VM-REQ-{self._next_vm}"
+        self._next_vm += 1
+        server = self.vm_manager.servers[rack_id]
+        server['virtual_machines'].append({
+            'id': vm_id,
+            'source_server': rack_id,
+            'cpu_load': cpu,
+            'memory_load': memory,
+            'network_load': network
+        })
+        server['cpu_usage'] += cpu
+        server['memory_usage'] += memory
+        server['network_load'] += network
+        self._reserved[:, self._rows[rack_id]] -= hold['demand']
+        result.update(status='placed', rack_id=rack_id, vm_id=vm_id, reason=None)
+        self.stats['placed'] += 1
+
+
+def _demand(spec) -> Optional[np.ndarray]:
+    """Demand vector of a spec; memory and network default to the simulation's VM ratios."""
+    try:
+        cpu = float(spec['cpu'])
+        memory = float(spec['memory']) if spec.get('memory') is not None else cpu * 1.2
+        network = float(spec['network']) if spec.get('network') is not None else cpu * 0.8
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    if not (cpu > 0 and memory >= 0 and network >= 0) or not math.isfinite(cpu + memory + network):
+        return None
+    return np.array([cpu, memory, network])
+
+
+if FASTAPI_AVAILABLE:
+    class VMSpec(BaseModel):
+        cpu: float
+        memory: Optional[float] = None
+        network: Optional[float] = None
+
+    class PlacementRequest(BaseModel):
+        vms: List[VMSpec]
+        atomic: bool = False
+        ttl: Optional[float] = None
+
+
+def create_api(service: PlacementService):
+    """FastAPI app exposing ``service`` over HTTP."""
+    if not FASTAPI_AVAILABLE:
+        raise ImportError("fastapi is required for the placement HTTP API")
+    api = FastAPI(title="VM placement")
+
+    def specs(request):
+        return [{'cpu': vm.cpu, 'memory': vm.memory, 'network': vm.network} for vm in request.vms]
+
+    @api.post('/placements')
+    def place(request: PlacementRequest):
+        return {'results': service.place(specs(request), request.atomic)}
+
+    @api.post('/reservations')
+    def reserve(request: PlacementRequest):
+        return service.reserve(specs(request), request.atomic, request.ttl)
+
+    @api.post('/reservations/{reservation_id}/commit')
+    def commit(reservation_id: int):
+        try:
+            return {'results': service.commit(reservation_id)}
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Unknown or expired reservation")
+
+    @api.delete('/reservations/{reservation_id}')
+    def release(reservation_id: int):
+        try:
+            return {'released': service.release(reservation_id)}
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Unknown or expired reservation")
+
+    @api.get('/capacity')
+    def capacity():
+        return service.capacity()
+
+    return api
+
+
+def serve_api(service: PlacementService, host: str = '127.0.0.1', port: int = 8000):
+    """Serve the placement API with uvicorn (blocks)."""
+    import uvicorn
+
+    uvicorn.run(create_api(service), host=host, port=port, log_level='warning')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from virtualization_manager import VirtualizationManager
+
+    parser = argparse.ArgumentParser(description="Place VM batches while the simulation ticks concurrently")
+    parser.add_argument('--racks', type=int, default=2000)
+    parser.add_argument('--vms', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=50)
+    parser.add_argument('--tick-interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    vm_manager = VirtualizationManager(args.racks)
+    lock = threading.Lock()
+    service = PlacementService(vm_manager, lock=lock)
+    stop = threading.Event()
+
+    def simulate():
+        while not stop.wait(args.tick_interval):
+            with lock:
+                vm_manager.update_server_loads()
+                vm_manager.optimize_workload()
+
+    ticker = threading.Thread(target=simulate, daemon=True)
+    ticker.start()
+    rng = np.random.default_rng(0)
+    elapsed = time.perf_counter()
+    for start in range(0, args.vms, args.batch):
+        size = min(args.batch, args.vms - start)
+        batch = [{'cpu': float(c)} for c in rng.uniform(0.5, 5.0, size)]
+        if start // args.batch % 2:
+            reservation = service.reserve(batch)
+            try:
+                service.commit(reservation['reservation_id'])
+            except KeyError:  # nothing was reserved, or it expired behind a long tick
+                pass
+        else:
+            service.place(batch)
+    elapsed = time.perf_counter() - elapsed
+    stop.set()
+    ticker.join()
+
+    print(f"{args.vms} placement requests in {elapsed:.2f}s ({args.vms / elapsed:.0f}/s)")
+    for key, value in service.stats.items():
+        print(f"{key:>10}: {value}")
+    print(service.capacity())
@@ -0,0 +1,88 @@
+import math
+from typing import Dict, Optional, Tuple
+
+DEFAULT_PREDICTION = {'status': 'normal', 'confidence': 0.0, 'predicted_failure_time': None, 'reasons': []}
+
+
+class RackDetailCache:
+    """Cached, versioned detail records for single racks.
+
+    A record's ``version`` changes only when something it shows changes:
+    metrics at display precision, power state, maintenance or fault state,
+    the prediction, or the hosted VMs. ``vm_version`` tracks the VM list on
+    its own, so a dashboard can skip re-rendering a rack, or just its VM
+    list, while nothing visible has moved. Reads touch one rack, never the
+    whole fleet.
+    """
+
+    def __init__(self, vm_manager, detector, precision: int = 1):
+        self.vm_manager = vm_manager
+        self.detector = detector
+        self.precision = precision  # decimals shown for metrics
+        self._records: Dict[str, Dict] = {}  # rack_id -> {'key', 'vm_key', 'record'}
+
+    def _keys(self, rack_id: str) -> Tuple[Tuple, Tuple]:
+        status = self.vm_manager.get_rack_status(rack_id)
+        prediction = self.detector.predictions.get(rack_id, DEFAULT_PREDICTION)
+        p = self.precision
+        vm_key = tuple(id(vm) for vm in status['virtual_machines'])
+        key = (
+            round(status['cpu_usage'], p), round(status['memory_usage'], p),
+            round(status['network_load'], p), round(status['temperature'], p),
+            status['power_state'], status['status'], status['maintenance_type'], status['has_fault'],
+            prediction['status'], round(prediction['confidence'], 3), tuple(prediction['reasons']),
+            prediction['predicted_failure_time'], vm_key
+        )
+        return key, vm_key
+
+    def get(self, rack_id: str) -> Dict:
+        """Detail record of one rack, rebuilt only if its visible state changed."""
+        key, vm_key = self._keys(rack_id)
+        entry = self._records.get(rack_id)
+        if entry is not None and entry['key'] == key:
+            return entry['record']
+
+        status = self.vm_manager.get_rack_status(rack_id)
+        previous = entry['record'] if entry is not None else None
+        record = {
+            'rack_id': rack_id,
+            'version': previous['version'] + 1 if previous else 1,
+            'vm_version': (previous['vm_version'] + (entry['vm_key'] != vm_key)) if previous else 1,
+            'power_state': status['power_state'],
+            'status': status['status'],
+            'maintenance_type': status['maintenance_type'],
+            'has_fault': status['has_fault'],
+            'fault_type': status['fault_type'],
+            'temperature': float(status['temperature']),
+            'cpu_usage': float(status['cpu_usage']),
+            'memory_usage': float(status['memory_usage']),
+            'network_load': float(status['network_load']),
+            'vm_count': len(status['virtual_machines']),
+            'prediction': dict(self.detector.predictions.get(rack_id, DEFAULT_PREDICTION)),
+        }
+        self._records[rack_id] = {'key': key, 'vm_key': vm_key, 'record': record}
+        return record
+
+    def vm_page(self, rack_id: str, page: int = 0, page_size: int = 20) -> Dict:
+        """One page of a rack's VMs (page numbers start at 0 and are clamped to the last page)."""
+        vms = self.vm_manager.get_rack_status(rack_id)['virtual_machines']
+        pages = max(1, math.ceil(len(vms) / page_size))
+        page = min(max(page, 0), pages - 1)
+        return {
+            'rack_id': rack_id,
+            'vm_version': self.get(rack_id)['vm_version'],
+            'page': page,
+            'pages': pages,
+            'total': len(vms),
+            'items': [
+                {'id': vm['id'], 'source_server': vm['source_server'], 'cpu_load': float(vm['cpu_load'])}
+                for vm in vms[page * page_size:(page + 1) * page_size]
+            ],
+        }
+
+    def invalidate(self, rack_id: Optional[str] = None):
+        """Drop cached records, e.g. after restoring a snapshot."""
+        if rack_id is None:
+            self._records.clear()
+        else:
+            self._records.pop(rack_id, None)
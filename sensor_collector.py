@@ -0,0 +1,186 @@
+import asyncio
+import csv
+import threading
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+METRICS = ('temperature', 'vibration', 'power')
+
+# Per-tick readings: rack_id -> {metric: value}; a source may report a subset of metrics
+Readings = Dict[str, Dict[str, float]]
+
+
+class SensorSource:
+    """Base class for a pluggable sensor source polled by the collector."""
+
+    def __init__(self, name: str, timeout: float = 1.0):
+        self.name = name
+        self.timeout = timeout  # seconds the collector waits for this source each tick
+
+    async def read(self) -> Readings:
+        """Return the latest readings from this source."""
+        raise NotImplementedError
+
+
+class SimulatedSensorSource(SensorSource):
+    """Local simulated sensors: temperature from the simulator, vibration and power drawn per tick."""
+
+    def __init__(self, vm_manager, name: str = 'simulated', timeout: float = 1.0):
+        super().__init__(name, timeout)
+        self.vm_manager = vm_manager
+
+    async def read(self) -> Readings:
+        server_status = self.vm_manager.get_server_status()
+        rack_ids = list(server_status.keys())
+        vibration = np.random.normal(0.5, 0.2, len(rack_ids))
+        power = np.random.normal(1000, 100, len(rack_ids))
+
+        return {
+            rack_id: {
+                'temperature': float(server_status[rack_id]['temperature']),
+                'vibration': float(vibration[i]),
+                'power': float(power[i])
+            }
+            for i, rack_id in enumerate(rack_ids)
+        }
+
+
+class FileReplaySource(SensorSource):
+    """Replay recorded readings from a CSV file, one tick per poll.
+
+    The file has a header ``tick,rack_id,temperature,vibration,power`` with rows
+    grouped by tick; empty metric cells are treated as not reported.
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None, timeout: float = 1.0, loop_file: bool = False):
+        super().__init__(name or path, timeout)
+        self.path = path
+        self.loop_file = loop_file
+        self._file = None
+        self._reader = None
+        self._next_row = None
+
+    def _open(self):
+        self._file = open(self.path, newline='')
+        self._reader = csv.DictReader(self._file)
+        self._next_row = next(self._reader, None)
+
+    def _read_tick(self) -> Readings:
+        if self._reader is None:
+            self._open()
+        if self._next_row is None:
+            if not self.loop_file:
+                return {}
+            self.close()
+            self._open()
+            if self._next_row is None:
+                return {}
+
+        tick = self._next_row['tick']
+        readings: Readings = {}
+        while self._next_row is not None and self._next_row['tick'] == tick:
+            row = self._next_row
+            readings[row['rack_id']] = {
+                metric: float(row[metric]) for metric in METRICS if row.get(metric) not in (None, '')
+            }
+            self._next_row = next(self._reader, None)
+        return readings
+
+    async def read(self) -> Readings:
+        # File IO runs in a worker thread so it never blocks the other sources
+        return await asyncio.to_thread(self._read_tick)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._reader = None
+        self._next_row = None
+
+
+class SensorCollector:
+    """Poll sensor sources concurrently and feed coalesced per-tick batches to the detector.
+
+    Each source gets its own timeout. A source that misses it is not cancelled:
+    its read stays in flight and its readings are merged into whichever tick it
+    completes in, so one slow source never stalls scoring for the fleet.
+    """
+
+    def __init__(self, detector, sources: Iterable[SensorSource] = ()):
+        self.detector = detector
+        self.sources: List[SensorSource] = list(sources)
+        self.latest: Readings = {}  # last known value of every metric per rack
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def add_source(self, source: SensorSource):
+        self.sources.append(source)
+
+    async def _poll(self, source: SensorSource) -> Readings:
+        stats = self.stats.setdefault(source.name, {'ok': 0, 'timeouts': 0, 'errors': 0})
+
+        task = self._in_flight.get(source.name)
+        if task is None:
+            task = asyncio.ensure_future(source.read())
+            self._in_flight[source.name] = task
+
+        try:
+            readings = await asyncio.wait_for(asyncio.shield(task), source.timeout)
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            return {}
+        except Exception:
+            stats['errors'] += 1
+            del self._in_flight[source.name]
+            return {}
+
+        del self._in_flight[source.name]
+        stats['ok'] += 1
+        return readings
+
+    async def collect_tick(self) -> Readings:
+        """Poll all sources, feed the detector and score the fleet once."""
+        results = await asyncio.gather(*(self._poll(source) for source in self.sources))
+
+        # Coalesce: later sources override earlier ones metric by metric
+        batch: Readings = {}
+        for readings in results:
+            for rack_id, metrics in readings.items():
+                batch.setdefault(rack_id, {}).update(metrics)
+
+        for rack_id, metrics in batch.items():
+            merged = self.latest.setdefault(rack_id, {})
+            merged.update(metrics)
+            if all(metric in merged for metric in METRICS):
+                self.detector.analyze_rack(
+                    rack_id, merged['temperature'], merged['vibration'], merged['power'], score=False
+                )
+
+        self.detector.score_all()
+        return batch
+
+    def collect(self) -> Readings:
+        """Run one collection tick from synchronous code such as Dash callbacks."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(self.collect_tick())
+
+    def close(self):
+        """Cancel reads still in flight and release the synchronous event loop."""
+        for task in self._in_flight.values():
+            task.cancel()
+        self._in_flight.clear()
+        if self._loop is not None:
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+            self._loop = None
+
+    async def run(self, interval: float, ticks: Optional[int] = None):
+        """Collect every ``interval`` seconds, forever or for ``ticks`` ticks."""
+        count = 0
+        while ticks is None or count < ticks:
+            await asyncio.gather(self.collect_tick(), asyncio.sleep(interval))
+            count += 1
@@ -0,0 +1,410 @@
+import os
+import time
+import argparse
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+# Power states stored as small integers in the columnar state
+NORMAL, IDLE, WARNING = 0, 1, 2
+POWER_STATES = ('normal', 'idle', 'warning')
+
+# Per-rack columns owned by a shard
+RACK_FIELDS = (
+    ('base_load', np.float64),
+    ('cpu_usage', np.float64),
+    ('memory_usage', np.float64),
+    ('network_load', np.float64),
+    ('temperature', np.float64),
+    ('vm_cpu', np.float64),  # total CPU load of hosted VMs
+    ('vm_count', np.int32),
+    ('fault_ticks', np.int32),  # ticks left until a fault is repaired, 0 when healthy
+    ('power_state', np.int8),
+)
+
+# Per-slot columns of the shard's VM table; vm_host is -1 for free slots
+VM_FIELDS = (
+    ('vm_id', np.int64),
+    ('vm_host', np.int32),
+    ('vm_source', np.int32),  # global index of the rack the VM was created on
+    ('vm_cpu_load', np.float64),
+    ('vm_memory_load', np.float64),
+    ('vm_network_load', np.float64),
+)
+
+
+def _layout(num_racks: int, vm_capacity: int) -> Tuple[List[Tuple[str, np.dtype, int, int]], int]:
+    """Return (name, dtype, length, offset) for every column and the block size."""
+    columns, offset = [], 0
+    for fields, length in ((RACK_FIELDS, num_racks), (VM_FIELDS, vm_capacity)):
+        for name, dtype in fields:
+            dtype = np.dtype(dtype)
+            offset += -offset % 8  # keep every column 8-byte aligned
+            columns.append((name, dtype, length, offset))
+            offset += dtype.itemsize * length
+    return columns, max(offset, 1)
+
+
+class ShardState:
+    """Columnar state of one shard, carved out of a single shared-memory block."""
+
+    def __init__(self, num_racks: int, vm_capacity: int, name: Optional[str] = None):
+        self.num_racks = num_racks
+        self.vm_capacity = vm_capacity
+        columns, size = _layout(num_racks, vm_capacity)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        for column, dtype, length, offset in columns:
+            setattr(self, column, np.ndarray((length,), dtype=dtype, buffer=self.shm.buf, offset=offset))
+
+    def close(self):
+        for column, _, _, _ in _layout(self.num_racks, self.vm_capacity)[0]:
+            setattr(self, column, None)  # release buffer views before closing
+        self.shm.close()
+
+
+class ShardWorker:
+    """Tick logic for one shard, run inside its worker process."""
+
+    def __init__(self, state: ShardState, thresholds: Dict[str, float], fault_rate: float,
+                 repair_ticks: int, max_offers: int, seed: Optional[int]):
+        self.state = state
+        self.thresholds = thresholds
+        self.fault_rate = fault_rate
+        self.repair_ticks = repair_ticks
+        self.max_offers = max_offers
+        self.rng = np.random.default_rng(seed)
+
+    def _refresh_vm_totals(self):
+        s = self.state
+        hosted = s.vm_host >= 0
+        s.vm_cpu[:] = np.bincount(s.vm_host[hosted], weights=s.vm_cpu_load[hosted], minlength=s.num_racks)
+        s.vm_count[:] = np.bincount(s.vm_host[hosted], minlength=s.num_racks)
+
+    def tick(self) -> Dict:
+        """Update loads, temperatures and faults, then offer VMs and spare capacity."""
+        s, rng, n = self.state, self.rng, self.state.num_racks
+        idle = s.power_state == IDLE
+
+        # Faults: new ones at fault_rate, existing ones count down to repair
+        healthy = s.fault_ticks == 0
+        new_faults = healthy & ~idle & (rng.random(n) < self.fault_rate)
+        s.fault_ticks[~healthy] -= 1
+        s.fault_ticks[new_faults] = self.repair_ticks
+        faulty = s.fault_ticks > 0
+        s.power_state[faulty] = WARNING
+        s.power_state[~faulty & (s.power_state == WARNING)] = NORMAL
+
+        self._refresh_vm_totals()
+        variation = rng.normal(0, 5, n)
+        s.base_load[:] = np.clip(s.base_load + variation * 0.2, 5, 60)
+        s.cpu_usage[:] = np.where(idle, 5, np.clip(s.base_load + s.vm_cpu, 10, 95))
+        s.memory_usage[:] = np.where(idle, 10, np.clip((s.base_load + s.vm_cpu) * 1.2 + variation * 0.5, 20, 90))
+        s.network_load[:] = np.where(idle, 3, np.clip((s.base_load + s.vm_cpu) * 0.8 + variation * 1.5, 5, 100))
+        s.temperature[:] = np.where(
+            idle, s.temperature,
+            np.where(faulty, rng.uniform(45, 50, n),
+                     np.clip(35 + s.cpu_usage / 10 + rng.normal(0, 0.5, n), 30, 50))
+        )
+
+        # Offer the largest VM of every overloaded rack
+        hosted = np.flatnonzero(s.vm_host >= 0)
+        order = hosted[np.lexsort((-s.vm_cpu_load[hosted], s.vm_host[hosted]))]
+        hosts, first = np.unique(s.vm_host[order], return_index=True)
+        largest = order[first]
+        overloaded = s.cpu_usage[hosts] > self.thresholds['overloaded']
+        offers = largest[overloaded]
+        if len(offers) > self.max_offers:
+            offers = offers[np.argpartition(-s.vm_cpu_load[offers], self.max_offers)[:self.max_offers]]
+
+        # Underutilized, healthy, powered racks accept load up to the overload threshold
+        receivers = np.flatnonzero(
+            (s.cpu_usage < self.thresholds['underutilized']) & (s.power_state == NORMAL)
+        )
+        spare = self.thresholds['overloaded'] - s.cpu_usage[receivers]
+        if len(receivers) > self.max_offers:
+            keep = np.argpartition(-spare, self.max_offers)[:self.max_offers]
+            receivers, spare = receivers[keep], spare[keep]
+
+        return {
+            'offer_slots': offers,
+            'offer_loads': s.vm_cpu_load[offers].copy(),
+            'receivers': receivers,
+            'spare': spare,
+            'free_slots': int(s.vm_capacity - len(hosted)),
+        }
+
+    def migrate(self, evict_slots: np.ndarray, admits: Dict[str, np.ndarray], wake: int) -> Dict:
+        """Apply this round's migrations, then power racks down or up."""
+        s = self.state
+        s.vm_host[evict_slots] = -1
+
+        count = len(admits['host'])
+        if count:
+            slots = np.flatnonzero(s.vm_host < 0)[:count]
+            s.vm_host[slots] = admits['host']
+            s.vm_id[slots] = admits['vm_id']
+            s.vm_source[slots] = admits['source']
+            s.vm_cpu_load[slots] = admits['cpu']
+            s.vm_memory_load[slots] = admits['memory']
+            s.vm_network_load[slots] = admits['network']
+
+        self._refresh_vm_totals()
+        powered = s.power_state != IDLE
+        s.cpu_usage[powered] = np.clip(s.base_load[powered] + s.vm_cpu[powered], 10, 95)
+
+        # Power down empty racks below the idle threshold; wake racks the coordinator asked for
+        empty = (s.vm_count == 0) & (s.cpu_usage < self.thresholds['idle']) & (s.power_state == NORMAL)
+        s.power_state[empty] = IDLE
+        woken = 0
+        if wake:
+            candidates = np.flatnonzero((s.power_state == IDLE) & ~empty)[:wake]
+            s.power_state[candidates] = NORMAL
+            s.base_load[candidates] = 30
+            woken = len(candidates)
+
+        return {
+            'idle': int(np.count_nonzero(s.power_state == IDLE)),
+            'powered_down': int(np.count_nonzero(empty)),
+            'woken': woken,
+        }
+
+
+def _worker_main(connection, shm_name: str, num_racks: int, vm_capacity: int, options: Dict):
+    """Entry point of a shard process: serve tick/migrate requests until stopped."""
+    state = ShardState(num_racks, vm_capacity, name=shm_name)
+    worker = ShardWorker(state, **options)
+    try:
+        while True:
+            command, payload = connection.recv()
+            if command == 'tick':
+                connection.send(worker.tick())
+            elif command == 'migrate':
+                connection.send(worker.migrate(*payload))
+            elif command == 'stop':
+                break
+    finally:
+        del worker
+        state.close()
+        connection.close()
+
+
+class ShardedFleetSimulation:
+    """Fleet simulation partitioned across worker processes by contiguous rack ranges.
+
+    Each shard owns the columnar state of its racks in shared memory and runs
+    its tick in its own process. The coordinator matches overloaded and
+    underutilized racks across all shards in two batched message rounds per
+    tick: every shard reports offers, then every shard receives its evictions,
+    admissions and wake-ups at once.
+
+    This is a separate, simplified model, not a sharded mode of
+    VirtualizationManager: it re-implements the load, temperature, fault and
+    consolidation rules in vectorized form, and has no maintenance, migration
+    scheduler, detector or placement service. Its numbers are therefore not
+    comparable one-to-one with the dashboard simulation. Migrations only
+    move VMs between racks, so the VM set and its total load are conserved.
+    The benchmark reports ticks/s for one shard count; any speed-up from more
+    shards depends on the cores available.
+    """
+
+    def __init__(self, num_racks: int, num_shards: Optional[int] = None, vms_per_rack: int = 8,
+                 fault_rate: float = 0.0005, repair_ticks: int = 12, max_offers: int = 4096,
+                 thresholds: Optional[Dict[str, float]] = None, seed: Optional[int] = None):
+        self.num_racks = num_racks
+        self.num_shards = max(1, min(num_shards or os.cpu_count() or 1, num_racks))
+        self.thresholds = thresholds or {'overloaded': 80, 'underutilized': 30, 'idle': 15}
+        self.boundaries = np.linspace(0, num_racks, self.num_shards + 1).astype(np.int64)
+        rng = np.random.default_rng(seed)
+
+        self.states: List[ShardState] = []
+        self.connections = []
+        self.processes = []
+        for shard in range(self.num_shards):
+            first, last = int(self.boundaries[shard]), int(self.boundaries[shard + 1])
+            state = ShardState(last - first, (last - first) * vms_per_rack)
+            self._initialize(state, first, shard, rng)
+            self.states.append(state)
+
+            options = {
+                'thresholds': self.thresholds, 'fault_rate': fault_rate, 'repair_ticks': repair_ticks,
+                'max_offers': max_offers,
+                'seed': None if seed is None else seed + shard + 1,
+            }
+            parent, child = mp.Pipe()
+            process = mp.Process(
+                target=_worker_main, args=(child, state.shm.name, state.num_racks, state.vm_capacity, options),
+                name=f'fleet-shard-{shard}', daemon=True
+            )
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    @staticmethod
+    def _initialize(state: ShardState, first_rack: int, shard: int, rng: np.random.Generator):
+        """Random initial fleet, mirroring VirtualizationManager.initialize_servers."""
+        n = state.num_racks
+        idle = rng.random(n) < 0.2
+        state.base_load[:] = np.clip(rng.normal(30, 10, n), 5, 60)
+        state.power_state[:] = np.where(idle, IDLE, NORMAL)
+        state.temperature[:] = rng.normal(35, 2, n)
+        state.fault_ticks[:] = 0
+        state.vm_host[:] = -1
+
+        # 1-3 VMs on 60% of the active racks, created from random active racks
+        active = np.flatnonzero(~idle)
+        if len(active):
+            hosts = rng.choice(active, size=int(len(active) * 0.6), replace=False)
+            counts = np.minimum(rng.integers(1, 4, len(hosts)), max(state.vm_capacity // max(n, 1), 1))
+            vm_hosts = np.repeat(hosts, counts)[:state.vm_capacity]
+            loads = rng.uniform(10, 30, len(vm_hosts))
+            slots = np.arange(len(vm_hosts))
+            state.vm_host[slots] = vm_hosts
+            state.vm_id[slots] = (shard << 40) + slots
+            state.vm_source[slots] = first_rack + rng.choice(active, len(vm_hosts))
+            state.vm_cpu_load[slots] = loads
+            state.vm_memory_load[slots] = loads * 1.2
+            state.vm_network_load[slots] = loads * 0.8
+
+    def _broadcast(self, messages: List[Tuple[str, object]]) -> List[Dict]:
+        for connection, message in zip(self.connections, messages):
+            connection.send(message)
+        return [connection.recv() for connection in self.connections]
+
+    def tick(self) -> Dict:
+        """Advance every shard by one tick and run one round of global consolidation."""
+        reports = self._broadcast([('tick', None)] * self.num_shards)
+
+        # Flatten offers and receivers across shards
+        offer_shard = np.concatenate([np.full(len(r['offer_slots']), i) for i, r in enumerate(reports)])
+        offer_slots = np.concatenate([r['offer_slots'] for r in reports])
+        offer_loads = np.concatenate([r['offer_loads'] for r in reports])
+        receiver_shard = np.concatenate([np.full(len(r['receivers']), i) for i, r in enumerate(reports)])
+        receivers = np.concatenate([r['receivers'] for r in reports])
+        spare = np.concatenate([r['spare'] for r in reports])
+
+        # Maximum number of VMs that fit: the k smallest offers against the k roomiest
+        # receivers, smallest offer paired with the k-th roomiest. Feasibility is
+        # monotone in k, so k is found by binary search.
+        offer_order = np.argsort(offer_loads, kind='stable')
+        receiver_order = np.argsort(-spare, kind='stable')
+        low, high = 0, min(len(offer_order), len(receiver_order))
+        while low < high:
+            k = (low + high + 1) // 2
+            if np.all(offer_loads[offer_order[:k]] <= spare[receiver_order[:k][::-1]]):
+                low = k
+            else:
+                high = k - 1
+        offer_order, receiver_order = offer_order[:low], receiver_order[:low][::-1]
+
+        # Never admit more VMs into a shard than it has free slots
+        destination = receiver_shard[receiver_order]
+        rank = np.zeros(len(destination), dtype=np.int64)
+        for shard in range(self.num_shards):
+            mask = destination == shard
+            rank[mask] = np.arange(np.count_nonzero(mask))
+        free = np.array([r['free_slots'] for r in reports])
+        allowed = rank < free[destination] if len(destination) else np.zeros(0, dtype=bool)
+        offer_order, receiver_order, destination = offer_order[allowed], receiver_order[allowed], destination[allowed]
+
+        unplaced = len(offer_loads) - len(offer_order)
+        wake_per_shard = -(-unplaced // self.num_shards) if unplaced else 0
+
+        # Read the migrating VM records straight from the source shards' shared memory
+        source_shard, source_slot = offer_shard[offer_order], offer_slots[offer_order]
+        records = {
+            'vm_id': np.empty(len(offer_order), dtype=np.int64),
+            'source': np.empty(len(offer_order), dtype=np.int32),
+            'cpu': np.empty(len(offer_order)),
+            'memory': np.empty(len(offer_order)),
+            'network': np.empty(len(offer_order)),
+        }
+        for shard, state in enumerate(self.states):
+            mask = source_shard == shard
+            slots = source_slot[mask]
+            records['vm_id'][mask] = state.vm_id[slots]
+            records['source'][mask] = state.vm_source[slots]
+            records['cpu'][mask] = state.vm_cpu_load[slots]
+            records['memory'][mask] = state.vm_memory_load[slots]
+            records['network'][mask] = state.vm_network_load[slots]
+
+        messages = []
+        for shard in range(self.num_shards):
+            incoming = destination == shard
+            admits = {name: values[incoming] for name, values in records.items()}
+            admits['host'] = receivers[receiver_order[incoming]]
+            messages.append(('migrate', (source_slot[source_shard == shard], admits, wake_per_shard)))
+
+        results = self._broadcast(messages)
+        return {
+            'migrations': int(len(offer_order)),
+            'cross_shard_migrations': int(np.count_nonzero(source_shard != destination)),
+            'unplaced_offers': int(unplaced),
+            'idle_racks': sum(r['idle'] for r in results),
+            'powered_down': sum(r['powered_down'] for r in results),
+            'woken': sum(r['woken'] for r in results),
+        }
+
+    def column(self, name: str) -> np.ndarray:
+        """Fleet-wide copy of a per-rack column, read from shared memory."""
+        return np.concatenate([getattr(state, name) for state in self.states])
+
+    def rack_status(self, rack: int) -> Dict:
+        """Status of one rack (0-based global index) in VirtualizationManager style."""
+        shard = int(np.searchsorted(self.boundaries, rack, side='right') - 1)
+        state, local = self.states[shard], rack - int(self.boundaries[shard])
+        slots = np.flatnonzero(state.vm_host == local)
+        return {
+            'cpu_usage': float(state.cpu_usage[local]),
+            'memory_usage': float(state.memory_usage[local]),
+            'network_load': float(state.network_load[local]),
+            'temperature': float(state.temperature[local]),
+            'power_state': POWER_STATES[state.power_state[local]],
+            'has_fault': bool(state.fault_ticks[local] > 0),
+            'virtual_machines': [
+                {
+                    'id': f"VM-{int(state.vm_id[slot])}",
+                    'source_server': f"Rack-{int(state.vm_source[slot]) + 1}",
+                    'cpu_load': float(state.vm_cpu_load[slot]),
+                    'memory_load': float(state.vm_memory_load[slot]),
+                    'network_load': float(state.vm_network_load[slot]),
+                }
+                for slot in slots
+            ],
+        }
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        for connection in self.connections:
+            try:
+                connection.send(('stop', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+        for state in self.states:
+            state.close()
+            state.shm.unlink()
+        self.connections, self.processes, self.states = [], [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the sharded fleet simulation")
+    parser.add_argument('--racks', type=int, default=100_000)
+    parser.add_argument('--shards', type=int, default=None)
+    parser.add_argument('--ticks', type=int, default=50)
+    args = parser.parse_args()
+
+    with ShardedFleetSimulation(args.racks, args.shards, seed=0) as simulation:
+        started = time.perf_counter()
+        for _ in range(args.ticks):
+            summary = simulation.tick()
+        elapsed = time.perf_counter() - started
+        print(f"{simulation.num_shards} shards, {args.racks} racks: {args.ticks / elapsed:.1f} ticks/s")
+        print(summary)
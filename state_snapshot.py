@@ -0,0 +1,318 @@
+import os
+import tempfile
+import threading
+import numpy as np
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, List, Optional
+from metric_history import MetricHistory
+
+SNAPSHOT_VERSION = 1
+
+# mkstemp creates files as 0600; snapshots get the mode a plain open() would give them.
+# Read once at import, since os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+SNAPSHOT_MODE = 0o666 & ~_UMASK
+
+# Fields of the alert pipeline's active alerts, saved column by column
+ALERT_TEXT_FIELDS = ('rack_id', 'metric', 'severity', 'state')
+ALERT_TIME_FIELDS = ('opened_at', 'last_seen', 'acknowledged_at')
+
+# Array-backed detector components saved buffer for buffer
+CHANGE_DETECTOR_ARRAYS = ('_count', '_mean', '_var', '_ewma', '_cusum_pos', '_cusum_neg')
+FAILURE_PREDICTOR_ARRAYS = ('_count', '_sum', '_sum_sq', '_sum_xy', '_ewma', '_alert_rate')
+
+
+def _to_datetime64(values) -> np.ndarray:
+    """Convert datetimes (or None) to datetime64[us], with None as NaT."""
+    return np.array(list(values), dtype='datetime64[us]')
+
+
+def _from_datetime64(values: np.ndarray) -> List[Optional[datetime]]:
+    """Convert datetime64[us] back to datetimes, with NaT as None."""
+    return values.astype('datetime64[us]').tolist()
+
+
+def _flatten(groups: List[list]):
+    """Flatten a list of lists into (items, lengths) for ragged storage."""
+    lengths = np.fromiter((len(group) for group in groups), dtype=np.int64, count=len(groups))
+    return list(chain.from_iterable(groups)), lengths
+
+
+def _split(values, lengths: np.ndarray) -> List:
+    """Inverse of _flatten: slice a flat sequence back into per-item groups."""
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(lengths))]
+
+
+def _servers_to_arrays(vm_manager) -> Dict[str, np.ndarray]:
+    servers = vm_manager.servers
+    server_ids = list(servers.keys())
+    rows = list(servers.values())
+    vms, vm_counts = _flatten([server['virtual_machines'] for server in rows])
+
+    def column(key, dtype):
+        return np.array([server[key] for server in rows], dtype=dtype)
+
+    return {
+        'server_ids': np.array(server_ids, dtype=str),
+        'server_cpu_usage': column('cpu_usage', float),
+        'server_memory_usage': column('memory_usage', float),
+        'server_network_load': column('network_load', float),
+        'server_temperature': column('temperature', float),
+        'server_status': column('status', str),
+        'server_power_state': column('power_state', str),
+        'server_can_host_vms': column('can_host_vms', bool),
+        'server_maintenance_start': _to_datetime64(server['maintenance_start'] for server in rows),
+        'server_maintenance_type': np.array([server['maintenance_type'] or '' for server in rows], dtype=str),
+        'server_has_fault': column('has_fault', bool),
+        'server_fault_type': np.array([server['fault_type'] or '' for server in rows], dtype=str),
+        'vm_counts': vm_counts,
+        'vm_ids': np.array([vm['id'] for vm in vms], dtype=str),
+        'vm_source_server': np.array([vm['source_server'] for vm in vms], dtype=str),
+        'vm_cpu_load': np.array([vm['cpu_load'] for vm in vms], dtype=float),
+        'vm_memory_load': np.array([vm['memory_load'] for vm in vms], dtype=float),
+        'vm_network_load': np.array([vm['network_load'] for vm in vms], dtype=float),
+        'manager_last_fault_time': _to_datetime64([vm_manager.last_fault_time]),
+        'manager_fault_interval': np.array(vm_manager.fault_interval.total_seconds()),
+        'manager_threshold_names': np.array(list(vm_manager.consolidation_thresholds.keys()), dtype=str),
+        'manager_threshold_values': np.array(list(vm_manager.consolidation_thresholds.values()), dtype=float),
+    }
+
+
+def _detector_to_arrays(detector) -> Dict[str, np.ndarray]:
+    rack_ids = detector.metric_history.rack_ids
+    arrays = {f'history_{key}': value for key, value in detector.metric_history.to_arrays().items()}
+
+    alerts, alert_counts = _flatten([detector.alert_history.get(rack_id, []) for rack_id in rack_ids])
+    arrays['alert_counts'] = alert_counts
+    arrays['alert_times'] = np.fromiter((alert[0].timestamp() for alert in alerts), dtype=float, count=len(alerts))
+    arrays['alert_levels'] = np.array([alert[1] for alert in alerts], dtype=str)
+
+    # Active alerts, so a restart doesn't re-open (and re-notify) every ongoing breach
+    active = list(detector.alerts.active.values())
+    arrays['alert_next_id'] = np.array(detector.alerts._next_id)
+    arrays['active_alert_ids'] = np.array([alert['id'] for alert in active], dtype=np.int64)
+    arrays['active_alert_count'] = np.array([alert['count'] for alert in active], dtype=np.int64)
+    arrays['active_alert_normal_run'] = np.array([alert['normal_run'] for alert in active], dtype=np.int64)
+    arrays['active_alert_value'] = np.array(
+        [np.nan if alert['value'] is None else alert['value'] for alert in active], dtype=float
+    )
+    for field in ALERT_TEXT_FIELDS:
+        arrays[f'active_alert_{field}'] = np.array([alert[field] for alert in active], dtype=str)
+    for field in ALERT_TIME_FIELDS:
+        arrays[f'active_alert_{field}'] = _to_datetime64(alert[field] for alert in active)
+
+    predictions = [detector.predictions[rack_id] for rack_id in rack_ids]
+    reasons, reason_counts = _flatten([p['reasons'] for p in predictions])
+    arrays['prediction_status'] = np.array([p['status'] for p in predictions], dtype=str)
+    arrays['prediction_confidence'] = np.array([p['confidence'] for p in predictions], dtype=float)
+    arrays['prediction_failure_time'] = _to_datetime64(p['predicted_failure_time'] for p in predictions)
+    arrays['prediction_reason_counts'] = reason_counts
+    arrays['prediction_reasons'] = np.array(reasons, dtype=str)
+
+    for prefix, component, names in (
+        ('change', detector.change_detector, CHANGE_DETECTOR_ARRAYS),
+        ('predictor', detector.predictor, FAILURE_PREDICTOR_ARRAYS),
+    ):
+        if component is None:
+            continue
+        size = len(component.rack_ids)
+        arrays[f'{prefix}_rack_ids'] = np.array(component.rack_ids, dtype=str)
+        for name in names:
+            arrays[f'{prefix}{name}'] = getattr(component, name)[:size]
+
+    return arrays
+
+
+def save_snapshot(path: str, vm_manager, detector):
+    """Write the full simulator and detector state to ``path`` atomically."""
+    detector.change_detector.flush()
+    arrays = {'version': np.array(SNAPSHOT_VERSION)}
+    arrays.update(_servers_to_arrays(vm_manager))
+    arrays.update({f'detector_{key}': value for key, value in _detector_to_arrays(detector).items()})
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # A private temp file per save, so concurrent writers never share one
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.chmod(tmp_path, SNAPSHOT_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _restore_servers(vm_manager, data):
+    vm_counts = data['vm_counts']
+    vm_columns = [
+        _split(data['vm_ids'].tolist(), vm_counts),
+        _split(data['vm_source_server'].tolist(), vm_counts),
+        _split(data['vm_cpu_load'].tolist(), vm_counts),
+        _split(data['vm_memory_load'].tolist(), vm_counts),
+        _split(data['vm_network_load'].tolist(), vm_counts),
+    ]
+    columns = zip(
+        data['server_ids'].tolist(), data['server_cpu_usage'].tolist(), data['server_memory_usage'].tolist(),
+        data['server_network_load'].tolist(), data['server_status'].tolist(), data['server_power_state'].tolist(),
+        data['server_temperature'].tolist(), data['server_can_host_vms'].tolist(),
+        _from_datetime64(data['server_maintenance_start']), data['server_maintenance_type'].tolist(),
+        data['server_has_fault'].tolist(), data['server_fault_type'].tolist(), *vm_columns
+    )
+
+    # The migration queue isn't saved, so only a drain the power scheduler still tracks keeps a host closed
+    power_scheduler = getattr(vm_manager, 'power_scheduler', None)
+    draining = power_scheduler.draining if power_scheduler is not None else set()
+
+    servers = {}
+    for (server_id, cpu_usage, memory_usage, network_load, status, power_state, temperature, can_host_vms,
+         maintenance_start, maintenance_type, has_fault, fault_type, ids, sources, cpu, memory, network) in columns:
+        servers[server_id] = {
+            'cpu_usage': cpu_usage,
+            'memory_usage': memory_usage,
+            'network_load': network_load,
+            'virtual_machines': [
+                {'id': vm_id, 'source_server': source, 'cpu_load': c, 'memory_load': m, 'network_load': n}
+                for vm_id, source, c, m, n in zip(ids, sources, cpu, memory, network)
+            ],
+            'status': status,
+            'power_state': power_state,
+            'temperature': temperature,
+            'can_host_vms': can_host_vms or server_id not in draining,
+            'maintenance_start': maintenance_start,
+            'maintenance_type': maintenance_type or None,
+            'has_fault': has_fault,
+            'fault_type': fault_type or None,
+        }
+
+    vm_manager.servers = servers
+    vm_manager.num_servers = len(servers)
+    vm_manager.last_fault_time = _from_datetime64(data['manager_last_fault_time'])[0]
+    vm_manager.fault_interval = timedelta(seconds=float(data['manager_fault_interval']))
+    vm_manager.consolidation_thresholds = dict(zip(
+        data['manager_threshold_names'].tolist(), data['manager_threshold_values'].tolist()
+    ))
+
+
+def _restore_detector(detector, data):
+    prefix = 'detector_history_'
+    detector.metric_history = MetricHistory.from_arrays(
+        {key[len(prefix):]: value for key, value in data.items() if key.startswith(prefix)}
+    )
+    rack_ids = detector.metric_history.rack_ids
+
+    alert_counts = data['detector_alert_counts']
+    alert_times = _split([datetime.fromtimestamp(t) for t in data['detector_alert_times'].tolist()], alert_counts)
+    alert_levels = _split(data['detector_alert_levels'].tolist(), alert_counts)
+    detector.alert_history = {
+        rack_id: list(zip(alert_times[i], alert_levels[i])) for i, rack_id in enumerate(rack_ids)
+    }
+
+    if 'detector_alert_next_id' in data:  # older snapshots have no alert pipeline state
+        _restore_alerts(detector.alerts, data)
+
+    reasons = _split(data['detector_prediction_reasons'].tolist(), data['detector_prediction_reason_counts'])
+    detector.predictions = {
+        rack_id: {
+            'status': status,
+            'confidence': confidence,
+            'predicted_failure_time': failure_time,
+            'reasons': rack_reasons,
+        }
+        for rack_id, status, confidence, failure_time, rack_reasons in zip(
+            rack_ids, data['detector_prediction_status'].tolist(),
+            data['detector_prediction_confidence'].tolist(),
+            _from_datetime64(data['detector_prediction_failure_time']), reasons
+        )
+    }
+
+    for prefix, component, names in (
+        ('change', detector.change_detector, CHANGE_DETECTOR_ARRAYS),
+        ('predictor', detector.predictor, FAILURE_PREDICTOR_ARRAYS),
+    ):
+        key = f'detector_{prefix}_rack_ids'
+        if component is None or key not in data:
+            continue
+        component.rack_ids = data[key].tolist()
+        component.rack_index = {rack_id: i for i, rack_id in enumerate(component.rack_ids)}
+        for name in names:
+            # Keep spare capacity so new racks don't trigger an immediate resize
+            saved = data[f'detector_{prefix}{name}']
+            array = np.zeros((max(2 * len(saved), 64),) + saved.shape[1:], dtype=saved.dtype)
+            array[:len(saved)] = saved
+            setattr(component, name, array)
+
+
+def _restore_alerts(pipeline, data):
+    columns = {field: data[f'detector_active_alert_{field}'].tolist() for field in ALERT_TEXT_FIELDS}
+    columns.update({field: _from_datetime64(data[f'detector_active_alert_{field}']) for field in ALERT_TIME_FIELDS})
+    columns['id'] = data['detector_active_alert_ids'].tolist()
+    columns['count'] = data['detector_active_alert_count'].tolist()
+    columns['normal_run'] = data['detector_active_alert_normal_run'].tolist()
+    columns['value'] = [None if np.isnan(v) else v for v in data['detector_active_alert_value'].tolist()]
+
+    pipeline.active = {}
+    pipeline.open_counts = {}
+    for values in zip(*columns.values()):
+        alert = dict(zip(columns.keys(), values), resolved_at=None)
+        pipeline.active[(alert['rack_id'], alert['metric'])] = alert
+        pipeline.open_counts[alert['rack_id']] = pipeline.open_counts.get(alert['rack_id'], 0) + 1
+    pipeline._next_id = int(data['detector_alert_next_id'])
+
+
+def load_snapshot(path: str, vm_manager, detector):
+    """Restore simulator and detector state saved by save_snapshot."""
+    with np.load(path, allow_pickle=False) as archive:
+        # Read every array once; indexing the archive re-reads from disk
+        data = {key: archive[key] for key in archive.files}
+    if int(data['version']) != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {int(data['version'])}")
+    _restore_servers(vm_manager, data)
+    _restore_detector(detector, data)
+
+
+class SnapshotScheduler:
+    """Save snapshots periodically from a background thread.
+
+    ``lock`` should be the lock the application holds while mutating the
+    simulator, so a snapshot never sees a half-applied tick.
+    """
+
+    def __init__(self, path: str, vm_manager, detector, interval: float = 60.0,
+                 lock: Optional[threading.Lock] = None):
+        self.path = path
+        self.vm_manager = vm_manager
+        self.detector = detector
+        self.interval = interval
+        self.lock = lock or threading.Lock()
+        self.last_error: Optional[Exception] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def save(self):
+        with self.lock:
+            save_snapshot(self.path, self.vm_manager, self.detector)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+                self.last_error = None
+            except Exception as error:  # keep snapshotting even if one save fails
+                self.last_error = error
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='snapshot-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import random
+import argparse
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Binary trace layout: MAGIC, uint32 header length, JSON header, padding to
+# HEADER_ALIGN, then fixed-size records sorted by time. Records are read
+# through np.memmap, so traces larger than RAM stream in chunks.
+MAGIC = b'DCTRACE1'
+HEADER_ALIGN = 64
+
+TRACE_DTYPE = np.dtype([
+    ('rack', '<i4'),  # index into the header's rack_ids
+    ('time', '<f8'),  # seconds since the epoch
+    ('temperature', '<f4'),
+    ('vibration', '<f4'),
+    ('power', '<f4'),
+    ('cpu_usage', '<f4'),
+    ('memory_usage', '<f4'),
+    ('network_load', '<f4'),
+    ('event', '<i1'),  # index into EVENTS
+])
+
+EVENTS = ('none', 'fault_temperature', 'fault_load', 'fault_power', 'repair', 'replace')
+
+# Server fields saved in the header's initial_state; maintenance_start is stored as a timestamp
+SERVER_FIELDS = ('cpu_usage', 'memory_usage', 'network_load', 'status', 'power_state', 'temperature',
+                 'can_host_vms', 'maintenance_start', 'maintenance_type', 'has_fault', 'fault_type')
+VM_FIELDS = ('id', 'source_server', 'cpu_load', 'memory_load', 'network_load')
+
+
+class TraceWriter:
+    """Append telemetry records to a binary trace file.
+
+    ``seed`` and ``initial_state`` (from save_servers) go into the header so a
+    replay can start from the recorded fleet with the same random stream.
+    """
+
+    def __init__(self, path: str, rack_ids: List[str], seed: Optional[int] = None,
+                 initial_state: Optional[Dict] = None):
+        self.path = path
+        self.rack_ids = list(rack_ids)
+        self.rack_index = {rack_id: i for i, rack_id in enumerate(self.rack_ids)}
+
+        header = {'rack_ids': self.rack_ids, 'events': list(EVENTS)}
+        if seed is not None:
+            header['seed'] = seed
+        if initial_state is not None:
+            header['initial_state'] = initial_state
+        header = json.dumps(header).encode()
+        prefix = len(MAGIC) + 4 + len(header)
+        padding = -prefix % HEADER_ALIGN
+
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._file.write(np.uint32(len(header) + padding).tobytes())
+        self._file.write(header + b' ' * padding)
+
+    def write(self, records: np.ndarray):
+        """Append a structured array of TRACE_DTYPE records."""
+        self._file.write(np.ascontiguousarray(records, dtype=TRACE_DTYPE).tobytes())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """Memory-mapped, chunked access to a binary trace file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a telemetry trace")
+            header_length = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+            header = json.loads(f.read(header_length).decode())
+
+        self.rack_ids: List[str] = header['rack_ids']
+        self.events: List[str] = header['events']
+        self.seed: int = header.get('seed', 0)
+        self.initial_state: Optional[Dict] = header.get('initial_state')
+        offset = len(MAGIC) + 4 + header_length
+        count = (os.path.getsize(path) - offset) // TRACE_DTYPE.itemsize
+        self.records = np.memmap(path, dtype=TRACE_DTYPE, mode='r', offset=offset, shape=(count,))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def chunks(self, chunk_size: int = 1_000_000) -> Iterator[np.ndarray]:
+        """Yield record views of at most ``chunk_size`` records."""
+        for start in range(0, len(self.records), chunk_size):
+            yield self.records[start:start + chunk_size]
+
+    def ticks(self, chunk_size: int = 1_000_000) -> Iterator[np.ndarray]:
+        """Yield the records of each timestamp, carrying partial ticks across chunks."""
+        carry = None
+        for chunk in self.chunks(chunk_size):
+            if carry is not None:
+                chunk = np.concatenate([carry, chunk])
+            boundaries = np.flatnonzero(np.diff(chunk['time'])) + 1
+            starts = np.concatenate([[0], boundaries])
+            ends = np.concatenate([boundaries, [len(chunk)]])
+            for start, end in zip(starts[:-1], ends[:-1]):
+                yield chunk[start:end]
+            # The last tick may continue in the next chunk
+            carry = np.array(chunk[starts[-1]:])
+        if carry is not None and len(carry):
+            yield carry
+
+
+def save_servers(vm_manager) -> Dict:
+    """JSON-safe copy of the manager's servers and VMs, for a trace header."""
+    state = {}
+    for rack_id, server in vm_manager.get_server_status().items():
+        record = {field: server[field] for field in SERVER_FIELDS}
+        for field in ('cpu_usage', 'memory_usage', 'network_load', 'temperature'):
+            record[field] = float(record[field])
+        record['can_host_vms'] = bool(record['can_host_vms'])
+        record['has_fault'] = bool(record['has_fault'])
+        if record['maintenance_start'] is not None:
+            record['maintenance_start'] = record['maintenance_start'].timestamp()
+        record['virtual_machines'] = [[vm[field] for field in VM_FIELDS] for vm in server['virtual_machines']]
+        state[rack_id] = record
+    return state
+
+
+def replay_manager(trace: 'TraceReader'):
+    """A VirtualizationManager for replaying ``trace``, with the trace's rack IDs.
+
+    Starts from the initial state saved in the header when there is one;
+    otherwise the fleet is generated from the header seed (0 for traces that
+    have none) and renamed to the trace's racks, so repeated replays match.
+    """
+    from virtualization_manager import VirtualizationManager
+
+    if trace.initial_state is None:
+        _seed(trace.seed)
+        vm_manager = VirtualizationManager(num_servers=len(trace.rack_ids))
+        names = dict(zip(vm_manager.servers, trace.rack_ids))
+        vm_manager.servers = {names[rack_id]: server for rack_id, server in vm_manager.servers.items()}
+        for server in vm_manager.servers.values():
+            for vm in server['virtual_machines']:
+                vm['source_server'] = names[vm['source_server']]
+        return vm_manager
+
+    vm_manager = VirtualizationManager(num_servers=0)
+    for rack_id in trace.rack_ids:
+        record = dict(trace.initial_state[rack_id])
+        if record['maintenance_start'] is not None:
+            record['maintenance_start'] = datetime.fromtimestamp(record['maintenance_start'])
+        record['virtual_machines'] = [dict(zip(VM_FIELDS, vm)) for vm in record['virtual_machines']]
+        vm_manager.servers[rack_id] = record
+    vm_manager.num_servers = len(vm_manager.servers)
+    return vm_manager
+
+
+def _seed(seed: int):
+    """Seed both random streams the simulator draws from."""
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def record_simulation(path: str, vm_manager, ticks: int, interval: float = 60.0,
+                      start: Optional[datetime] = None, seed: int = 0):
+    """Run the simulator and record its telemetry as a trace.
+
+    Vibration and power are drawn like the simulated sensor source; faults are
+    recorded as events on the tick they first appear. The manager's starting
+    state and ``seed`` are saved in the header for replay_manager().
+    """
+    rack_ids = list(vm_manager.get_server_status().keys())
+    start_time = (start or datetime.now()).timestamp()
+    faulty = set()
+    _seed(seed)
+
+    with TraceWriter(path, rack_ids, seed=seed, initial_state=save_servers(vm_manager)) as writer:
+        for tick in range(ticks):
+            current = start_time + tick * interval
+            vm_manager.clock = lambda current=current: datetime.fromtimestamp(current)
+            vm_manager.update_server_loads()
+            vm_manager.optimize_workload()
+
+            server_status = vm_manager.get_server_status()
+            records = np.zeros(len(rack_ids), dtype=TRACE_DTYPE)
+            records['rack'] = np.arange(len(rack_ids))
+            records['time'] = current
+            records['vibration'] = np.random.normal(0.5, 0.2, len(rack_ids))
+            records['power'] = np.random.normal(1000, 100, len(rack_ids))
+            for i, rack_id in enumerate(rack_ids):
+                status = server_status[rack_id]
+                records['temperature'][i] = status['temperature']
+                records['cpu_usage'][i] = status['cpu_usage']
+                records['memory_usage'][i] = status['memory_usage']
+                records['network_load'][i] = status['network_load']
+                if status['has_fault'] and rack_id not in faulty:
+                    records['event'][i] = EVENTS.index(f"fault_{status['fault_type']}")
+                    faulty.add(rack_id)
+                elif not status['has_fault']:
+                    faulty.discard(rack_id)
+            writer.write(records)
+
+
+class ReplayEngine:
+    """Stream a recorded trace through the anomaly detector and placement logic.
+
+    Both components run on trace time, so a trace can be replayed as fast as
+    possible (``speed=None``) or paced at a multiple of real time, and the same
+    trace can be used to compare different threshold settings. The random
+    streams are reseeded from the trace header at the start of ``run``; with a
+    manager from replay_manager(), replays of a trace are identical.
+    """
+
+    def __init__(self, trace: TraceReader, detector, vm_manager=None, speed: Optional[float] = None,
+                 chunk_size: int = 1_000_000):
+        self.trace = trace
+        self.detector = detector
+        self.vm_manager = vm_manager
+        self.speed = speed
+        self.chunk_size = chunk_size
+        self.current_time: Optional[datetime] = None
+
+    def _clock(self) -> datetime:
+        return self.current_time
+
+    def _apply_placement(self, tick: np.ndarray, rack_ids: List[str]) -> Dict[str, int]:
+        """Load trace utilisation and events into the manager and run consolidation."""
+        servers = self.vm_manager.get_server_status()
+        before = {rack_id: server['power_state'] for rack_id, server in servers.items()}
+
+        for record, rack_id in zip(tick, rack_ids):
+            server = servers.get(rack_id)
+            if server is None or server['maintenance_start']:
+                continue
+            server['cpu_usage'] = float(record['cpu_usage'])
+            server['memory_usage'] = float(record['memory_usage'])
+            server['network_load'] = float(record['network_load'])
+            server['temperature'] = float(record['temperature'])
+
+            event = self.trace.events[record['event']]
+            if event.startswith('fault_'):
+                server['has_fault'] = True
+                server['fault_type'] = event[len('fault_'):]
+            elif event in ('repair', 'replace'):
+                self.vm_manager.start_maintenance(rack_id, event)
+                self.detector.change_detector.reset(rack_id)
+
+        vm_count = sum(len(server['virtual_machines']) for server in servers.values())
+        self.vm_manager.optimize_workload()
+
+        return {
+            'vms_created': sum(len(server['virtual_machines']) for server in servers.values()) - vm_count,
+            'power_state_changes': sum(
+                1 for rack_id, server in servers.items() if server['power_state'] != before.get(rack_id)
+            ),
+            'idle_servers': sum(1 for server in servers.values() if server['power_state'] == 'idle'),
+        }
+
+    def run(self, max_ticks: Optional[int] = None) -> Dict:
+        """Replay the trace and return summary statistics for benchmarking."""
+        self.detector.clock = self._clock
+        if self.vm_manager is not None:
+            self.vm_manager.clock = self._clock
+        _seed(self.trace.seed)  # optimize_workload draws random wake-ups
+
+        summary = {
+            'ticks': 0, 'records': 0, 'alerts': 0, 'warning_predictions': 0, 'critical_predictions': 0,
+            'vms_created': 0, 'power_state_changes': 0, 'idle_server_ticks': 0, 'first_critical': {},
+        }
+        names = np.array(self.trace.rack_ids, dtype=object)
+        started = time.perf_counter()
+        previous_time = None
+
+        for tick in self.trace.ticks(self.chunk_size):
+            tick_time = float(tick['time'][0])
+            if self.speed and previous_time is not None:
+                time.sleep(max(0.0, (tick_time - previous_time) / self.speed))
+            previous_time = tick_time
+            self.current_time = datetime.fromtimestamp(tick_time)
+
+            rack_ids = names[tick['rack']].tolist()
+            for record, rack_id in zip(tick, rack_ids):
+                analysis = self.detector.analyze_rack(
+                    rack_id, float(record['temperature']), float(record['vibration']), float(record['power']),
+                    score=False
+                )
+                if analysis['status'] != 'normal':
+                    summary['alerts'] += 1
+
+            for rack_id, prediction in self.detector.score_all().items():
+                if prediction['status'] == 'warning':
+                    summary['warning_predictions'] += 1
+                elif prediction['status'] == 'critical':
+                    summary['critical_predictions'] += 1
+                    summary['first_critical'].setdefault(rack_id, self.current_time)
+
+            if self.vm_manager is not None:
+                placement = self._apply_placement(tick, rack_ids)
+                summary['vms_created'] += placement['vms_created']
+                summary['power_state_changes'] += placement['power_state_changes']
+                summary['idle_server_ticks'] += placement['idle_servers']
+
+            summary['ticks'] += 1
+            summary['records'] += len(tick)
+            if max_ticks is not None and summary['ticks'] >= max_ticks:
+                break
+
+        summary['elapsed_seconds'] = time.perf_counter() - started
+        return summary
+
+
+if __name__ == '__main__':
+    from anomaly_detector import AnomalyDetector
+    from virtualization_manager import VirtualizationManager
+
+    parser = argparse.ArgumentParser(description="Record or replay telemetry traces")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help="record a trace from the simulator")
+    record_parser.add_argument('path')
+    record_parser.add_argument('--racks', type=int, default=20)
+    record_parser.add_argument('--ticks', type=int, default=240)
+    record_parser.add_argument('--seed', type=int, default=0)
+    replay_parser = subparsers.add_parser('replay', help="replay a trace through the detector")
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--speed', type=float, default=None)
+    replay_parser.add_argument('--no-placement', action='store_true')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        _seed(args.seed)
+        record_simulation(args.path, VirtualizationManager(num_servers=args.racks), args.ticks, seed=args.seed)
+        print(f"Recorded {args.ticks} ticks of {args.racks} racks to {args.path}")
+    else:
+        trace = TraceReader(args.path)
+        vm_manager = None if args.no_placement else replay_manager(trace)
+        summary = ReplayEngine(trace, AnomalyDetector(), vm_manager, speed=args.speed).run()
+        summary.pop('first_critical')
+        for key, value in summary.items():
+            print(f"{key}: {value}")
@@ -0,0 +1,63 @@
+import numpy as np
+
+from change_detectors import ChangePointDetector
+
+
+def make_detector(num_racks):
+    detector = ChangePointDetector()
+    for i in range(num_racks):
+        detector._row(f'Rack-{i + 1}')
+    return detector, np.arange(num_racks)
+
+
+def noise(rng, num_racks):
+    return np.column_stack([
+        rng.normal(35, 0.5, num_racks), rng.normal(0.5, 0.2, num_racks), rng.normal(1000, 100, num_racks)
+    ])
+
+
+def test_false_alarm_rate_on_stationary_noise():
+    rng = np.random.default_rng(7)
+    detector, rows = make_detector(200)
+
+    signalling = samples = 0
+    for tick in range(600):
+        detector.update_batch(rows, noise(rng, len(rows)))
+        if tick >= detector.warmup:
+            signalling += sum(1 for rack_id in detector.rack_ids if detector.signals(rack_id))
+            samples += len(rows)
+
+    assert signalling / samples < 0.01
+
+
+def test_step_shift_signals_then_rebaselines():
+    rng = np.random.default_rng(7)
+    detector, rows = make_detector(50)
+
+    for _ in range(detector.warmup + 50):
+        detector.update_batch(rows, noise(rng, len(rows)))
+
+    detected = np.zeros(len(rows), dtype=bool)
+    for _ in range(20):
+        values = noise(rng, len(rows))
+        values[:, 1] += 0.4  # two standard deviations of vibration
+        detector.update_batch(rows, values)
+        detected |= ['vibration' in detector.signals(rack_id) for rack_id in detector.rack_ids]
+    assert detected.all()
+
+    # The new level becomes the baseline instead of signalling forever
+    for _ in range(100):
+        values = noise(rng, len(rows))
+        values[:, 1] += 0.4
+        detector.update_batch(rows, values)
+    latched = sum(1 for rack_id in detector.rack_ids if 'vibration' in detector.signals(rack_id))
+    assert latched <= 2
+
+
+def test_reset_drops_staged_samples():
+    detector = ChangePointDetector()
+    detector.stage('Rack-1', (35.0, 0.5, 1000.0))
+    detector.reset('Rack-1')
+    detector.flush()
+
+    assert detector._count[detector.rack_index['Rack-1']] == 0
@@ -0,0 +1,82 @@
+import numpy as np
+
+from datacenter_topology import DataCenterTopology, bin_statistics
+
+
+def test_bins_split_long_row_into_chunks():
+    rack_ids = [f'Rack-{i + 1}' for i in range(450)]
+    topology = DataCenterTopology(rack_ids, [('DC-1', 'Hall-A', 'Row-1')] * len(rack_ids))
+
+    bins, binned = topology.bins('DC-1/Hall-A/Row-1', max_bins=200)
+
+    assert binned and len(bins) == 200
+    assert bins[0][1] == 0 and bins[-1][2] == 450
+    assert all(end == next_start for (_, _, end), (_, next_start, _) in zip(bins, bins[1:]))
+    for label, start, end in bins:
+        assert topology.range_of(label) == (start, end)
+
+    values = np.arange(450, dtype=float)
+    stats = bin_statistics(values, bins)
+    assert stats['count'].sum() == 450
+    assert np.isclose(stats['sum'].sum(), values.sum())
+
+
+def test_bins_drill_into_chunk():
+    rack_ids = [f'Rack-{i + 1}' for i in range(450)]
+    topology = DataCenterTopology(rack_ids, [('DC-1', 'Hall-A', 'Row-1')] * len(rack_ids))
+    bins, _ = topology.bins('DC-1/Hall-A/Row-1', max_bins=200)
+    label, start, end = bins[0]
+
+    assert topology.bins(label, max_bins=200) == ([(rack_ids[i], i, i + 1) for i in range(start, end)], False)
+    assert topology.range_of(rack_ids[0]) is None
+
+
+def test_bins_flag_mixed_single_rack_chunks():
+    rack_ids = [f'Rack-{i + 1}' for i in range(300)]
+    topology = DataCenterTopology(rack_ids, [('DC-1', 'Hall-A', 'Row-1')] * len(rack_ids))
+
+    bins, binned = topology.bins('DC-1/Hall-A/Row-1', max_bins=200)
+
+    # 300 racks in 200 chunks: some chunks are one rack and carry its plain name
+    assert binned
+    assert {end - start for _, start, end in bins} == {1, 2}
+    assert any(topology.range_of(label) is None for label, _, _ in bins)
+
+
+def test_bins_use_hierarchy_when_it_fits():
+    rack_ids = [f'Rack-{i + 1}' for i in range(1000)]
+    topology = DataCenterTopology.from_layout(rack_ids)
+
+    bins, binned = topology.bins('', max_bins=200)
+
+    assert binned and len(bins) == 200
+    assert all(label in topology.ranges for label, _, _ in bins)
+
+
+def test_sync_keeps_aggregates_consistent():
+    rack_ids = [f'Rack-{i + 1}' for i in range(60)]
+    topology = DataCenterTopology.from_layout(rack_ids)
+    rng = np.random.default_rng(0)
+    servers = {
+        rack_id: {'cpu_usage': cpu, 'memory_usage': 40.0, 'network_load': 20.0, 'temperature': temperature,
+                  'virtual_machines': [{}] * (i % 3), 'power_state': 'idle' if i % 7 == 0 else 'normal'}
+        for i, (rack_id, cpu, temperature) in enumerate(zip(rack_ids, rng.uniform(10, 95, 60), rng.normal(38, 3, 60)))
+    }
+    predictions = {'Rack-3': {'status': 'critical'}, 'Rack-30': {'status': 'warning'}}
+
+    topology.sync(servers, alert_counts={'Rack-3': 2}, predictions=predictions)
+    # A single changed rack goes through the trees' point updates rather than a rebuild
+    servers['Rack-12']['temperature'] = 60.0
+    topology.sync(servers, alert_counts={'Rack-3': 2}, predictions=predictions)
+
+    hall = topology.aggregate('DC-1/Hall-A')
+    racks = rack_ids[slice(*topology.ranges['DC-1/Hall-A'])]
+    assert np.isclose(hall['total_load'], sum(servers[r]['cpu_usage'] for r in racks))
+    assert hall['hottest_rack'] == 'Rack-12' and hall['max_temperature'] == 60.0
+    assert hall['vms'] == sum(len(servers[r]['virtual_machines']) for r in racks)
+    assert hall['idle_racks'] == sum(servers[r]['power_state'] == 'idle' for r in racks)
+    assert (hall['alerts'], hall['critical_racks'], hall['warning_racks']) == (2, 1, 0)
+
+    rows = topology.drill_down('DC-1/Hall-A')
+    assert sum(row['racks'] for row in rows) == hall['racks']
+    assert [rack['node'] for rack in topology.drill_down(rows[0]['node'])] == racks[:rows[0]['racks']]
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from migration_scheduler import EVACUATION, REBALANCE, MigrationScheduler
+from virtualization_manager import VirtualizationManager
+
+NOW = datetime(2024, 1, 1)
+
+
+def make_manager(network_loads):
+    vm_manager = VirtualizationManager(num_servers=len(network_loads))
+    for i, network_load in enumerate(network_loads):
+        vm_manager.servers[f'Rack-{i + 1}'].update(
+            cpu_usage=40.0, memory_usage=30.0, network_load=network_load, virtual_machines=[], status='active',
+            power_state='normal', can_host_vms=True, maintenance_start=None, maintenance_type=None,
+            has_fault=False, fault_type=None
+        )
+    return vm_manager
+
+
+def add_vm(vm_manager, server_id):
+    vm = {'id': f'VM-{server_id}', 'source_server': server_id, 'cpu_load': 10.0,
+          'memory_load': 10.0, 'network_load': 5.0}
+    vm_manager.servers[server_id]['virtual_machines'].append(vm)
+    return vm
+
+
+def test_copy_traffic_released_exactly_near_saturation():
+    vm_manager = make_manager([95.0, 30.0])
+    scheduler = MigrationScheduler(vm_manager)
+    vm = add_vm(vm_manager, 'Rack-1')
+
+    migration = scheduler.submit(vm, 'Rack-1', 'Rack-2')
+    scheduler.tick(NOW)
+    assert migration['state'] == 'running'
+    assert vm_manager.servers['Rack-1']['network_load'] == 100.0  # the copy share was clipped
+
+    # The VM went away mid-copy, so the migration is dropped and its traffic released
+    vm_manager.servers['Rack-1']['virtual_machines'].clear()
+    scheduler.tick(NOW + timedelta(hours=1))
+    assert migration['state'] == 'dropped'
+    assert vm_manager.servers['Rack-1']['network_load'] == 95.0
+    assert vm_manager.servers['Rack-2']['network_load'] == 30.0
+
+
+def test_stale_evacuation_does_not_preempt():
+    vm_manager = make_manager([30.0, 30.0, 30.0])
+    scheduler = MigrationScheduler(vm_manager, max_per_host=1)
+    rebalance = scheduler.submit(add_vm(vm_manager, 'Rack-1'), 'Rack-1', 'Rack-2', REBALANCE)
+    scheduler.tick(NOW)
+
+    evacuation = scheduler.submit(add_vm(vm_manager, 'Rack-3'), 'Rack-3', 'Rack-2', EVACUATION)
+    vm_manager.servers['Rack-3']['virtual_machines'].clear()
+    scheduler.tick(NOW)
+
+    assert evacuation['state'] == 'dropped'
+    assert rebalance['state'] == 'running'
+    assert scheduler.stats['preempted'] == 0
@@ -0,0 +1,48 @@
+from migration_scheduler import MigrationScheduler
+from placement_service import PlacementService
+from virtualization_manager import VirtualizationManager
+
+
+def make_manager():
+    vm_manager = VirtualizationManager(num_servers=2)
+    for server_id, cpu in (('Rack-1', 50.0), ('Rack-2', 40.0)):
+        vm_manager.servers[server_id].update(
+            cpu_usage=cpu, memory_usage=30.0, network_load=30.0, virtual_machines=[], status='active',
+            power_state='normal', can_host_vms=True, maintenance_start=None, maintenance_type=None,
+            has_fault=False, fault_type=None
+        )
+    vm_manager.servers['Rack-1']['virtual_machines'].append(
+        {'id': 'VM-1', 'source_server': 'Rack-1', 'cpu_load': 30.0, 'memory_load': 5.0, 'network_load': 5.0}
+    )
+    return vm_manager
+
+
+def test_inbound_migration_counts_against_target():
+    vm_manager = make_manager()
+    vm_manager.migration_scheduler = MigrationScheduler(vm_manager)
+    service = PlacementService(vm_manager)
+
+    # Rack-1 goes into maintenance, so VM-1 (30% CPU) is queued to move to Rack-2
+    vm_manager.start_maintenance('Rack-1', 'repair')
+    assert vm_manager.migration_scheduler.inbound_cpu['Rack-2'] == 30.0
+
+    # Rack-2 has 80 - 40 = 40% CPU left by usage alone, but only 10% once the VM lands
+    result, = service.place([{'cpu': 20.0, 'memory': 0.0, 'network': 0.0}])
+    assert result['status'] == 'rejected'
+    assert result['reason'] == 'no_capacity'
+
+    result, = service.place([{'cpu': 5.0, 'memory': 0.0, 'network': 0.0}])
+    assert result['status'] == 'placed'
+    assert result['rack_id'] == 'Rack-2'
+
+
+def test_atomic_batch_rolls_back():
+    vm_manager = make_manager()
+    service = PlacementService(vm_manager)
+    before = service.capacity()['free']['cpu']
+
+    results = service.place([{'cpu': 10.0}, {'cpu': 500.0}], atomic=True)
+
+    assert [r['reason'] for r in results] == ['batch_rejected', 'exceeds_host_limits']
+    assert service.capacity()['free']['cpu'] == before
+    assert not vm_manager.servers['Rack-2']['virtual_machines']
@@ -0,0 +1,30 @@
+import numpy as np
+
+from sharded_simulation import ShardedFleetSimulation
+
+
+def fleet_vms(simulation):
+    hosted = [state.vm_host >= 0 for state in simulation.states]
+    ids = np.concatenate([state.vm_id[mask] for state, mask in zip(simulation.states, hosted)])
+    loads = np.concatenate([
+        np.stack([state.vm_cpu_load[mask], state.vm_memory_load[mask], state.vm_network_load[mask]], axis=1)
+        for state, mask in zip(simulation.states, hosted)
+    ])
+    return ids, loads
+
+
+def test_cross_shard_migrations_conserve_vms_and_load():
+    with ShardedFleetSimulation(400, num_shards=2, seed=0) as simulation:
+        ids, loads = fleet_vms(simulation)
+        by_id = dict(zip(ids.tolist(), loads.tolist()))
+
+        cross_shard = 0
+        for _ in range(10):
+            cross_shard += simulation.tick()['cross_shard_migrations']
+            moved_ids, moved_loads = fleet_vms(simulation)
+
+            assert sorted(moved_ids.tolist()) == sorted(by_id)
+            assert np.allclose(moved_loads.sum(axis=0), loads.sum(axis=0))
+            assert all(by_id[vm_id] == load for vm_id, load in zip(moved_ids.tolist(), moved_loads.tolist()))
+
+        assert cross_shard > 0
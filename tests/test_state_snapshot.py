@@ -0,0 +1,22 @@
+import os
+import stat
+
+from anomaly_detector import AnomalyDetector
+from state_snapshot import SNAPSHOT_MODE, load_snapshot, save_snapshot
+from virtualization_manager import VirtualizationManager
+
+
+def test_snapshot_round_trip_keeps_file_mode(tmp_path):
+    path = str(tmp_path / 'state.npz')
+    vm_manager, detector = VirtualizationManager(num_servers=10), AnomalyDetector()
+    detector.analyze_rack('Rack-1', 35.0, 0.5, 1000.0)
+
+    save_snapshot(path, vm_manager, detector)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == SNAPSHOT_MODE
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+    restored_manager, restored_detector = VirtualizationManager(num_servers=3), AnomalyDetector()
+    load_snapshot(path, restored_manager, restored_detector)
+    assert list(restored_manager.servers) == list(vm_manager.servers)
+    assert restored_detector.metric_history.values('Rack-1', 'temperature') == [35.0]
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from anomaly_detector import AnomalyDetector
+from telemetry_trace import ReplayEngine, TraceReader, record_simulation, replay_manager
+from virtualization_manager import VirtualizationManager
+
+
+def replay(path):
+    trace = TraceReader(path)
+    summary = ReplayEngine(trace, AnomalyDetector(), replay_manager(trace)).run()
+    summary.pop('elapsed_seconds')
+    return summary
+
+
+def test_replays_of_a_trace_match(tmp_path):
+    path = str(tmp_path / 'fleet.trace')
+    vm_manager = VirtualizationManager(num_servers=20)
+    # Rack names other than Rack-1..N must survive the round trip
+    names = {rack_id: f'dc1-r{i:02d}' for i, rack_id in enumerate(vm_manager.servers)}
+    vm_manager.servers = {names[rack_id]: server for rack_id, server in vm_manager.servers.items()}
+    for server in vm_manager.servers.values():
+        for vm in server['virtual_machines']:
+            vm['source_server'] = names[vm['source_server']]
+    record_simulation(path, vm_manager, ticks=60, start=datetime(2024, 1, 1), seed=3)
+
+    trace = TraceReader(path)
+    assert list(replay_manager(trace).servers) == trace.rack_ids == list(vm_manager.servers)
+    assert replay(path) == replay(path)
@@ -7,8 +7,23 @@ class VirtualizationManager:
     def __init__(self, num_servers: int = 20):
         self.num_servers = num_servers
         self.servers = {}
-        self.last_fault_time = datetime.now()
+        self.clock = datetime.now  # Time source; the replay engine substitutes trace time
+        self.last_fault_time = self.clock()
         self.fault_interval = timedelta(minutes=2)  # Generate fault every 2 minutes
+        
+        # CPU usage thresholds (%) used by optimize_workload
+        self.consolidation_thresholds = {
+            'overloaded': 80,  # shed load above this
+            'underutilized': 30,  # accept load below this
+            'idle': 15  # power down below this when no VMs are hosted
+        }
+        
+        # Optional power scheduler (e.g. ProactiveScheduler); None keeps the reactive policy
+        self.power_scheduler = None
+        # Optional MigrationScheduler; None moves VMs instantly and for free
+        self.migration_scheduler = None
+        self.migration_count = 0  # VMs moved or created to shift load, for policy comparisons
+        self.state_version = 0  # Bumped by every tick and maintenance start, for caches over self.servers
         self.initialize_servers()
         self.create_initial_vms()  # Add initial VMs
         
@@ -48,7 +63,7 @@ class VirtualizationManager:
             for _ in range(num_vms):
                 source_server = random.choice(active_servers)
                 vm_load = random.uniform(10, 30)
-                vm_id = f"VM-{source_server}-{datetime.now().strftime('%H%M%S')}"
+                vm_id = f"VM-{source_server}-{self.clock().strftime('%H%M%S')}"
                 
                 self.servers[server_id]['virtual_machines'].append({
                     'id': vm_id,
@@ -65,7 +80,8 @@ class VirtualizationManager:
     
     def update_server_loads(self):
         """Update server loads with realistic variations and generate random faults."""
-        current_time = datetime.now()
+        current_time = self.clock()
+        self.state_version += 1
         active_servers = [sid for sid, s in self.servers.items() if s['status'] == 'active']
         
         # Generate random fault every 2 minutes
@@ -157,7 +173,8 @@ class VirtualizationManager:
     def start_maintenance(self, server_id: str, maintenance_type: str):
         """Start maintenance (repair/replace) for a server."""
         if server_id in self.servers:
-            self.servers[server_id]['maintenance_start'] = datetime.now()
+            self.state_version += 1
+            self.servers[server_id]['maintenance_start'] = self.clock()
             self.servers[server_id]['maintenance_type'] = maintenance_type
             self.servers[server_id]['status'] = 'maintenance'
             
@@ -174,10 +191,16 @@ class VirtualizationManager:
         if not available_servers:
             return
         
+        if self.migration_scheduler is not None:
+            # VMs leave as their live copies complete, evacuations first
+            self.migration_scheduler.evacuate(source_server_id, available_servers)
+            return
+        
         # Distribute VMs across available servers
         for vm in vms_to_migrate:
             target_server = random.choice(available_servers)
             self.servers[target_server]['virtual_machines'].append(vm)
+            self.migration_count += 1
             
             # Update target server loads
             self.servers[target_server]['cpu_usage'] = np.clip(
@@ -198,6 +221,10 @@ class VirtualizationManager:
     
     def optimize_workload(self):
         """Optimize workload distribution across servers."""
+        self.state_version += 1
+        if self.migration_scheduler is not None:
+            self.migration_scheduler.tick()
+        
         active_servers = [sid for sid, s in self.servers.items() 
                          if s['status'] == 'active' and not s['maintenance_start']]
         
@@ -208,42 +235,53 @@ class VirtualizationManager:
         )
         
         # Find overloaded and underutilized servers
-        overloaded = [s for s in servers_by_load if self.servers[s]['cpu_usage'] > 80]
-        underutilized = [s for s in servers_by_load if self.servers[s]['cpu_usage'] < 30]
+        thresholds = self.consolidation_thresholds
+        overloaded = [s for s in servers_by_load if self.servers[s]['cpu_usage'] > thresholds['overloaded']]
+        underutilized = [s for s in servers_by_load if self.servers[s]['cpu_usage'] < thresholds['underutilized']]
         
         # Balance load
-        for high_server in overloaded:
-            if not underutilized:
-                break
+        if self.migration_scheduler is not None:
+            # Queue the cheapest real VM moves instead of shifting load instantly
+            self.migration_scheduler.rebalance(overloaded, underutilized)
+        else:
+            for high_server in overloaded:
+                if not underutilized:
+                    break
                 
-            for low_server in underutilized:
-                if not self.servers[low_server]['can_host_vms']:
-                    continue
+                for low_server in underutilized:
+                    if not self.servers[low_server]['can_host_vms']:
+                        continue
                     
-                # Calculate load to transfer
-                load_to_transfer = (self.servers[high_server]['cpu_usage'] - 60) / 2
+                    # Calculate load to transfer
+                    load_to_transfer = (self.servers[high_server]['cpu_usage'] - 60) / 2
                 
-                # Create virtual machine on underutilized server
-                vm_id = f"VM-{high_server}-{datetime.now().strftime('%H%M%S')}"
-                self.servers[low_server]['virtual_machines'].append({
-                    'id': vm_id,
-                    'source_server': high_server,
-                    'cpu_load': load_to_transfer,
-                    'memory_load': load_to_transfer * 1.2,
-                    'network_load': load_to_transfer * 0.8
-                })
+                    # Create virtual machine on underutilized server
+                    vm_id = f"VM-{high_server}-{self.clock().strftime('%H%M%S')}"
+                    self.servers[low_server]['virtual_machines'].append({
+                        'id': vm_id,
+                        'source_server': high_server,
+                        'cpu_load': load_to_transfer,
+                        'memory_load': load_to_transfer * 1.2,
+                        'network_load': load_to_transfer * 0.8
+                    })
+                    self.migration_count += 1
                 
-                # Update loads
-                self.servers[high_server]['cpu_usage'] -= load_to_transfer
-                self.servers[low_server]['cpu_usage'] += load_to_transfer
+                    # Update loads
+                    self.servers[high_server]['cpu_usage'] -= load_to_transfer
+                    self.servers[low_server]['cpu_usage'] += load_to_transfer
                 
-                if self.servers[low_server]['cpu_usage'] > 30:
-                    underutilized.remove(low_server)
+                    if self.servers[low_server]['cpu_usage'] > thresholds['underutilized']:
+                        underutilized.remove(low_server)
+        
+        if self.power_scheduler is not None:
+            self.power_scheduler.apply(self, active_servers)
+            return
         
         # Put very underutilized servers into power saving mode
         for server_id in active_servers:
-            if (self.servers[server_id]['cpu_usage'] < 15 and 
-                not self.servers[server_id]['virtual_machines']):
+            if (self.servers[server_id]['cpu_usage'] < thresholds['idle'] and 
+                not self.servers[server_id]['virtual_machines'] and
+                not (self.migration_scheduler and self.migration_scheduler.busy(server_id))):
                 self.servers[server_id]['power_state'] = 'idle'
             elif self.servers[server_id]['power_state'] == 'idle':
                 # Randomly wake up some idle servers
@@ -253,4 +291,8 @@ class VirtualizationManager:
     
     def get_server_status(self) -> Dict:
         """Get current status of all servers."""
-        return self.servers 
\ No newline at end of file
+        return self.servers
+    
+    def get_rack_status(self, rack_id: str) -> Dict:
+        """Get current status of a single server."""
+        return self.servers[rack_id] 
\ No newline at end of file